@@ -7,6 +7,13 @@ import json
 import datetime
 import requests
 
+# Exécution de l'analyse en arrière-plan, fournie par le hub (absente si l'application est lancée seule)
+try:
+    from job_runner import get_job_runner, show_job_messages, watch_job
+    JOB_RUNNER_AVAILABLE = True
+except ImportError:
+    JOB_RUNNER_AVAILABLE = False
+
 # Configuration déjà faite dans app.py principal
 # st.set_page_config est appelé uniquement dans app.py pour éviter les conflits
 
@@ -70,8 +77,8 @@ def flatten_schema(jsonld_data):
     recurse(jsonld_data)
     return results
 
-def fetch_html_from_url(url):
-    """Récupère le contenu HTML d'une URL"""
+def fetch_html_from_url(url, on_error=None):
+    """Récupère le contenu HTML d'une URL (en cas d'échec, le message est passé à `on_error`, par défaut affiché)"""
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -80,7 +87,7 @@ def fetch_html_from_url(url):
         response.raise_for_status()
         return response.text
     except Exception as e:
-        st.error(f"❌ Erreur lors de la récupération de {url}: {str(e)}")
+        (on_error or st.error)(f"❌ Erreur lors de la récupération de {url}: {str(e)}")
         return None
 
 def clean_url_for_display(url):
@@ -96,6 +103,44 @@ def clean_url_for_display(url):
         cleaned = cleaned.split('/')[0]
     return cleaned
 
+def extract_schema_set(html_content, url="http://example.com"):
+    """Ensemble des couples (type, propriété) des schémas JSON-LD d'une page"""
+    schema = set()
+    for block in extract_jsonld_schema(html_content, url):
+        schema |= flatten_schema(block)
+    return schema
+
+def analyze_urls(client_url, competitor_urls, on_error=None, progress=None):
+    """
+    Récupère la page du site et celles des concurrents, puis extrait leurs schémas.
+    Retourne None si la page du site n'a pas pu être récupérée ; `progress(fraction, texte)` suit l'avancement.
+    """
+    competitor_urls = [url for url in competitor_urls if url.strip()]
+    total = len(competitor_urls) + 1
+    if progress: progress(0, f"Récupération de {client_url}")
+    client_html_content = fetch_html_from_url(client_url, on_error)
+    if not client_html_content:
+        return None
+    analysis = {
+        'client_schema': extract_schema_set(client_html_content, client_url),
+        # Nom nettoyé du site client
+        'client_name': clean_url_for_display(client_url),
+        'competitor_schemas': [],
+        'competitor_names': []
+    }
+    for i, comp_url in enumerate(competitor_urls):
+        if progress: progress((i + 1) / total, f"Récupération de {comp_url}")
+        comp_html = fetch_html_from_url(comp_url, on_error)
+        if comp_html:
+            analysis['competitor_schemas'].append(extract_schema_set(comp_html, comp_url))
+            # Utiliser l'URL nettoyée comme nom
+            analysis['competitor_names'].append(clean_url_for_display(comp_url))
+    return analysis
+
+def analyze_urls_job(job, client_url, competitor_urls):
+    """Tâche d'arrière-plan : les erreurs de récupération sont affichées à la fin de la tâche"""
+    return analyze_urls(client_url, competitor_urls, lambda message: job.log(message, 'error'), job.report)
+
 def display_comparison_results(client_schema, competitor_schemas, competitor_names, client_name="Votre site"):
     """Affiche les résultats de la comparaison"""
     # Construction du tableau
@@ -232,42 +277,32 @@ with tab1:
     if analyze_clicked:
         if not client_url.strip():
             st.error("❌ Merci de fournir l'URL de votre site.")
+        elif JOB_RUNNER_AVAILABLE:
+            # Récupération en arrière-plan : les interactions avec la page ne l'interrompent pas
+            st.session_state.url_analysis = None
+            st.session_state.url_analysis_job_id = get_job_runner().submit(
+                "Récupération et analyse des données structurées", analyze_urls_job, client_url, competitor_urls
+            ).id
         else:
             with st.spinner("🔄 Récupération et analyse des données structurées..."):
-                # Récupération HTML du client
-                client_html_content = fetch_html_from_url(client_url)
-                
-                if client_html_content:
-                    client_data = extract_jsonld_schema(client_html_content, client_url)
-                    client_schema = set()
-                    for block in client_data:
-                        client_schema |= flatten_schema(block)
-                    
-                    # Nom nettoyé du site client
-                    client_name = clean_url_for_display(client_url)
-
-                    # Récupération HTML des concurrents
-                    competitor_schemas = []
-                    competitor_names = []
-                    
-                    for i, comp_url in enumerate(competitor_urls):
-                        if comp_url.strip():
-                            comp_html = fetch_html_from_url(comp_url)
-                            if comp_html:
-                                comp_data = extract_jsonld_schema(comp_html, comp_url)
-                                comp_schema = set()
-                                for block in comp_data:
-                                    comp_schema |= flatten_schema(block)
-                                competitor_schemas.append(comp_schema)
-                                # Utiliser l'URL nettoyée comme nom
-                                competitor_names.append(clean_url_for_display(comp_url))
-
-                    if competitor_schemas:
-                        st.success("✅ Analyse terminée !")
-                        st.header("📈 Résultat Comparatif")
-                        display_comparison_results(client_schema, competitor_schemas, competitor_names, client_name)
-                    else:
-                        st.warning("⚠️ Aucun concurrent n'a pu être analysé.")
+                st.session_state.url_analysis = analyze_urls(client_url, competitor_urls)
+
+    if JOB_RUNNER_AVAILABLE:
+        job = watch_job('url_analysis_job_id')
+        if job is not None:
+            show_job_messages(job)
+            st.session_state.url_analysis = job.result if job.status == 'done' else None
+
+    # Résultat gardé en session : il reste affiché après une interaction avec la page
+    url_analysis = st.session_state.get('url_analysis')
+    if url_analysis:
+        if url_analysis['competitor_schemas']:
+            st.success("✅ Analyse terminée !")
+            st.header("📈 Résultat Comparatif")
+            display_comparison_results(url_analysis['client_schema'], url_analysis['competitor_schemas'],
+                                       url_analysis['competitor_names'], url_analysis['client_name'])
+        else:
+            st.warning("⚠️ Aucun concurrent n'a pu être analysé.")
 
 # ========================
 # TAB 2: CODE HTML MANUEL
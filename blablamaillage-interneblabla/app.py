@@ -20,232 +20,84 @@ Date: 2025-11-04
 
 import streamlit as st
 import pandas as pd
-import zipfile
-import io
-import re
-import urllib.parse
-from collections import Counter
-from bs4 import BeautifulSoup, NavigableString
-from typing import Dict, List, Tuple, Optional, Any
-from functools import lru_cache
+import copy
+import os
+import sys
 
-# Gestion des dépendances optionnelles
-try:
-    import ahocorasick
-    AHO_CORASICK_AVAILABLE = True
-except ImportError:
-    AHO_CORASICK_AVAILABLE = False
-try:
-    import openpyxl
-    XLSX_EXPORT_AVAILABLE = True
-except ImportError:
-    XLSX_EXPORT_AVAILABLE = False
+# Modules partagés par les outils du hub (progress_reporter, job_runner), dans le répertoire parent
+HUB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if HUB_DIR not in sys.path: sys.path.append(HUB_DIR)
+
+from page_index import BLOCK_MODES, DEFAULT_BLOCK_MODE, DEFAULT_PARSER_BACKEND, available_parser_backends
+from page_store import store_uploaded_archive
+from page_order import DEFAULT_PAGE_ORDER, PAGE_ORDERS
+from progress_reporter import ProgressReporter
+from keyword_automaton import AHO_CORASICK_AVAILABLE, DEFAULT_MATCH_MODE, MATCH_MODES
+from opportunity_scanner import FUZZY_AVAILABLE
+from linking_analyzer import InternalLinkingAnalyzer, default_config
+from opportunities import NEW_OPPORTUNITY_LABEL
+from results_writer import EXCEL_MAX_ROWS, XLSX_EXPORT_AVAILABLE, export_results, new_results_path, read_results, summarize_results
+
+# Exécution de l'analyse en arrière-plan, fournie par le hub (absente si l'outil est copié sans le hub)
 try:
-    from fuzzywuzzy import fuzz
-    FUZZY_AVAILABLE = True
+    from job_runner import get_job_runner, show_job_messages, watch_job
+    JOB_RUNNER_AVAILABLE = True
 except ImportError:
-    FUZZY_AVAILABLE = False
+    JOB_RUNNER_AVAILABLE = False
+
+# Libellés des colonnes de résultats dans le tableau et les exports
+RESULT_LABELS = {'source_url': 'URL Source', 'target_url': 'Page à Mailler', 'anchor': 'Ancre de Lien', 'element_source': 'Élément Source', 'existing_link': 'Lien Existant', 'priority': 'Priorité', 'match_type': 'Type de Match', 'anchor_location': 'Source Ancre', 'source_outlinks': 'Liens Sortants (Source)', 'target_inlinks': 'Liens Entrants (Cible)', 'source_pagerank': 'PageRank Source'}
 
 # Configuration déjà faite dans app.py principal
 # st.set_page_config est appelé uniquement dans app.py pour éviter les conflits
 
-# --- CLASSE ANALYSEUR (Stable et complète) ---
-class InternalLinkingAnalyzer:
-    FRENCH_STOPWORDS = {
-        'a', 'à', 'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'elle', 'en', 'et', 'être', 'eu', 'il', 'je', 'la', 'le', 'les', 'leur', 'lui', 'ma', 'mais', 'me', 'même', 'mes', 'moi', 'mon', 'ne', 'nos', 'notre', 'nous', 'on', 'ont', 'ou', 'par', 'pas', 'pour', 'qu', 'que', 'qui', 'sa', 'se', 'ses', 'son', 'sur', 'ta', 'te', 'tes', 'toi', 'ton', 'tu', 'un', 'une', 'vos', 'votre', 'vous', 'c', 'd', 'j', 'l', 'à', 'm', 'n', 's', 't', 'y', 'été', 'étée', 'étées', 'étés', 'étant', 'suis', 'es', 'est', 'sommes', 'êtes', 'sont', 'serai', 'seras', 'sera', 'serons', 'serez', 'seront', 'serais', 'serait', 'serions', 'seriez', 'seraient', 'étais', 'était', 'étions', 'étiez', 'étaient', 'fus', 'fut', 'fûmes', 'fûtes', 'furent', 'sois', 'soit', 'soyons', 'soyez', 'soient', 'fusse', 'fusses', 'fût', 'fussions', 'fussiez', 'fussent', 'ayant', 'ayante', 'ayantes', 'ayants', 'eu', 'eue', 'eues', 'eus', 'ai', 'as', 'avons', 'avez', 'ont', 'aurai', 'auras', 'aura', 'aurons', 'aurez', 'auront', 'aurais', 'aurait', 'aurions', 'auriez', 'auraient', 'avais', 'avait', 'avions', 'aviez', 'avaient', 'eut', 'eûmes', 'eûtes', 'eurent', 'aie', 'aies', 'ait', 'ayons', 'ayez', 'aient', 'eusse', 'eusses', 'eût', 'eussions', 'eussiez', 'eussent', 'ceci', 'cela', 'celà', 'cet', 'cette', 'ici', 'ils', 'les', 'leurs', 'quel', 'quels', 'quelle', 'quelles', 'sans', 'soi'
-    }
-    CLASSIC_PAGE_PATTERNS = [
-        r'mentions[-_]?legales?', r'cgu', r'cgv', 'conditions', 'legal', 'a[-_]?propos', 'about', 'contact',
-        r'nous[-_]?contacter', r'politique[-_]?confidentialite', 'privacy', 'cookie', r'plan[-_]?site',
-        'sitemap', 'aide', 'help', 'faq', 'support', '404', 'erreur', r'recherche', 'search', 'connexion',
-        'login', 'inscription', 'register', 'panier', 'cart', 'commande', 'checkout', r'mon[-_]?compte', 'account'
-    ]
-    def __init__(self, config: Dict):
-        self.config = config
-        self.excel_data = None
-        
-    def load_excel_data(self, uploaded_file) -> bool:
-        try:
-            df = pd.read_csv(uploaded_file, on_bad_lines='skip') if uploaded_file.name.endswith('.csv') else pd.read_excel(uploaded_file)
-            df.columns = df.columns.str.lower().str.strip()
-            rename_map = {'pages': 'page', 'requête': 'query', 'clics': 'clicks', 'position moyenne': 'position'}
-            df = df.rename(columns=rename_map)
-            required_cols = ['page', 'query', 'clicks']
-            if not all(col in df.columns for col in required_cols):
-                st.error(f"Colonnes manquantes ! Requis: {', '.join(required_cols)}. Trouvé: {list(df.columns)}"); return False
-            df = df.dropna(subset=required_cols).copy()
-            df['clicks'] = pd.to_numeric(df['clicks'], errors='coerce')
-            if 'position' in df.columns: df['position'] = pd.to_numeric(df['position'], errors='coerce')
-            df.dropna(subset=['clicks'], inplace=True)
-            if 'query' in df.columns: df.dropna(subset=['query'], inplace=True)
-            if self.config['min_clicks'] > 0: df = df[df['clicks'] >= self.config['min_clicks']]
-            if 'position' in df.columns and self.config['max_position'] > 0: df = df[df['position'] <= self.config['max_position']]
-            if 'query' in df.columns: df = df[df['query'].str.len() >= self.config['min_keyword_length']]
-            if self.config['exclude_stopwords']: df = df[~df['query'].str.lower().isin(self.FRENCH_STOPWORDS)]
-            df['priority'] = df['clicks'] * (1 / df['position'].clip(lower=0.1)) if 'position' in df.columns else df['clicks']
-            self.excel_data = df
-            return True
-        except Exception as e:
-            st.error(f"Erreur lors du chargement du fichier GSC: {e}")
-            return False
-
-    @staticmethod
-    @lru_cache(maxsize=200_000)
-    def _normalize_url_for_comparison(url: str) -> str:
-        if not url: return ""
-        try:
-            url = url.lower()
-            url = re.sub(r'(\?|&)(utm_.*|gclid|fbclid)=[^&]*', '', url)
-            parsed = urllib.parse.urlparse(url)
-            netloc = parsed.netloc.replace('www.', '')
-            path = parsed.path.rstrip('/') or ''
-            query = '?' + urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parsed.query))) if parsed.query else ''
-            return f"{netloc}{path}{query}"
-        except: return url.lower()
-
-    def _is_classic_page(self, url: str) -> bool:
-        if not self.config.get('exclude_classic_pages', True): return False
-        for pattern in self.CLASSIC_PAGE_PATTERNS:
-            if re.search(pattern, url.lower()): return True
-        return False
-        
-    def _get_content_selectors(self) -> List[str]:
-        selectors = self.config.get('content_selectors', ['p', 'li', 'span']).copy()
-        if self.config.get('custom_class'):
-            selectors.append(f".{self.config['custom_class']}")
-        return selectors
-        
-    def detect_content_classes(self, zip_file_content: bytes) -> List[Tuple[str, int]]:
-        if not self.config.get('auto_detect_classes', True): return []
-        class_counter = Counter()
-        with zipfile.ZipFile(io.BytesIO(zip_file_content), 'r') as zip_ref:
-            html_files_info = [info for info in zip_ref.infolist() if info.filename.endswith('.html') and not info.is_dir()]
-            for file_info in html_files_info[:500]:
-                try:
-                    soup = BeautifulSoup(zip_ref.read(file_info.filename), 'html.parser')
-                    for element in soup.find_all(['div', 'section', 'article', 'main', 'p']):
-                        if element.get('class') and len(element.get_text(strip=True)) > 100:
-                            for cls in element.get('class'):
-                                if not cls.startswith(('js-', 'css-')): class_counter[cls] += 1
-                except Exception: continue
-        return class_counter.most_common(10)
-
-    @staticmethod
-    def _find_anchor_location(element: BeautifulSoup, anchor_text: str) -> str:
-        anchor_lower = anchor_text.lower()
-        for img in element.find_all('img', alt=True):
-            if anchor_lower in img['alt'].lower(): return "Attribut 'alt' (Image)"
-        if element.has_attr('title') and anchor_lower in element['title'].lower(): return "Attribut 'title'"
-        for child in element.find_all(title=True):
-             if anchor_lower in child['title'].lower(): return "Attribut 'title'"
-        return "Texte Principal"
+# --- FONCTIONS DE LIAISON (pour le cache Streamlit) ---
+def progress_bar_reporter(placeholder, label: str, total: int = 0) -> ProgressReporter:
+    """Barre de progression dans `placeholder`, mise à jour au plus quatre fois par seconde (débit et temps restant)"""
+    progress_bar = placeholder.progress(0, text=label)
+    return ProgressReporter(lambda fraction, text: progress_bar.progress(fraction, text=text), total, label)
 
-    def analyze_opportunities(self, zip_file_content: bytes, selected_keywords: Optional[List[str]]) -> List[Dict]:
-        if self.excel_data is None: return []
-        opportunities = []
-        selectors = self._get_content_selectors()
-        keyword_index = {}
-        working_data = self.excel_data.copy()
-        if selected_keywords: working_data = working_data[working_data['query'].isin(selected_keywords)]
-        for _, row in working_data.iterrows():
-            query = row['query'].lower().strip()
-            if query not in keyword_index or keyword_index[query]['priority'] < row['priority']:
-                keyword_index[query] = {'page': row['page'], 'priority': row['priority'], 'clicks': row['clicks'], 'original_query': row['query']}
-        if not keyword_index: return []
-        
-        A = None
-        run_fuzzy = self.config.get('use_fuzzy_matching', False)
-        if AHO_CORASICK_AVAILABLE:
-            A = ahocorasick.Automaton()
-            for keyword, data in keyword_index.items(): A.add_word(keyword, (keyword, data['original_query']))
-            A.make_automaton()
-        
-        with zipfile.ZipFile(io.BytesIO(zip_file_content), 'r') as zip_ref:
-            # L'indexation est rapide et mise en cache, on peut la refaire
-            canonical_map = {}
-            feedback_placeholder = st.empty()
-            feedback_placeholder.text("Création de l'index des pages HTML...")
-            all_zip_files = [info for info in zip_ref.infolist() if info.filename.endswith('.html') and not info.is_dir()]
-            map_progress = feedback_placeholder.progress(0)
-            for i, file_info in enumerate(all_zip_files):
-                if i % 100 == 0: map_progress.progress((i+1)/len(all_zip_files))
-                try:
-                    content = zip_ref.read(file_info.filename)
-                    soup = BeautifulSoup(content, 'html.parser', from_encoding='utf-8')
-                    canonical_link = soup.find('link', rel='canonical', href=True)
-                    if canonical_link:
-                        canonical_map[self._normalize_url_for_comparison(canonical_link['href'])] = file_info.filename
-                except Exception: continue
-            
-            source_urls_to_scan = self.excel_data['page'].unique()
-            max_pages = self.config.get('max_pages_to_analyze', len(source_urls_to_scan))
-            urls_to_process = source_urls_to_scan[:max_pages]
-            mapped_count = 0
-            
-            feedback_placeholder.text("Analyse des opportunités en cours...")
-            progress_bar = feedback_placeholder.progress(0)
-            
-            for i, source_url in enumerate(urls_to_process):
-                progress_bar.progress((i + 1) / len(urls_to_process), text=f"Analyse... {source_url[:80]}")
-                if self._is_classic_page(source_url): continue
-                normalized_source_key = self._normalize_url_for_comparison(source_url)
-                html_filename = canonical_map.get(normalized_source_key)
-                if not html_filename: continue
-                mapped_count += 1
-                try:
-                    html_content = zip_ref.read(html_filename).decode('utf-8', errors='ignore')
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    existing_links_normalized = {self._normalize_url_for_comparison(urllib.parse.urljoin(source_url, link.get('href'))) for link in soup.find_all('a', href=True) if link.get('href') and not link.get('href').startswith(('mailto:', 'tel:'))}
-                    for element in soup.select(', '.join(selectors)):
-                        text_content = element.get_text(" ", strip=True)
-                        if len(text_content) < self.config.get('min_keyword_length', 3): continue
-                        text_lower = text_content.lower()
-                        
-                        found_kws_in_element = set()
-                        if A:
-                            for _, (keyword, original_query) in A.iter(text_lower):
-                                if keyword in found_kws_in_element: continue
-                                found_kws_in_element.add(keyword)
-                                opportunity = self._create_opportunity(original_query, keyword_index[keyword], source_url, existing_links_normalized, 'exact', element)
-                                if opportunity: opportunities.append(opportunity)
-                        
-                        if run_fuzzy and FUZZY_AVAILABLE:
-                            for keyword, data in keyword_index.items():
-                                if keyword in found_kws_in_element: continue
-                                similarity = fuzz.token_set_ratio(keyword, text_lower)
-                                if similarity >= self.config.get('fuzzy_threshold', 85):
-                                    found_kws_in_element.add(keyword)
-                                    opportunity = self._create_opportunity(data['original_query'], data, source_url, existing_links_normalized, f'fuzzy ({similarity}%)', element)
-                                    if opportunity: opportunities.append(opportunity)
-                except Exception: continue
-            
-            feedback_placeholder.empty()
-            if len(urls_to_process) > 0:
-                st.info(f"Matching réussi : {mapped_count} sur {len(urls_to_process)} URLs GSC analysées ont été trouvées dans le fichier ZIP ({mapped_count/len(urls_to_process):.1%}).")
+def run_analysis(cfg, gsc_data, zip_path, zip_hash, selected_keywords, progress_factory, should_stop=None):
+    """Analyse complète, opportunités écrites dans un nouveau fichier de résultats ; retourne (analyseur, chemin, nombre d'opportunités)"""
+    analyzer = InternalLinkingAnalyzer(cfg, progress_factory, should_stop)
+    analyzer.excel_data = gsc_data
+    results_path = new_results_path()
+    return analyzer, results_path, analyzer.export_opportunities(zip_path, selected_keywords, results_path, zip_hash)
 
-        opportunities = [dict(t) for t in {tuple(d.items()) for d in opportunities}]
-        opportunities.sort(key=lambda x: x['priority'], reverse=True)
-        return opportunities
+def analysis_job(job, cfg, gsc_data, zip_path, zip_hash, selected_keywords):
+    """Tâche d'arrière-plan : l'avancement est remonté à la tâche, et l'annulation arrête l'analyse des pages"""
+    return run_analysis(cfg, gsc_data, zip_path, zip_hash, selected_keywords, lambda label, total=0: ProgressReporter(job.report, total, label), job.should_stop)
 
-    def _create_opportunity(self, anchor_text, target_data, source_url, existing_links_normalized, match_type, element) -> Optional[Dict]:
-        target_page_url = target_data['page']
-        normalized_source = self._normalize_url_for_comparison(source_url)
-        normalized_target = self._normalize_url_for_comparison(target_page_url)
-        if normalized_source == normalized_target: return None
-        link_exists = normalized_target in existing_links_normalized
-        anchor_location = self._find_anchor_location(element, anchor_text)
-        element_tag, classes = element.name, element.get('class', [])
-        class_str = f".{'.'.join(classes)}" if classes else ""
-        return {'source_url': source_url, 'target_url': target_page_url, 'anchor': anchor_text, 'priority': target_data['priority'], 'clicks': target_data['clicks'], 'match_type': match_type, 'element_source': f"<{element_tag}{class_str}>", 'existing_link': "[X] Lien présent" if link_exists else "[OK] Nouvelle opportunité", 'anchor_location': anchor_location}
+def show_analysis_results(analyzer, results_path, count, cancelled=False):
+    """Garde le fichier de résultats en session et affiche le bilan de l'analyse"""
+    st.session_state.results_path, st.session_state.results_count = results_path, count
+    mapped_count, analyzed_count = analyzer.match_stats
+    if analyzed_count > 0:
+        st.info(f"Matching réussi : {mapped_count} sur {analyzed_count} URLs GSC analysées ont été trouvées dans le fichier ZIP ({mapped_count/analyzed_count:.1%}).")
+    if analyzer.resumed_pages:
+        st.info(f"Analyse reprise : {analyzer.resumed_pages} pages déjà analysées par une analyse interrompue n'ont pas été réanalysées.")
+    scanned_pages, total_pages = analyzer.scan_stats
+    if cancelled:
+        resume = " Relancez l'analyse pour la reprendre là où elle s'est arrêtée." if analyzer.config.get('checkpoint', True) and not analyzer.config.get('incremental', False) else ""
+        st.warning(f"Analyse annulée : {scanned_pages} pages analysées sur {total_pages}. Les résultats sont partiels.{resume}")
+    elif analyzer.time_budget_reached:
+        st.warning(f"Budget de temps atteint : {scanned_pages} pages analysées sur {total_pages}. Les résultats sont partiels.")
+    if analyzer.incremental_stats and analyzer.incremental_stats['baseline']:
+        stats = analyzer.incremental_stats
+        st.info(f"Analyse incrémentale : {stats['changed_pages']} pages nouvelles ou modifiées réanalysées, {stats['unchanged_pages']} pages reprises de l'analyse précédente ({stats['changed_keywords']} mots-clés nouveaux ou modifiés recherchés).")
 
-# --- FONCTIONS DE LIAISON (pour le cache Streamlit) ---
 @st.cache_data
-def load_gsc_data_cached(uploaded_file, config):
+def load_gsc_data_cached(uploaded_files, config):
     analyzer = InternalLinkingAnalyzer(config)
-    if analyzer.load_excel_data(uploaded_file):
+    if analyzer.load_excel_data(uploaded_files):
         return analyzer.excel_data
+    st.error(analyzer.load_error)
     return None
 
+@st.cache_data
+def summarize_results_cached(results_path):
+    return summarize_results(results_path)
+
 # --- INTERFACE STREAMLIT ---
 def main():
     st.title("Maillage Interne SEO")
@@ -324,6 +176,7 @@ def main():
         **Étape 5 : Lancez l'analyse**
         - Cliquez sur "Lancer l'Analyse Complète"
         - L'outil va traiter vos données (cela peut prendre quelques minutes selon la taille)
+        - Depuis le hub, l'analyse tourne en arrière-plan : vous pouvez modifier la page pendant qu'elle avance, et l'annuler
         
         **Étape 6 : Exploitez les résultats**
         - Consultez le tableau des opportunités détectées
@@ -335,10 +188,11 @@ def main():
         - **[OK] Nouvelle opportunité** : Aucun lien n'existe, c'est une vraie opportunité de maillage
         - **[X] Lien présent** : Un lien existe déjà, pas d'action nécessaire
         - **Type de Match** : 
-          - `exact` : correspondance exacte du mot-clé
+          - `exact` : correspondance exacte du mot-clé (mots entiers, accents ignorés : « lit » ne correspond pas à « littérature »)
           - `fuzzy (X%)` : correspondance approximative (variante détectée)
         - **Source Ancre** : Indique où se trouve le texte d'ancre potentiel (texte principal, alt d'image, etc.)
-        - **Priorité** : Score calculé selon les clics et la position du mot-clé dans la GSC
+        - **Priorité** : Score calculé selon les clics et la position du mot-clé dans la GSC, pondéré par le PageRank interne de la page source si l'option est activée
+        - **Liens Sortants (Source) / Liens Entrants (Cible)** : nombre de liens internes de la page source et nombre de pages du site qui lient déjà la page cible (graphe des liens internes)
         
         ### Conseils d'optimisation
         
@@ -357,23 +211,24 @@ def main():
         **L'analyse est lente, comment l'accélérer ?**
         - Réduisez la "Limite de pages à analyser" dans la configuration
         - Installez `pyahocorasick` pour de meilleures performances
+        - Augmentez le nombre de "Processus parallèles" pour utiliser tous les cœurs de la machine
         - Désactivez l'analyse floue si vous n'en avez pas besoin
         
         **Que faire si je n'ai pas de balises canonical ?**
         - Cet outil nécessite des balises canonical pour fonctionner de manière fiable
+        - À défaut, la balise `og:url` est utilisée si elle est présente
         - Ajoutez-les à vos pages avant de lancer l'analyse
         """)
     
     if 'config' not in st.session_state:
-        st.session_state.config = {
-            'min_clicks': 0, 'min_keyword_length': 3, 'exclude_stopwords': True, 'exclude_classic_pages': True,
-            'content_selectors': ['p', 'li', 'span'], 'custom_class': '', 'max_position': 50,
-            'manual_keyword_selection': False, 'auto_detect_classes': True, 'max_pages_to_analyze': 10000,
-            'use_fuzzy_matching': False, 'fuzzy_threshold': 85
-        }
+        st.session_state.config = default_config()
     if 'gsc_data' not in st.session_state: st.session_state.gsc_data = None
-    if 'zip_content' not in st.session_state: st.session_state.zip_content = None
-    if 'results' not in st.session_state: st.session_state.results = None
+    # Seuls le chemin et le hash de l'archive sont gardés en session : le ZIP reste sur disque
+    if 'zip_path' not in st.session_state: st.session_state.zip_path = None
+    if 'zip_hash' not in st.session_state: st.session_state.zip_hash = None
+    if 'zip_upload_id' not in st.session_state: st.session_state.zip_upload_id = None
+    if 'results_path' not in st.session_state: st.session_state.results_path = None
+    if 'results_count' not in st.session_state: st.session_state.results_count = 0
     if 'detected_classes_list' not in st.session_state: st.session_state.detected_classes_list = []
     
     st.sidebar.header("Configuration")
@@ -384,9 +239,32 @@ def main():
     cfg['max_position'] = st.sidebar.number_input("Position max. SERPs", 0, 100, cfg.get('max_position', 50), help="Ignorer les mots-clés dont la position moyenne est au-delà de ce seuil (0 = pas de limite).")
     st.sidebar.subheader("Optimisation")
     cfg['max_pages_to_analyze'] = st.sidebar.number_input("Limite de pages à analyser (GSC)", 100, 500000, cfg.get('max_pages_to_analyze', 10000), help="Limite le nombre d'URLs GSC uniques à analyser pour accélérer le traitement sur de très gros sites.")
+    page_orders = list(PAGE_ORDERS)
+    current_order = cfg.get('page_order', DEFAULT_PAGE_ORDER)
+    cfg['page_order'] = st.sidebar.selectbox("Ordre des pages analysées", page_orders, page_orders.index(current_order) if current_order in page_orders else 0, format_func=PAGE_ORDERS.get, help="Avec une limite de pages ou de temps, les pages les mieux classées sont analysées en premier : total des clics ou des priorités de leurs requêtes GSC, ou PageRank interne (nécessite le graphe des liens internes).")
+    cfg['time_budget_seconds'] = 60 * st.sidebar.number_input("Budget de temps (minutes)", 0, 1440, int(cfg.get('time_budget_seconds', 0) // 60), help="Arrête l'analyse des pages après cette durée (0 = pas de limite) : les résultats portent sur les pages déjà analysées, les meilleures selon l'ordre choisi.")
+    parser_backends = available_parser_backends()
+    current_backend = cfg.get('parser_backend', DEFAULT_PARSER_BACKEND)
+    cfg['parser_backend'] = st.sidebar.selectbox("Moteur de parsing HTML", parser_backends, parser_backends.index(current_backend) if current_backend in parser_backends else 0, help="`lxml` et `selectolax` (moteurs en C) sont nettement plus rapides que `html.parser` sur les grosses archives. Installez `selectolax` pour le moteur le plus rapide.")
+    cfg['analysis_workers'] = st.sidebar.number_input("Processus parallèles", 1, os.cpu_count() or 1, min(cfg.get('analysis_workers', 1), os.cpu_count() or 1), help="Répartit l'analyse des pages sur plusieurs cœurs (1 = analyse séquentielle). Les résultats sont identiques quel que soit le nombre de processus.")
+    cfg['use_disk_cache'] = st.sidebar.checkbox("Cache disque (pages HTML et mots-clés)", cfg.get('use_disk_cache', True), help="Conserve l'index des pages parsées (par archive ZIP) et l'automate des mots-clés : relancer l'analyse avec d'autres filtres ou mots-clés ne reparse pas le HTML, et les mêmes mots-clés ne reconstruisent pas l'automate.")
+    cfg['checkpoint'] = st.sidebar.checkbox("Reprise après interruption", cfg.get('checkpoint', True), help="Enregistre régulièrement les pages déjà analysées : si l'analyse est interrompue (reconnexion, onglet fermé, budget de temps), la relancer avec les mêmes fichiers et la même configuration reprend là où elle s'était arrêtée.")
+    cfg['incremental'] = st.sidebar.checkbox("Analyse incrémentale", cfg.get('incremental', False), help="Garde le résultat de l'analyse par page : au crawl suivant du même site, seules les pages dont le fichier HTML a changé sont réanalysées, et seuls les mots-clés nouveaux ou modifiés sont recherchés dans les autres pages.")
+    cfg['build_link_graph'] = st.sidebar.checkbox("Graphe des liens internes", cfg.get('build_link_graph', True), help="Analyse les liens de toutes les pages de l'archive (une fois par archive avec le cache disque) pour afficher les liens entrants et sortants de chaque page.")
+    if cfg['build_link_graph']:
+        cfg['use_pagerank'] = st.sidebar.checkbox("Pondérer par le PageRank interne", cfg.get('use_pagerank', False), help="Calcule le PageRank interne des pages (une fois par archive) et l'intègre à la priorité : une page source qui reçoit beaucoup de liens internes transmet plus d'autorité à la page cible.")
+        if cfg['use_pagerank']:
+            cfg['pagerank_weight'] = st.sidebar.slider("Poids du PageRank", 0.0, 1.0, float(cfg.get('pagerank_weight', 0.5)), 0.05, help="0 = priorité GSC seule ; 1 = priorité GSC × PageRank relatif de la page source (1 = page moyenne).")
+    else: cfg['use_pagerank'] = False
+    cfg['top_k_per_source'] = st.sidebar.number_input("Opportunités max. par page source", 0, 10000, cfg.get('top_k_per_source', 0), help="Ne garde que les N opportunités les plus prioritaires de chaque page source (0 = pas de limite). Limite la mémoire utilisée sur les très gros sites.")
+    cfg['top_k_per_target'] = st.sidebar.number_input("Opportunités max. par page cible", 0, 10000, cfg.get('top_k_per_target', 0), help="Ne garde que les N opportunités les plus prioritaires vers chaque page à mailler (0 = pas de limite).")
     st.sidebar.subheader("Exclusions")
     cfg['exclude_stopwords'] = st.sidebar.checkbox("Exclure les stop words", cfg.get('exclude_stopwords', True), help="Exclut les mots vides courants (le, la, de, etc.) de l'analyse.")
     cfg['exclude_classic_pages'] = st.sidebar.checkbox("Exclure pages classiques", cfg.get('exclude_classic_pages', True), help="Exclut les pages comme 'contact', 'mentions légales', 'CGU', etc.")
+    st.sidebar.subheader("Correspondance Exacte")
+    match_modes = list(MATCH_MODES)
+    current_mode = cfg.get('exact_match_mode', DEFAULT_MATCH_MODE)
+    cfg['exact_match_mode'] = st.sidebar.selectbox("Mode de correspondance", match_modes, match_modes.index(current_mode) if current_mode in match_modes else 0, format_func=MATCH_MODES.get, help="« Mots entiers » ne retient que les expressions complètes, sans tenir compte des accents ni de la ponctuation. « Racines » trouve aussi les pluriels et flexions (« chaussures » pour « chaussure »), type de match `stem`, presque aussi vite : une alternative à l'analyse floue. « Sous-chaîne » reproduit l'ancien comportement (« lit » trouvé dans « littérature »).")
     st.sidebar.subheader("Analyse Floue")
     if FUZZY_AVAILABLE:
         cfg['use_fuzzy_matching'] = st.sidebar.checkbox("Activer l'analyse floue", cfg.get('use_fuzzy_matching', False), help="En plus de la recherche exacte, cherche des variations de mots-clés (pluriels, synonymes...). Rend l'analyse plus lente.")
@@ -399,6 +277,9 @@ def main():
     cfg['manual_keyword_selection'] = st.sidebar.checkbox("Sélection manuelle des mots-clés", cfg.get('manual_keyword_selection', False), help="Permet de choisir manuellement les mots-clés à analyser au lieu de tous les prendre.")
     cfg['auto_detect_classes'] = st.sidebar.checkbox("Détection auto des classes CSS", cfg.get('auto_detect_classes', True), help="Analyse le HTML pour trouver les classes CSS contenant le plus de texte.")
     cfg['content_selectors'] = st.sidebar.multiselect("Sélecteurs de contenu", ['p', 'li', 'span', 'div', 'h1', 'h2', 'h3'], cfg.get('content_selectors', ['p', 'li', 'span']), help="Balises HTML dans lesquelles chercher les opportunités.")
+    block_modes = list(BLOCK_MODES)
+    current_block_mode = cfg.get('block_mode', DEFAULT_BLOCK_MODE)
+    cfg['block_mode'] = st.sidebar.selectbox("Découpage du texte", block_modes, block_modes.index(current_block_mode) if current_block_mode in block_modes else 0, format_func=BLOCK_MODES.get, help="« Segments » attribue chaque texte à l'élément sélectionné le plus proche (un `<span>` dans un `<p>` n'est scanné qu'une fois, comme `<span>`) ; une expression à cheval sur un élément sélectionné imbriqué (« vélo <span>électrique</span> ») n'est alors pas trouvée. « Éléments complets » reproduit l'ancien comportement : le texte des éléments imbriqués est aussi scanné dans leurs parents.")
     if st.session_state.detected_classes_list:
         selected_class = st.sidebar.selectbox("Utiliser une classe CSS détectée ?", options=[''] + st.session_state.detected_classes_list, help="Cible l'analyse sur une classe CSS spécifique trouvée lors de la détection automatique.")
         cfg['custom_class'] = selected_class
@@ -408,21 +289,27 @@ def main():
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Données Google Search Console")
-        excel_file = st.file_uploader("Uploadez votre fichier Excel/CSV", type=['xlsx', 'xls', 'csv'])
-        if excel_file:
-            st.session_state.gsc_data = load_gsc_data_cached(excel_file, cfg)
-            if st.session_state.gsc_data is not None: st.success(f"Données GSC chargées: {len(st.session_state.gsc_data)} lignes.")
+        excel_files = st.file_uploader("Uploadez vos fichiers Excel/CSV", type=['xlsx', 'xls', 'csv'], accept_multiple_files=True, help="Plusieurs exports d'une même propriété sont fusionnés (doublons page/requête supprimés).")
+        if excel_files:
+            st.session_state.gsc_data = load_gsc_data_cached(excel_files, cfg)
+            if st.session_state.gsc_data is not None: st.success(f"Données GSC chargées: {len(st.session_state.gsc_data)} lignes ({len(excel_files)} fichier(s)).")
     with col2:
         st.subheader("Fichiers HTML")
         if st.session_state.gsc_data is not None:
             zip_file = st.file_uploader("Uploadez le fichier ZIP HTML", type=['zip'])
             if zip_file:
-                st.session_state.zip_content = zip_file.getvalue()
-                st.success(f"Fichier ZIP chargé ({len(st.session_state.zip_content)/1e6:.2f} MB).")
+                upload_id = getattr(zip_file, 'file_id', None) or (zip_file.name, zip_file.size)
+                if st.session_state.zip_upload_id != upload_id or not st.session_state.zip_path or not os.path.exists(st.session_state.zip_path):
+                    with st.spinner("Enregistrement de l'archive sur disque..."):
+                        st.session_state.zip_path, st.session_state.zip_hash = store_uploaded_archive(zip_file)
+                    st.session_state.zip_upload_id = upload_id
+                st.success(f"Fichier ZIP chargé ({os.path.getsize(st.session_state.zip_path)/1e6:.2f} MB).")
                 if cfg['auto_detect_classes'] and not st.session_state.detected_classes_list:
                     with st.spinner("Détection des classes CSS..."):
                         analyzer = InternalLinkingAnalyzer(cfg)
-                        st.session_state.detected_classes_list = [cls for cls, _ in analyzer.detect_content_classes(st.session_state.zip_content)]
+                        detection_placeholder = st.empty()
+                        st.session_state.detected_classes_list = [cls for cls, _ in analyzer.detect_content_classes(st.session_state.zip_path, progress_bar_reporter(detection_placeholder, "Détection des classes CSS"))]
+                        detection_placeholder.empty()
                         if st.session_state.detected_classes_list: st.rerun()
         else: st.info("Veuillez d'abord charger les données Excel.")
 
@@ -432,46 +319,85 @@ def main():
         available_keywords = sorted(st.session_state.gsc_data['query'].unique().tolist())
         selected_keywords = st.multiselect("Sélectionnez les mots-clés:", options=available_keywords)
     
-    if st.session_state.gsc_data is not None and st.session_state.zip_content is not None:
-        can_analyze = not cfg['manual_keyword_selection'] or (cfg['manual_keyword_selection'] and selected_keywords is not None)
+    if st.session_state.gsc_data is not None and st.session_state.zip_path is not None:
+        can_analyze = not cfg['manual_keyword_selection'] or bool(selected_keywords)
         if can_analyze:
-            if st.button("Lancer l'Analyse Complète", type="primary", use_container_width=True):
-                analyzer = InternalLinkingAnalyzer(cfg)
-                analyzer.excel_data = st.session_state.gsc_data
-                st.session_state.results = analyzer.analyze_opportunities(st.session_state.zip_content, selected_keywords)
+            if st.button("Lancer l'Analyse Complète", type="primary", use_container_width=True, disabled=bool(st.session_state.get('analysis_job_id'))):
+                # Opportunités écrites par lots sur disque : la session ne garde que le chemin du fichier
+                analysis_args = (copy.deepcopy(cfg), st.session_state.gsc_data, st.session_state.zip_path, st.session_state.zip_hash, selected_keywords)
+                if JOB_RUNNER_AVAILABLE:
+                    # Analyse en arrière-plan : les interactions avec la page ne l'interrompent pas
+                    st.session_state.analysis_job_id = get_job_runner().submit("Analyse du maillage interne", analysis_job, *analysis_args).id
+                else:
+                    feedback_placeholder = st.empty()
+                    result = run_analysis(*analysis_args, lambda label, total=0: progress_bar_reporter(feedback_placeholder, label, total))
+                    feedback_placeholder.empty()
+                    show_analysis_results(*result)
         elif cfg['manual_keyword_selection']:
             st.warning("Veuillez sélectionner au moins un mot-clé pour lancer l'analyse.")
 
-    if st.session_state.results is not None:
-        if st.session_state.results:
-            df_display = pd.DataFrame(st.session_state.results).rename(columns={'source_url': 'URL Source', 'target_url': 'Page à Mailler', 'anchor': 'Ancre de Lien', 'element_source': 'Élément Source', 'existing_link': 'Lien Existant', 'priority': 'Priorité', 'match_type': 'Type de Match', 'anchor_location': 'Source Ancre'})
+    # Analyse en cours suivie quels que soient les réglages affichés : son avancement, son annulation et son résultat restent accessibles
+    if JOB_RUNNER_AVAILABLE:
+        job = watch_job('analysis_job_id')
+        if job is not None:
+            show_job_messages(job)
+            if job.result is not None: show_analysis_results(*job.result, cancelled=job.status == 'cancelled')
+
+    if st.session_state.results_path is not None:
+        results_path = st.session_state.results_path
+        if st.session_state.results_count and os.path.exists(results_path):
+            total_ops = st.session_state.results_count
             st.header("Résultats de l'Analyse")
-            st.dataframe(df_display[['URL Source', 'Ancre de Lien', 'Source Ancre', 'Page à Mailler', 'Élément Source', 'Type de Match', 'Lien Existant', 'Priorité']], use_container_width=True, column_config={"URL Source": st.column_config.LinkColumn(), "Page à Mailler": st.column_config.LinkColumn()})
+            # Seule la page affichée est lue dans le fichier de résultats
+            col_page1, col_page2 = st.columns([1, 3])
+            page_size = col_page1.selectbox("Lignes par page", [50, 100, 500, 1000], 1)
+            page_count = (total_ops - 1) // page_size + 1
+            page_number = col_page2.number_input(f"Page (sur {page_count})", 1, page_count, 1)
+            offset = (page_number - 1) * page_size
+            df_display = read_results(results_path, offset, page_size).rename(columns=RESULT_LABELS)
+            display_columns = ['URL Source', 'Ancre de Lien', 'Source Ancre', 'Page à Mailler', 'Élément Source', 'Type de Match', 'Lien Existant', 'Priorité']
+            display_columns += [col for col in ['Liens Sortants (Source)', 'Liens Entrants (Cible)', 'PageRank Source'] if col in df_display.columns]
+            st.dataframe(df_display[display_columns], use_container_width=True, column_config={"URL Source": st.column_config.LinkColumn(), "Page à Mailler": st.column_config.LinkColumn()})
+            st.caption(f"Opportunités {offset + 1} à {min(offset + page_size, total_ops)} sur {total_ops}")
             st.subheader("Export des Résultats")
+            # Fichiers à télécharger créés à la demande (par morceaux) ; le bouton de téléchargement, lui, charge le fichier entier en mémoire
             col_export1, col_export2 = st.columns(2)
             with col_export1:
-                st.download_button("Télécharger CSV", df_display.to_csv(index=False, encoding='utf-8-sig'), "opportunites_maillage.csv", "text/csv", use_container_width=True)
+                csv_path = results_path + '.export.csv'
+                if os.path.exists(csv_path):
+                    with open(csv_path, 'rb') as csv_file:
+                        st.download_button("Télécharger CSV", csv_file, "opportunites_maillage.csv", "text/csv", use_container_width=True)
+                    st.caption("Le fichier proposé au téléchargement est chargé entièrement en mémoire : pour un très gros site, utilisez plutôt la ligne de commande (`maillage_cli.py`).")
+                elif st.button("Préparer l'export CSV", use_container_width=True):
+                    with st.spinner("Préparation de l'export CSV..."): export_results(results_path, csv_path, 'csv', RESULT_LABELS)
+                    st.rerun()
             with col_export2:
                 if XLSX_EXPORT_AVAILABLE:
-                    output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer: df_display.to_excel(writer, index=False, sheet_name='Opportunités')
-                    st.download_button("Télécharger Excel (.xlsx)", output.getvalue(), "opportunites_maillage.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", use_container_width=True)
+                    xlsx_path = results_path + '.export.xlsx'
+                    if os.path.exists(xlsx_path):
+                        with open(xlsx_path, 'rb') as xlsx_file:
+                            st.download_button("Télécharger Excel (.xlsx)", xlsx_file, "opportunites_maillage.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", use_container_width=True)
+                    elif st.button("Préparer l'export Excel (.xlsx)", use_container_width=True):
+                        with st.spinner("Préparation de l'export Excel..."): export_results(results_path, xlsx_path, 'xlsx', RESULT_LABELS)
+                        st.rerun()
+                    if total_ops > EXCEL_MAX_ROWS: st.caption(f"L'export Excel est limité aux {EXCEL_MAX_ROWS} premières opportunités : utilisez le CSV pour l'ensemble.")
                 else: st.warning("Pour l'export Excel, installez `openpyxl`", icon="⚠️")
             st.divider()
             st.header("Tableau de Bord de l'Analyse")
-            total_ops, new_ops = len(df_display), len(df_display[df_display['Lien Existant'] == '[OK] Nouvelle opportunité'])
+            summary = summarize_results_cached(results_path)
+            new_ops = summary['existing_link'].get(NEW_OPPORTUNITY_LABEL, 0)
             col_metric1, col_metric2, col_metric3 = st.columns(3)
             col_metric1.metric("Opportunités Totales", total_ops)
-            if total_ops > 0:
-                col_metric2.metric("Nouvelles Opportunités [OK]", new_ops, f"{new_ops/total_ops:.1%}")
-                col_metric3.metric("Liens Déjà Présents [X]", total_ops - new_ops, f"{(total_ops - new_ops)/total_ops:.1%}")
+            col_metric2.metric("Nouvelles Opportunités [OK]", new_ops, f"{new_ops/total_ops:.1%}")
+            col_metric3.metric("Liens Déjà Présents [X]", total_ops - new_ops, f"{(total_ops - new_ops)/total_ops:.1%}")
+            counts_chart = lambda counts: st.bar_chart(pd.Series(dict(counts)))
             col_graph1, col_graph2 = st.columns(2)
             with col_graph1:
-                st.write("**Top 10 Pages Sources d'Opportunités**"); st.bar_chart(df_display['URL Source'].value_counts().head(10))
-                st.write("**Distribution par Type de Match**"); st.bar_chart(df_display['Type de Match'].value_counts())
+                st.write("**Top 10 Pages Sources d'Opportunités**"); counts_chart(summary['top_sources'])
+                st.write("**Distribution par Type de Match**"); counts_chart(summary['match_types'])
             with col_graph2:
-                st.write("**Top 10 Pages Cibles (à mailler)**"); st.bar_chart(df_display['Page à Mailler'].value_counts().head(10))
-                st.write("**Distribution par Source de l'Ancre**"); st.bar_chart(df_display['Source Ancre'].value_counts())
+                st.write("**Top 10 Pages Cibles (à mailler)**"); counts_chart(summary['top_targets'])
+                st.write("**Distribution par Source de l'Ancre**"); counts_chart(summary['anchor_locations'])
         else:
             st.warning("Aucune opportunité trouvée avec la configuration actuelle.")
             
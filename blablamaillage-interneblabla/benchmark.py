@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks - Maillage Interne
+=============================
+
+Mesures de performance de l'analyseur sur une archive ZIP de crawl réelle.
+
+Usage:
+    python benchmark.py parsers export_html.zip --limit 2000
+    python benchmark.py automaton export_html.zip export_gsc.csv --limit 2000
+"""
+
+import argparse
+import sys
+import time
+import zipfile
+from typing import List
+
+import pandas as pd
+
+from keyword_index import KeywordIndex
+from keyword_automaton import MATCH_MODES, build_automaton, iter_keyword_matches
+from page_index import available_parser_backends, list_html_members, parse_page
+
+
+def bench_parsers(zip_path: str, selectors: List[str], limit: int) -> None:
+    """Pages/seconde de chaque moteur de parsing sur les mêmes fichiers de l'archive"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = list_html_members(zip_ref)[:limit or None]
+        contents = [(info.filename, zip_ref.read(info.filename)) for info in members]
+    print(f"{len(contents)} fichiers HTML, sélecteurs: {', '.join(selectors)}")
+    print(f"{'Moteur':<14}{'Pages/s':>10}{'Durée (s)':>12}{'Canonicals':>12}{'Blocs':>10}{'Liens':>10}")
+    for backend in available_parser_backends():
+        canonicals = blocks = links = 0
+        start = time.perf_counter()
+        for filename, content in contents:
+            try:
+                page = parse_page(content, filename, selectors, backend)
+            except Exception:
+                continue
+            if page:
+                canonicals += 1
+                blocks += len(page.blocks)
+                links += len(page.links)
+        elapsed = time.perf_counter() - start
+        rate = len(contents) / elapsed if elapsed else 0.0
+        print(f"{backend:<14}{rate:>10.1f}{elapsed:>12.2f}{canonicals:>12}{blocks:>10}{links:>10}")
+
+
+def _load_queries(gsc_path: str) -> List[str]:
+    df = pd.read_csv(gsc_path, on_bad_lines='skip') if gsc_path.endswith('.csv') else pd.read_excel(gsc_path)
+    df.columns = df.columns.str.lower().str.strip()
+    df = df.rename(columns={'requête': 'query'})
+    return sorted({str(query).lower().strip() for query in df['query'].dropna()})
+
+
+def bench_automaton(zip_path: str, gsc_path: str, selectors: List[str], limit: int) -> None:
+    """Nombre de correspondances et durée de chaque mode de l'automate sur les mêmes blocs de texte"""
+    queries = _load_queries(gsc_path)
+    keyword_index = KeywordIndex(queries, [''] * len(queries), [0.0] * len(queries), [0] * len(queries), queries)
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        texts = []
+        for info in list_html_members(zip_ref)[:limit or None]:
+            try:
+                page = parse_page(zip_ref.read(info.filename), info.filename, selectors)
+            except Exception:
+                continue
+            if page: texts.extend(block.text.lower() for block in page.blocks)
+    print(f"{len(queries)} mots-clés, {len(texts)} blocs de texte")
+    print(f"{'Mode':<34}{'Construction (s)':>18}{'Scan (s)':>10}{'Correspondances':>17}{'Blocs/s':>10}")
+    for mode, label in MATCH_MODES.items():
+        start = time.perf_counter()
+        automaton = build_automaton(keyword_index, mode)
+        built = time.perf_counter()
+        matches = sum(1 for text in texts for _ in iter_keyword_matches(automaton, text, mode)) if automaton else 0
+        elapsed = time.perf_counter() - built
+        rate = len(texts) / elapsed if elapsed else 0.0
+        print(f"{label:<34}{built - start:>18.2f}{elapsed:>10.2f}{matches:>17}{rate:>10.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de l'analyseur de maillage interne")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    parsers_cmd = subparsers.add_parser('parsers', help="Compare les moteurs de parsing HTML (pages/s)")
+    parsers_cmd.add_argument('zip_path', help="Archive ZIP des pages HTML")
+    parsers_cmd.add_argument('--selectors', default='p,li,span', help="Sélecteurs de contenu, séparés par des virgules")
+    parsers_cmd.add_argument('--limit', type=int, default=0, help="Nombre maximum de fichiers (0 = tous)")
+    automaton_cmd = subparsers.add_parser('automaton', help="Compare les modes de correspondance exacte (mots entiers / racines / sous-chaîne)")
+    automaton_cmd.add_argument('zip_path', help="Archive ZIP des pages HTML")
+    automaton_cmd.add_argument('gsc_path', help="Export GSC (CSV ou Excel) contenant une colonne Query/Requête")
+    automaton_cmd.add_argument('--selectors', default='p,li,span', help="Sélecteurs de contenu, séparés par des virgules")
+    automaton_cmd.add_argument('--limit', type=int, default=0, help="Nombre maximum de fichiers (0 = tous)")
+    args = parser.parse_args()
+
+    selectors = [sel.strip() for sel in args.selectors.split(',') if sel.strip()]
+    if args.command == 'parsers':
+        bench_parsers(args.zip_path, selectors, args.limit)
+    elif args.command == 'automaton':
+        bench_automaton(args.zip_path, args.gsc_path, selectors, args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
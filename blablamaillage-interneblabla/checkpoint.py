@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Points de reprise de l'analyse - Maillage Interne
+=================================================
+
+Une analyse de plusieurs heures ne doit pas repartir de zéro si la session
+Streamlit est interrompue (reconnexion, onglet fermé) ou si le processus est
+arrêté. Au fil de l'analyse, `AnalysisCheckpoint` enregistre dans une base SQLite
+locale les pages sources analysées et leurs opportunités, par lots, au plus tard
+toutes les `CHECKPOINT_INTERVAL` secondes.
+
+Un point de reprise est identifié par le hash de l'archive, le hash des données
+GSC chargées, la configuration de l'analyse et les mots-clés sélectionnés : une
+analyse relancée à l'identique reprend les opportunités des pages déjà analysées
+et n'analyse que les suivantes. Le point de reprise est supprimé quand toutes les
+pages ont été analysées ; il est gardé si l'analyse s'arrête avant (budget de
+temps écoulé, annulation), et l'analyse suivante continue là où elle s'est arrêtée.
+
+Seul l'ordre de découverte des opportunités, qui départage les priorités égales,
+peut différer de celui d'une analyse sans interruption.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from page_store import DEFAULT_CACHE_DIR, prune_directory
+from opportunities import Opportunity
+
+CHECKPOINT_VERSION = 1
+# Délai maximal (secondes) entre deux enregistrements : une interruption fait perdre au plus ce temps d'analyse
+CHECKPOINT_INTERVAL = 30.0
+# Nombre de points de reprise conservés (les plus anciens sont supprimés)
+MAX_CHECKPOINTS = 5
+# Options de configuration sans effet sur les opportunités trouvées
+RUNTIME_KEYS = ('analysis_workers', 'use_disk_cache', 'time_budget_seconds', 'checkpoint', 'auto_detect_classes')
+_ERRORS = (sqlite3.Error, OSError, pickle.PickleError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, opportunities BLOB NOT NULL);
+"""
+
+
+def gsc_data_hash(gsc_data: pd.DataFrame) -> str:
+    """Hash SHA-256 des données GSC chargées (colonnes et valeurs, après filtrage)"""
+    digest = hashlib.sha256(json.dumps([str(column) for column in gsc_data.columns]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(gsc_data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def checkpoint_key(archive: str, gsc_hash: str, config: Dict, selected_keywords: Optional[Sequence[str]] = None) -> str:
+    """Identifiant d'un point de reprise : archive, données GSC, configuration de l'analyse et mots-clés sélectionnés"""
+    values = {key: value for key, value in config.items() if key not in RUNTIME_KEYS}
+    values.update(archive=archive, gsc=gsc_hash, keywords=sorted(selected_keywords) if selected_keywords is not None else None, version=CHECKPOINT_VERSION)
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:32]
+
+
+class AnalysisCheckpoint:
+    """Pages analysées et leurs opportunités, enregistrées au fil de l'analyse pour la reprendre après une interruption"""
+
+    __slots__ = ('path', 'interval', '_pending', '_last_flush', '_disabled')
+
+    def __init__(self, key: str, checkpoint_dir: Optional[str] = None, interval: float = CHECKPOINT_INTERVAL):
+        checkpoint_dir = checkpoint_dir or os.path.join(DEFAULT_CACHE_DIR, 'checkpoints')
+        self.path = os.path.join(checkpoint_dir, f"{key}.sqlite")
+        self.interval = interval
+        self._pending: List[Tuple[str, bytes]] = []
+        self._last_flush = time.monotonic()
+        # Le point de reprise est facultatif : une erreur d'écriture le désactive pour le reste de l'analyse
+        self._disabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion par opération : aucune connexion ouverte n'est héritée par les processus d'analyse
+        connection = sqlite3.connect(self.path)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def completed(self) -> Iterator[Tuple[str, List[Opportunity]]]:
+        """(clé de page, opportunités) des pages déjà analysées, dans l'ordre d'enregistrement"""
+        if self._disabled or not os.path.exists(self.path): return
+        try:
+            connection = self._connect()
+            try:
+                rows = connection.execute("SELECT key, opportunities FROM pages ORDER BY rowid").fetchall()
+            finally: connection.close()
+        except _ERRORS: return
+        for key, blob in rows:
+            try: yield key, pickle.loads(blob)
+            except Exception: continue
+
+    def add(self, key: str, opportunities: List[Opportunity]) -> None:
+        """Ajoute une page analysée ; les pages en attente sont enregistrées toutes les `interval` secondes"""
+        if self._disabled: return
+        self._pending.append((key, pickle.dumps(opportunities, protocol=pickle.HIGHEST_PROTOCOL)))
+        if time.monotonic() - self._last_flush >= self.interval: self.flush()
+
+    def flush(self) -> None:
+        """Enregistre les pages en attente"""
+        self._last_flush = time.monotonic()
+        if self._disabled or not self._pending: return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = self._connect()
+            try:
+                with connection: connection.executemany("INSERT OR REPLACE INTO pages (key, opportunities) VALUES (?, ?)", self._pending)
+            finally: connection.close()
+            self._pending.clear()
+            prune_directory(os.path.dirname(self.path), '.sqlite', MAX_CHECKPOINTS, ('-journal',))
+        except _ERRORS: self._disabled = True
+
+    def discard(self) -> None:
+        """Supprime le point de reprise (analyse terminée)"""
+        self._pending.clear()
+        for suffix in ('', '-journal'):
+            try: os.remove(self.path + suffix)
+            except OSError: pass
+
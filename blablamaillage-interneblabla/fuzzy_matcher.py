@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de correspondance floue - Maillage Interne
+=================================================
+
+Remplace la boucle « chaque mot-clé × chaque élément » de `fuzz.token_set_ratio`
+par une recherche indexée, avec exactement le même score et le même seuil :
+
+1. Index inversé des tokens des mots-clés : seuls les mots-clés partageant au moins
+   un token avec le texte, ou dont la longueur rend le seuil atteignable sans token
+   commun (« chaussure » / « chaussures »), sont candidats. Les autres ne peuvent
+   pas atteindre le seuil et ne sont jamais évalués.
+2. Les candidats sont évalués en lot par `rapidfuzz` (C++), qui calcule les mêmes
+   ratios que `fuzzywuzzy` sans les arrondir. Le score affiché (`fuzzy (NN%)`) est
+   l'arrondi de ce ratio ; seuls les cas ambigus (ratio à ~x,5) sont recalculés avec
+   `fuzzywuzzy`, pour garantir des valeurs identiques au mode historique.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Collection, Dict, FrozenSet, List, Set, Tuple
+
+# Gestion des dépendances optionnelles
+try:
+    from fuzzywuzzy import fuzz
+    FUZZY_AVAILABLE = True
+except ImportError:
+    FUZZY_AVAILABLE = False
+try:
+    from rapidfuzz import fuzz as rapid_fuzz, process as rapid_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Prétraitement identique à fuzzywuzzy.utils.full_process(s, force_ascii=True) ; la suppression des caractères
+# Latin-1 par expression régulière est bien plus rapide que `str.translate` sur un texte accentué
+_LATIN1_RE = re.compile('[\x80-\xff]+')
+_NON_WORD_RE = re.compile(r"(?ui)\W")
+_WORD_RE = re.compile(r"\w+")
+
+
+def drop_latin1(text: str) -> str:
+    """Texte sans ses caractères Latin-1 non ASCII (dont les lettres accentuées), première étape de `process_for_fuzzy`"""
+    return _LATIN1_RE.sub('', text)
+
+
+def process_for_fuzzy(text: str) -> str:
+    """Normalise un texte comme `fuzz.token_set_ratio` le fait avant de découper en tokens"""
+    return _NON_WORD_RE.sub(" ", drop_latin1(text)).lower().strip()
+
+
+def fuzzy_tokens(text: str) -> Set[str]:
+    """Tokens de `process_for_fuzzy(text)`, sans construire le texte normalisé"""
+    return set(map(str.lower, _WORD_RE.findall(drop_latin1(text))))
+
+
+def _token_set_length(tokens: Collection[str]) -> int:
+    # Longueur de " ".join(sorted(tokens)), sans construire la chaîne
+    return sum(map(len, tokens)) + len(tokens) - 1 if tokens else 0
+
+
+class FuzzyMatcher:
+    """Recherche floue indexée des mots-clés dans un texte (sémantique de `fuzz.token_set_ratio`)"""
+
+    def __init__(self, keywords: List[str], threshold: int):
+        self.keywords = keywords
+        self.threshold = threshold
+        self._processed: List[str] = []
+        self._token_index: Dict[str, List[int]] = {}
+        by_length = []
+        for keyword_id, keyword in enumerate(keywords):
+            processed = process_for_fuzzy(keyword)
+            self._processed.append(processed)
+            tokens = set(processed.split())
+            # Un mot-clé vide après normalisation a toujours un score de 0
+            if not tokens: continue
+            for token in tokens: self._token_index.setdefault(token, []).append(keyword_id)
+            by_length.append((_token_set_length(tokens), keyword_id))
+        by_length.sort()
+        self._lengths = [length for length, _ in by_length]
+        self._length_ids = [keyword_id for _, keyword_id in by_length]
+        # Sans token commun, le score vaut ratio(tokens du mot-clé, tokens du texte) <= 2*min(l1, l2)/(l1 + l2).
+        # Un point de marge couvre l'arrondi du score final.
+        self._min_ratio = max(threshold - 1, 1) / 100
+
+    def _length_window(self, text_tokens: Set[str]) -> Tuple[int, int]:
+        # Bornes (dans `_lengths`) des mots-clés assez proches en longueur pour atteindre le seuil sans token commun
+        text_length = _token_set_length(text_tokens)
+        p = self._min_ratio
+        return bisect_left(self._lengths, text_length * p / (2 - p)), bisect_right(self._lengths, text_length * (2 - p) / p)
+
+    def _candidates(self, text_tokens: Set[str]) -> Set[int]:
+        candidates = set()
+        for token in text_tokens:
+            candidates.update(self._token_index.get(token, ()))
+        low, high = self._length_window(text_tokens)
+        candidates.update(self._length_ids[low:high])
+        return candidates
+
+    @property
+    def vocabulary(self) -> FrozenSet[str]:
+        """Tokens des mots-clés (normalisés par `process_for_fuzzy`)"""
+        return frozenset(self._token_index)
+
+    def has_candidates(self, text_tokens: Set[str]) -> bool:
+        """Vrai si au moins un mot-clé serait évalué pour ces tokens (texte normalisé par `process_for_fuzzy`)"""
+        if not text_tokens: return False
+        if not self._token_index.keys().isdisjoint(text_tokens): return True
+        low, high = self._length_window(text_tokens)
+        return high > low
+
+    def match(self, text_lower: str, exclude: Collection[int] = ()) -> List[Tuple[int, int]]:
+        """
+        Retourne les (position du mot-clé, score) dont le score atteint le seuil, dans l'ordre des mots-clés.
+        Les positions de `exclude` (mots-clés déjà trouvés en correspondance exacte) sont ignorées.
+        """
+        processed_text = process_for_fuzzy(text_lower)
+        text_tokens = set(processed_text.split())
+        if not text_tokens: return []
+        candidates = [keyword_id for keyword_id in self._candidates(text_tokens) if keyword_id not in exclude]
+        if not candidates: return []
+        if not RAPIDFUZZ_AVAILABLE:
+            scored = ((keyword_id, fuzz.token_set_ratio(self.keywords[keyword_id], text_lower)) for keyword_id in sorted(candidates))
+            return [(keyword_id, similarity) for keyword_id, similarity in scored if similarity >= self.threshold]
+        # Évaluation en lot (C++), sur les chaînes déjà normalisées
+        choices = {keyword_id: self._processed[keyword_id] for keyword_id in candidates}
+        results = rapid_process.extract(processed_text, choices, scorer=rapid_fuzz.token_set_ratio, processor=None,
+                                        score_cutoff=self.threshold - 1, limit=None)
+        matches = []
+        for _, score, keyword_id in sorted(results, key=lambda result: result[2]):
+            # Arrondi à l'entier le plus proche, comme fuzzywuzzy ; un ratio à ~x,5 est recalculé à l'identique
+            similarity = fuzz.token_set_ratio(self.keywords[keyword_id], text_lower) if abs(score % 1 - 0.5) < 1e-6 else int(round(score))
+            if similarity >= self.threshold: matches.append((keyword_id, similarity))
+        return matches
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chargement des exports GSC - Maillage Interne
+=============================================
+
+Lit un ou plusieurs exports Google Search Console (CSV ou Excel) d'une même
+propriété et retourne les lignes utiles à l'analyse (colonnes page, query,
+clicks, position si présente, priority).
+
+Un CSV est lu par morceaux, en ne gardant que les colonnes utiles, avec des types
+explicites ; les filtres (clics minimum, position maximale, longueur et mots vides)
+sont appliqués à chaque morceau, avant la concaténation. Le moteur CSV de
+`pyarrow` (optionnel, multi-thread) est utilisé s'il est installé, sinon celui de
+pandas. Les colonnes page et query sont converties en `category` dans chaque morceau,
+dès son filtrage : les morceaux ne sont jamais réunis avec des colonnes de chaînes.
+
+Plusieurs exports sont fusionnés : une ligne (page, requête) présente dans
+plusieurs fichiers n'est gardée qu'une fois (celle du premier fichier).
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import os
+from typing import BinaryIO, Collection, Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Gestion des dépendances optionnelles
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_CSV_AVAILABLE = True
+except ImportError:
+    PYARROW_CSV_AVAILABLE = False
+
+# Fichier GSC : chemin ou fichier uploadé (objet avec un attribut `name`)
+GSCSource = Union[str, BinaryIO]
+
+COLUMN_ALIASES = {'pages': 'page', 'requête': 'query', 'clics': 'clicks', 'position moyenne': 'position'}
+REQUIRED_COLUMNS = ['page', 'query', 'clicks']
+CATEGORY_COLUMNS = ('page', 'query')
+# Nombre de lignes lues à la fois dans un CSV (moteur pandas)
+CSV_CHUNK_ROWS = 500000
+# Taille des blocs lus à la fois dans un CSV (moteur pyarrow)
+CSV_BLOCK_SIZE = 32 * 1024 * 1024
+
+
+class GSCLoadError(ValueError):
+    """Export GSC illisible ou incomplet (le message est destiné à l'utilisateur)"""
+
+
+def _source_name(source: GSCSource) -> str:
+    return str(getattr(source, 'name', source))
+
+
+def _rewind(source: GSCSource) -> None:
+    if hasattr(source, 'seek'): source.seek(0)
+
+
+def _column_map(columns: Sequence[str]) -> Dict[str, str]:
+    """{colonne du fichier: colonne normalisée} des colonnes utiles ; erreur si une colonne requise manque"""
+    normalized = [COLUMN_ALIASES.get(str(column).lower().strip(), str(column).lower().strip()) for column in columns]
+    if not all(column in normalized for column in REQUIRED_COLUMNS):
+        raise GSCLoadError(f"Colonnes manquantes ! Requis: {', '.join(REQUIRED_COLUMNS)}. Trouvé: {normalized}")
+    wanted = REQUIRED_COLUMNS + ['position']
+    # En cas de doublon après normalisation, la première colonne est gardée
+    column_map = {}
+    for original, column in zip(columns, normalized):
+        if column in wanted and column not in column_map.values(): column_map[original] = column
+    return column_map
+
+
+def filter_chunk(df: pd.DataFrame, config: Dict, stopwords: Collection[str] = ()) -> pd.DataFrame:
+    """Nettoie et filtre un morceau de l'export (colonnes déjà normalisées), calcule la priorité et convertit page et query en `category`"""
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    clicks = pd.to_numeric(df['clicks'], errors='coerce')
+    keep = clicks.notna().to_numpy(copy=True)
+    if config.get('min_clicks', 0) > 0: keep &= (clicks >= config['min_clicks']).to_numpy()
+    position = None
+    if 'position' in df.columns:
+        position = pd.to_numeric(df['position'], errors='coerce')
+        if config.get('max_position', 0) > 0: keep &= (position <= config['max_position']).to_numpy()
+    query = df['query'].astype(str)
+    keep &= (query.str.len() >= config.get('min_keyword_length', 3)).to_numpy()
+    if config.get('exclude_stopwords', True): keep &= ~query.str.lower().isin(stopwords).to_numpy()
+    # Un seul masque : le morceau n'est copié qu'une fois
+    df = df[keep].assign(clicks=clicks[keep], **{column: df[column][keep].astype('category') for column in CATEGORY_COLUMNS})
+    if position is not None: df = df.assign(position=position[keep])
+    return df.assign(priority=df['clicks'] * (1 / df['position'].clip(lower=0.1)) if position is not None else df['clicks'])
+
+
+def _pyarrow_chunks(source: GSCSource, column_map: Dict[str, str]) -> Iterator[pd.DataFrame]:
+    # Les colonnes numériques sont lues directement en float ; une valeur non numérique fait échouer la lecture
+    # (pa.ArrowInvalid) et le fichier est alors relu par pandas, qui convertit ces valeurs en NaN
+    column_types = {original: pa.float64() if column in ('clicks', 'position') else pa.string() for original, column in column_map.items()}
+    reader = pa_csv.open_csv(source, read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+                             parse_options=pa_csv.ParseOptions(newlines_in_values=True, invalid_row_handler=lambda row: 'skip'),
+                             convert_options=pa_csv.ConvertOptions(include_columns=list(column_map), column_types=column_types))
+    for batch in reader:
+        yield batch.to_pandas().rename(columns=column_map)
+
+
+def _pandas_chunks(source: GSCSource, column_map: Dict[str, str]) -> Iterator[pd.DataFrame]:
+    dtypes = {original: str for original, column in column_map.items() if column in ('page', 'query')}
+    for chunk in pd.read_csv(source, usecols=list(column_map), dtype=dtypes, chunksize=CSV_CHUNK_ROWS, on_bad_lines='skip'):
+        yield chunk.rename(columns=column_map)
+
+
+def _read_csv(source: GSCSource, config: Dict, stopwords: Collection[str]) -> List[pd.DataFrame]:
+    _rewind(source)
+    column_map = _column_map(pd.read_csv(source, nrows=0).columns.tolist())
+    if PYARROW_CSV_AVAILABLE:
+        _rewind(source)
+        try: return [filter_chunk(chunk, config, stopwords) for chunk in _pyarrow_chunks(source, column_map)]
+        except pa.ArrowInvalid: pass
+    _rewind(source)
+    return [filter_chunk(chunk, config, stopwords) for chunk in _pandas_chunks(source, column_map)]
+
+
+def _read_excel(source: GSCSource, config: Dict, stopwords: Collection[str]) -> List[pd.DataFrame]:
+    _rewind(source)
+    column_map = _column_map(pd.read_excel(source, nrows=0).columns.tolist())
+    _rewind(source)
+    dtypes = {original: str for original, column in column_map.items() if column in ('page', 'query')}
+    return [filter_chunk(pd.read_excel(source, usecols=list(column_map), dtype=dtypes).rename(columns=column_map), config, stopwords)]
+
+
+def load_gsc_files(sources: Union[GSCSource, Sequence[GSCSource]], config: Dict, stopwords: Collection[str] = ()) -> pd.DataFrame:
+    """
+    Charge, filtre et fusionne un ou plusieurs exports GSC (CSV ou Excel).
+    Lève `GSCLoadError` si un fichier est illisible ou s'il lui manque une colonne requise.
+    """
+    if isinstance(sources, (str, os.PathLike)) or hasattr(sources, 'read'): sources = [sources]
+    chunks = []
+    for source in sources:
+        name = _source_name(source)
+        try:
+            chunks.extend(_read_csv(source, config, stopwords) if name.lower().endswith('.csv') else _read_excel(source, config, stopwords))
+        except GSCLoadError: raise
+        except Exception as e:
+            raise GSCLoadError(f"Erreur lors du chargement du fichier GSC {os.path.basename(name)}: {e}") from e
+    columns = REQUIRED_COLUMNS + (['position'] if any('position' in chunk.columns for chunk in chunks) else []) + ['priority']
+    chunks = [chunk for chunk in chunks if len(chunk)] or [pd.DataFrame(columns=columns).astype({column: 'category' for column in CATEGORY_COLUMNS})]
+    # Catégories communes à tous les morceaux (triées, comme `astype('category')`) : la concaténation reste en `category`
+    for column in CATEGORY_COLUMNS:
+        categories = union_categoricals([chunk[column] for chunk in chunks], sort_categories=True).categories
+        chunks = [chunk.assign(**{column: chunk[column].cat.set_categories(categories)}) for chunk in chunks]
+    df = pd.concat(chunks, ignore_index=True)
+    if len(sources) > 1:
+        df = df.drop_duplicates(subset=['page', 'query'], keep='first', ignore_index=True)
+        # Catégories des lignes retirées qui ne sont plus utilisées
+        for column in CATEGORY_COLUMNS: df[column] = df[column].cat.remove_unused_categories()
+    # Colonnes numériques entières si toutes leurs valeurs le sont (clics), comme `pd.to_numeric` sur un fichier lu d'un bloc
+    for column in ('clicks', 'position'):
+        if column not in df.columns: continue
+        values = df[column].astype(np.float64)
+        df[column] = values.astype(np.int64) if len(values) and np.isfinite(values).all() and (values % 1 == 0).all() else values
+    df['priority'] = df['priority'].astype(np.float64) if 'position' in df.columns else df['clicks']
+    return df[[column for column in columns if column in df.columns]]
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analyse incrémentale - Maillage Interne
+=======================================
+
+Entre deux crawls d'un même site, la plupart des pages ne changent pas. Chaque
+analyse incrémentale enregistre un instantané (`AnalysisSnapshot`) :
+- pour chaque page analysée : l'empreinte du contenu de son fichier HTML (CRC-32
+  et taille), ses URLs GSC et ses opportunités, sans la pondération de la source ;
+- pour chaque mot-clé : sa page cible, sa priorité, ses clics et sa requête originale.
+
+À l'analyse suivante, pour une page dont le fichier et les URLs GSC sont inchangés,
+les opportunités des mots-clés inchangés sont reprises de l'instantané, sans relire
+la page ; seuls les mots-clés nouveaux ou modifiés y sont recherchés. Les pages
+nouvelles ou modifiées sont analysées avec tous les mots-clés, et les opportunités
+des mots-clés disparus sont abandonnées.
+
+Chaque mot-clé étant recherché indépendamment des autres, le résultat est celui
+d'une analyse complète ; seul l'ordre de découverte des opportunités d'une même
+page, qui départage les priorités égales, peut différer.
+
+Un instantané est propre à un site (domaine principal des URLs GSC) et au profil
+d'analyse (sélecteurs, moteur de parsing, découpage, correspondance) : changer
+l'un d'eux repart d'une analyse complète.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import hashlib
+import json
+import math
+import os
+import pickle
+import tempfile
+import urllib.parse
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from page_store import DEFAULT_CACHE_DIR, prune_directory
+from keyword_index import KeywordIndex
+from opportunities import Opportunity
+from fuzzy_matcher import FUZZY_AVAILABLE
+
+SNAPSHOT_VERSION = 1
+# Nombre d'instantanés conservés (les plus anciens sont supprimés)
+MAX_SNAPSHOTS = 20
+# Options de configuration dont dépendent les opportunités trouvées dans une page
+PROFILE_KEYS = ('parser_backend', 'block_mode', 'exact_match_mode', 'use_fuzzy_matching', 'fuzzy_threshold', 'min_keyword_length', 'build_link_graph')
+
+# Données d'un mot-clé : (page cible, priorité, clics, requête originale)
+KeywordRecord = Tuple[str, float, float, str]
+# Opportunité enregistrée : (URL source, mot-clé, type de match, élément source, lien présent, source de l'ancre)
+OpportunityRow = Tuple[str, str, str, str, bool, str]
+# Page enregistrée : (empreinte du fichier, URLs GSC, opportunités)
+PageSnapshot = Tuple[str, Tuple[str, ...], List[OpportunityRow]]
+
+
+def analysis_profile(config: Dict, selectors: List[str]) -> str:
+    """Hash des options qui déterminent les opportunités d'une page"""
+    values = {key: config.get(key) for key in PROFILE_KEYS}
+    values['selectors'] = selectors
+    values['fuzzy_available'] = FUZZY_AVAILABLE
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+def site_key(urls: Iterable[str]) -> str:
+    """Domaine le plus fréquent des URLs (sans `www.`)"""
+    hosts = Counter(urllib.parse.urlsplit(str(url)).netloc.lower().removeprefix('www.') for url in urls)
+    return hosts.most_common(1)[0][0] if hosts else ''
+
+
+def snapshot_path(site: str, profile: str, snapshot_dir: Optional[str] = None) -> str:
+    snapshot_dir = snapshot_dir or os.path.join(DEFAULT_CACHE_DIR, 'snapshots')
+    name = hashlib.sha256(site.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(snapshot_dir, f"{name}-{profile}.pickle")
+
+
+def _same_record(a: KeywordRecord, b: KeywordRecord) -> bool:
+    # Une priorité ou des clics manquants (NaN) sont égaux entre eux
+    return all(x == y or (isinstance(x, float) and isinstance(y, float) and math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+class AnalysisSnapshot:
+    """Mots-clés et opportunités par page d'une analyse, pour l'analyse incrémentale suivante"""
+
+    __slots__ = ('keywords', 'pages', '_anchor_keywords')
+
+    def __init__(self, keywords: Dict[str, KeywordRecord], pages: Optional[Dict[str, PageSnapshot]] = None):
+        self.keywords = keywords
+        self.pages = pages if pages is not None else {}
+        # Requête originale -> mot-clé normalisé (deux mots-clés distincts ont des requêtes distinctes)
+        self._anchor_keywords = {record[3]: keyword for keyword, record in keywords.items()}
+
+    @classmethod
+    def from_keyword_index(cls, keyword_index: KeywordIndex) -> 'AnalysisSnapshot':
+        columns = zip(keyword_index.pages, keyword_index.priorities, keyword_index.clicks, keyword_index.original_queries)
+        return cls(dict(zip(keyword_index.keywords, columns)))
+
+    def __getstate__(self):
+        return (SNAPSHOT_VERSION, self.keywords, self.pages)
+
+    def __setstate__(self, state):
+        version, keywords, pages = state
+        if version != SNAPSHOT_VERSION: raise ValueError(f"Version d'instantané incompatible: {version}")
+        self.__init__(keywords, pages)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['AnalysisSnapshot']:
+        """Instantané enregistré, ou None s'il n'existe pas ou est illisible"""
+        try:
+            with open(path, 'rb') as f: snapshot = pickle.load(f)
+            return snapshot if isinstance(snapshot, cls) else None
+        except Exception: return None
+
+    def save(self, path: str) -> bool:
+        """Enregistre l'instantané (écriture atomique) ; retourne False en cas d'échec"""
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.part', delete=False) as tmp:
+                pickle.dump(self, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp.name, path)
+            prune_directory(directory, '.pickle', MAX_SNAPSHOTS)
+            return True
+        except (OSError, pickle.PicklingError): return False
+
+    def changed_keywords(self, previous: Optional['AnalysisSnapshot']) -> Set[str]:
+        """Mots-clés nouveaux ou dont la page cible, la priorité, les clics ou la requête ont changé depuis `previous`"""
+        if previous is None: return set(self.keywords)
+        return {keyword for keyword, record in self.keywords.items()
+                if keyword not in previous.keywords or not _same_record(record, previous.keywords[keyword])}
+
+    def reusable_rows(self, key: str, fingerprint: str, source_urls: List[str]) -> Optional[List[OpportunityRow]]:
+        """Opportunités enregistrées de la page si son fichier et ses URLs GSC sont inchangés, sinon None"""
+        page = self.pages.get(key)
+        if page is None or page[0] != fingerprint or page[1] != tuple(source_urls): return None
+        return page[2]
+
+    def record(self, key: str, fingerprint: str, source_urls: List[str], opportunities: List[Opportunity]) -> None:
+        """Enregistre les opportunités d'une page (la priorité n'est pas gardée : elle est recalculée à la reprise)"""
+        self.pages[key] = (fingerprint, tuple(source_urls), [
+            (opportunity.source_url, self._anchor_keywords[opportunity.anchor], opportunity.match_type, opportunity.element_source,
+             opportunity.link_exists, opportunity.anchor_location)
+            for opportunity in opportunities if opportunity.anchor in self._anchor_keywords
+        ])
+
+
+def restore_opportunities(rows: List[OpportunityRow], keyword_index: KeywordIndex, weight: float = 1.0,
+                          skip: Set[str] = frozenset()) -> List[Opportunity]:
+    """Recrée les opportunités enregistrées avec les données actuelles des mots-clés, sauf ceux de `skip` ou disparus"""
+    opportunities = []
+    for source_url, keyword, match_type, element_source, link_exists, anchor_location in rows:
+        if keyword in skip or keyword not in keyword_index: continue
+        position = keyword_index.position(keyword)
+        priority = keyword_index.priorities[position] if weight == 1.0 else keyword_index.priorities[position] * weight
+        opportunities.append(Opportunity(source_url, keyword_index.pages[position], keyword_index.original_queries[position], priority,
+                                         keyword_index.clicks[position], match_type, element_source, link_exists, anchor_location))
+    return opportunities
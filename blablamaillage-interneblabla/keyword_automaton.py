@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Automate des mots-clés - Maillage Interne
+=========================================
+
+Recherche exacte des mots-clés GSC dans le texte des pages avec Aho-Corasick.
+
+Trois modes de correspondance :
+- `word` (par défaut) : mots entiers, insensible aux accents. Mots-clés et texte
+  sont normalisés de la même façon (minuscules, accents retirés, ponctuation
+  remplacée par des espaces) et bornés par des espaces : « lit » ne correspond plus
+  à « littérature », mais « velo electrique » correspond à « Vélo-électrique ».
+- `stem` : comme `word`, après réduction de chaque mot à sa racine (`light_stemmer`) :
+  « chaussures running » correspond aussi à « chaussure running ». Alternative
+  rapide à la correspondance floue pour les pluriels et les flexions.
+- `substring` : comportement historique, sous-chaîne du texte en minuscules.
+
+L'automate est construit directement depuis les colonnes du `KeywordIndex` : chaque
+clé y est associée aux positions des mots-clés qu'elle représente.
+
+L'automate construit est mis en cache sur disque (pickle, avec le `keyword_index`
+correspondant), identifié par un hash des mots-clés filtrés et du mode (et de la
+version des règles de racinisation en mode `stem`) : une nouvelle
+analyse avec les mêmes mots-clés, comme chaque worker du pool de processus, le
+recharge au lieu de le reconstruire.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from keyword_index import KeywordIndex
+from light_stemmer import STEMMER_VERSION, stem_folded, stem_word
+from page_store import DEFAULT_CACHE_DIR, prune_directory
+
+# Gestion des dépendances optionnelles
+try:
+    import ahocorasick
+    AHO_CORASICK_AVAILABLE = True
+except ImportError:
+    AHO_CORASICK_AVAILABLE = False
+
+MATCH_MODES = {'word': "Mots entiers (accents ignorés)", 'stem': "Racines (pluriels et flexions)", 'substring': "Sous-chaîne (historique)"}
+DEFAULT_MATCH_MODE = 'word'
+
+# Automates conservés en cache disque (les plus anciens sont supprimés)
+MAX_CACHED_AUTOMATA = 10
+
+_COMBINING_MARKS_RE = re.compile('[\u0300-\u036f]')
+_WORD_RE = re.compile(r'\w+')
+
+
+def fold_text(text: str) -> str:
+    """Texte en minuscules, sans accents, réduit à ses mots séparés et bornés par une espace"""
+    folded = _COMBINING_MARKS_RE.sub('', unicodedata.normalize('NFKD', text.lower()))
+    return f" {' '.join(_WORD_RE.findall(folded))} "
+
+
+def match_key(text: str, mode: str = DEFAULT_MATCH_MODE) -> str:
+    """Forme d'un mot-clé ou d'un texte (en minuscules) recherchée ou parcourue par l'automate selon le mode"""
+    if mode == 'word': return fold_text(text)
+    if mode == 'stem': return stem_folded(fold_text(text))
+    return text
+
+
+def build_automaton(keyword_index: KeywordIndex, mode: str = DEFAULT_MATCH_MODE):
+    """
+    Construit l'automate Aho-Corasick des mots-clés (None si pyahocorasick est absent).
+    Chaque clé de l'automate est associée aux positions des mots-clés qu'elle représente :
+    en modes `word` et `stem`, plusieurs mots-clés peuvent avoir la même forme normalisée.
+    """
+    if not AHO_CORASICK_AVAILABLE: return None
+    entries: Dict[str, List[int]] = {}
+    for position, keyword in enumerate(keyword_index.keywords):
+        key = match_key(keyword, mode)
+        # Un mot-clé sans aucun mot (ponctuation seule) ne peut pas correspondre à des mots entiers
+        if mode != 'substring' and not key.strip(): continue
+        entries.setdefault(key, []).append(position)
+    if not entries: return None
+    A = ahocorasick.Automaton()
+    for key, values in entries.items(): A.add_word(key, tuple(values))
+    A.make_automaton()
+    return A
+
+
+def iter_keyword_matches(automaton, text_lower: str, mode: str = DEFAULT_MATCH_MODE) -> Iterator[int]:
+    """Itère sur les positions des mots-clés trouvés dans le texte, dans l'ordre d'apparition"""
+    for _, values in automaton.iter(match_key(text_lower, mode)):
+        yield from values
+
+
+def iter_stem_matches(automaton, text_lower: str, word_counts: Sequence[int]) -> Iterator[Tuple[int, str]]:
+    """
+    Mode `stem` : itère sur (position du mot-clé, mots du texte trouvés, normalisés par `fold_text`), dans l'ordre d'apparition.
+    Le texte racinisé garde les mots du texte normalisé dans le même ordre : les mots trouvés sont repérés par le rang du
+    dernier d'entre eux et le nombre de mots du mot-clé (`word_counts`).
+    """
+    words = fold_text(text_lower).split()
+    stemmed = f" {' '.join(map(stem_word, words))} "
+    spaces = position = 0
+    for end_index, values in automaton.iter(stemmed):
+        # Espaces avant celle qui termine la correspondance : rang du dernier mot trouvé, plus un
+        spaces += stemmed.count(' ', position, end_index)
+        position = end_index
+        for keyword_id in values: yield keyword_id, f" {' '.join(words[spaces - word_counts[keyword_id]:spaces])} "
+
+
+def automaton_cache_key(keyword_index: KeywordIndex, mode: str = DEFAULT_MATCH_MODE) -> str:
+    """Hash des mots-clés filtrés (avec leurs données) et du mode de correspondance (et des règles de racinisation en mode `stem`)"""
+    columns = [keyword_index.keywords, keyword_index.pages, keyword_index.priorities, keyword_index.clicks, keyword_index.original_queries]
+    payload = json.dumps([f'{mode}-{STEMMER_VERSION}' if mode == 'stem' else mode, columns], default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_cached_automaton(path: str) -> Tuple[KeywordIndex, object]:
+    """Recharge (keyword_index, automate) depuis un fichier du cache"""
+    with open(path, 'rb') as f:
+        payload = pickle.load(f)
+    return payload['keyword_index'], payload['automaton']
+
+
+def load_or_build_automaton(keyword_index: KeywordIndex, mode: str = DEFAULT_MATCH_MODE,
+                            cache_dir: Optional[str] = None) -> Tuple[Optional[object], Optional[str]]:
+    """
+    Retourne (automate, chemin du cache). L'automate est rechargé depuis le cache disque s'il
+    existe pour ces mots-clés et ce mode, sinon construit puis enregistré.
+    Le chemin vaut None si l'automate n'a pas pu être mis en cache.
+    """
+    if not AHO_CORASICK_AVAILABLE: return None, None
+    cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, 'automata')
+    path = os.path.join(cache_dir, f"{automaton_cache_key(keyword_index, mode)}.pickle")
+    try:
+        _, automaton = load_cached_automaton(path)
+        os.utime(path)
+        return automaton, path
+    except Exception: pass
+    automaton = build_automaton(keyword_index, mode)
+    if automaton is None: return None, None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=cache_dir, suffix='.part', delete=False) as tmp:
+            pickle.dump({'mode': mode, 'keyword_index': keyword_index, 'automaton': automaton}, tmp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp.name, path)
+        prune_directory(cache_dir, '.pickle', MAX_CACHED_AUTOMATA)
+    except (OSError, pickle.PicklingError):
+        return automaton, None
+    return automaton, path
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index des mots-clés - Maillage Interne
+======================================
+
+Index des mots-clés GSC ciblés : une entrée par requête normalisée (minuscules,
+espaces retirés), celle de plus forte priorité (la première en cas d'égalité).
+
+L'index est construit par des opérations pandas vectorisées (pas de boucle sur
+les lignes) et stocké en colonnes : une liste par champ, alignées par position.
+Cette position sert d'identifiant de mot-clé à l'automate Aho-Corasick et au
+moteur de correspondance floue, qui n'ont ainsi pas à recopier les mots-clés ni
+les requêtes originales.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class KeywordIndex:
+    """Index columnaire des mots-clés (mot-clé normalisé, page cible, priorité, clics, requête originale)"""
+
+    __slots__ = ('keywords', 'pages', 'priorities', 'clicks', 'original_queries', '_positions')
+
+    def __init__(self, keywords: List[str], pages: List[str], priorities: List[float], clicks: List[float], original_queries: List[str]):
+        self.keywords = keywords
+        self.pages = pages
+        self.priorities = priorities
+        self.clicks = clicks
+        self.original_queries = original_queries
+        self._positions = {keyword: position for position, keyword in enumerate(keywords)}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, selected_keywords: Optional[List[str]] = None) -> 'KeywordIndex':
+        """
+        Construit l'index depuis les données GSC (colonnes page, query, clicks, priority).
+        Les mots-clés sont rangés dans l'ordre de première apparition de leur requête.
+        """
+        if selected_keywords: df = df[df['query'].isin(selected_keywords)]
+        if df.empty: return cls([], [], [], [], [])
+        # Index positionnel : l'index du DataFrame filtré peut contenir des doublons
+        keys = pd.Series(df['query'].astype(str).str.lower().str.strip().to_numpy())
+        # Une priorité manquante ne l'emporte que si toutes celles de la requête le sont
+        priorities = pd.Series(df['priority'].to_numpy(dtype=float)).fillna(-np.inf)
+        best = priorities.groupby(keys, sort=False).idxmax()
+        rows = df.iloc[best.to_numpy()]
+        return cls(best.index.tolist(), rows['page'].tolist(), rows['priority'].tolist(), rows['clicks'].tolist(), rows['query'].tolist())
+
+    def subset(self, keywords: Iterable[str]) -> 'KeywordIndex':
+        """Index restreint aux mots-clés donnés (présents dans l'index), dans l'ordre de l'index"""
+        positions = sorted(self._positions[keyword] for keyword in set(keywords) if keyword in self._positions)
+        columns = [self.keywords, self.pages, self.priorities, self.clicks, self.original_queries]
+        return KeywordIndex(*([column[position] for position in positions] for column in columns))
+
+    def __getstate__(self):
+        return (self.keywords, self.pages, self.priorities, self.clicks, self.original_queries)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keywords)
+
+    def position(self, keyword: str) -> int:
+        """Identifiant (position) d'un mot-clé normalisé ; KeyError s'il est absent"""
+        return self._positions[keyword]
+
+    def target(self, position: int) -> Dict:
+        """Données de la page cible d'un mot-clé, au format des anciennes entrées de l'index"""
+        return {'page': self.pages[position], 'priority': self.priorities[position], 'clicks': self.clicks[position], 'original_query': self.original_queries[position]}
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Préfiltre des blocs de contenu - Maillage Interne
+=================================================
+
+La plupart des blocs d'une page ne contiennent aucun mot-clé GSC. Le préfiltre
+les écarte avant la normalisation complète du texte, l'automate et la recherche
+floue, à partir des tokens des mots-clés construits avec l'automate :
+- correspondance exacte (modes `word` et `stem`) : un mot-clé n'est trouvé que si
+  tous ses mots (ou leurs racines) sont dans le bloc ; un bloc sans aucun mot en
+  commun avec les mots-clés est écarté ;
+- correspondance floue : un bloc n'est évalué que si `FuzzyMatcher` aurait au
+  moins un candidat (token commun, ou longueur compatible avec le seuil).
+
+Le préfiltre est exact : il n'écarte que des blocs sans correspondance possible.
+Le texte d'un bloc est découpé aux espaces et chaque morceau n'est normalisé
+qu'une fois pour toute l'analyse (mémoïsation) : un bloc dont les mots ont déjà
+été rencontrés se vérifie par quelques opérations d'ensemble, sans normalisation.
+
+En mode `substring`, un mot-clé peut apparaître au milieu d'un mot : le préfiltre
+n'est pas utilisé.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from keyword_index import KeywordIndex
+from keyword_automaton import DEFAULT_MATCH_MODE, match_key
+from fuzzy_matcher import FuzzyMatcher, fuzzy_tokens
+
+# Nombre de morceaux de texte mémorisés par normalisation (la mémoire est vidée au-delà)
+MAX_MEMO_CHUNKS = 200000
+
+
+class _ChunkTokens:
+    """
+    Tokens des morceaux (séparés par des espaces) d'un texte, chaque morceau n'étant normalisé (`tokenize`)
+    qu'une fois pour toute l'analyse. Les morceaux qui ont un token en commun avec `vocabulary` sont mémorisés
+    à part : un texte déjà rencontré se vérifie par une seule opération d'ensemble.
+    """
+
+    __slots__ = ('tokenize', 'vocabulary', '_tokens', '_hits')
+
+    def __init__(self, tokenize: Callable[[str], Iterable[str]], vocabulary: FrozenSet[str]):
+        self.tokenize = tokenize
+        self.vocabulary = vocabulary
+        self._tokens: Dict[str, FrozenSet[str]] = {}
+        self._hits: Set[str] = set()
+
+    def chunks(self, text: str) -> Set[str]:
+        chunks = set(text.split())
+        unknown = chunks.difference(self._tokens)
+        if unknown:
+            if len(self._tokens) + len(unknown) > MAX_MEMO_CHUNKS: self._tokens.clear(); self._hits.clear(); unknown = chunks
+            for chunk in unknown:
+                tokens = self._tokens[chunk] = frozenset(self.tokenize(chunk))
+                if not self.vocabulary.isdisjoint(tokens): self._hits.add(chunk)
+        return chunks
+
+    def overlaps(self, chunks: Set[str]) -> bool:
+        """Vrai si un morceau a un token en commun avec `vocabulary`"""
+        return not self._hits.isdisjoint(chunks)
+
+    def tokens(self, chunks: Set[str]) -> FrozenSet[str]:
+        """Tokens du texte : réunion de ceux de ses morceaux"""
+        return frozenset().union(*map(self._tokens.__getitem__, chunks))
+
+
+class KeywordPrefilter:
+    """Indique, pour le texte d'un bloc, si une correspondance exacte et/ou floue est possible"""
+
+    __slots__ = ('fuzzy_matcher', '_exact_tokens', '_fuzzy_tokens')
+
+    def __init__(self, keyword_index: KeywordIndex, fuzzy_matcher: Optional[FuzzyMatcher] = None, match_mode: str = DEFAULT_MATCH_MODE):
+        # La normalisation de l'automate (modes `word` et `stem`) ne crée ni ne supprime d'espace : elle s'applique morceau par morceau
+        vocabulary = frozenset(token for keyword in keyword_index.keywords for token in match_key(keyword, match_mode).split())
+        self._exact_tokens = _ChunkTokens(lambda chunk: match_key(chunk, match_mode).split(), vocabulary)
+        self.fuzzy_matcher = fuzzy_matcher
+        self._fuzzy_tokens = _ChunkTokens(fuzzy_tokens, fuzzy_matcher.vocabulary) if fuzzy_matcher else None
+
+    def check(self, text_lower: str) -> Tuple[bool, bool]:
+        """(correspondance exacte possible, correspondance floue possible) pour le texte en minuscules d'un bloc"""
+        exact = self._exact_tokens.overlaps(self._exact_tokens.chunks(text_lower))
+        if self.fuzzy_matcher is None: return exact, False
+        # La normalisation floue supprime les espaces du Latin-1 : les mots qu'elles séparent sont réunis
+        text_lower = text_lower.replace('\xa0', '').replace('\x85', '')
+        chunks = self._fuzzy_tokens.chunks(text_lower)
+        # Sans token commun, la recherche floue peut encore trouver un mot-clé de longueur proche de celle du texte
+        fuzzy = self._fuzzy_tokens.overlaps(chunks) or self.fuzzy_matcher.has_candidates(self._fuzzy_tokens.tokens(chunks))
+        return exact, fuzzy
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Racinisation légère - Maillage Interne
+======================================
+
+Réduit les mots (déjà normalisés par `fold_text` : minuscules, sans accents) à une
+racine commune à leurs formes fléchies, pour le français et l'anglais :
+- pluriels : « chaussures » -> « chaussure », « bateaux » -> « bateau »,
+  « chevaux » -> « cheval », « travaux » et « travail » -> « traval » ;
+- e final (féminin, e muet), puis le s ou x qui le précède : « électrique » et
+  « électriques » -> « electriqu », « gris » et « grise » -> « gri », « heureux »
+  et « heureuse » -> « heureu », « batterie » et « batteries » -> « batteri » ;
+- y final de l'anglais : « battery » -> « batteri », comme « batteries ».
+
+Les règles sont volontairement peu nombreuses : mots-clés et texte des pages passant
+par la même fonction, seule compte la cohérence des racines, pas leur justesse
+linguistique. Les mots de trois lettres ou moins et les mots contenant des chiffres
+ne sont pas modifiés. Chaque mot distinct n'est racinisé qu'une fois (cache).
+`STEMMER_VERSION` change avec les règles : les racines déjà calculées (automates du
+cache disque) ne sont pas réutilisées.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+from functools import lru_cache
+
+# Nombre de mots distincts gardés en cache
+STEM_CACHE_SIZE = 200000
+# Version des règles de racinisation
+STEMMER_VERSION = 2
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem_word(word: str) -> str:
+    """Racine d'un mot normalisé"""
+    if len(word) <= 3 or not word.isalpha(): return word
+    # Pluriels
+    if word.endswith('eaux'): word = word[:-1]
+    elif word.endswith('aux') and len(word) > 4: word = word[:-3] + 'al'
+    elif word[-1] in 'sx' and word[-2] != 's': word = word[:-1]
+    # -ail comme -al : même racine que le pluriel en -aux
+    if word.endswith('ail') and len(word) > 4: word = word[:-3] + 'al'
+    # e final, puis le s ou x qui le précède (« grise » comme « gris », « heureuse » comme « heureux »)
+    if len(word) > 4 and word.endswith('e'):
+        word = word[:-1]
+        if word[-1] in 'sx' and word[-2] != 's': word = word[:-1]
+    # y final après une consonne (anglais : « battery » comme « batteries »)
+    elif len(word) > 4 and word[-1] == 'y' and word[-2] not in 'aeiou': word = word[:-1] + 'i'
+    return word
+
+
+def stem_folded(folded: str) -> str:
+    """Texte normalisé (`fold_text`) dont chaque mot est remplacé par sa racine, borné par une espace"""
+    return f" {' '.join(map(stem_word, folded.split()))} "
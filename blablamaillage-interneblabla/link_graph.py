@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Graphe des liens internes - Maillage Interne
+============================================
+
+Graphe orienté source → cible de toutes les pages de l'archive ZIP, construit une
+seule fois par archive (et mis en cache dans le `PageStore`). Les URLs normalisées
+reçoivent un identifiant entier : les pages de l'archive d'abord (dans l'ordre de
+l'index des canonicals), puis les cibles qui ne sont pas des pages de l'archive.
+L'adjacence est stockée au format CSR (`indptr`, `indices`, tableaux numpy).
+
+Le graphe sert à vérifier la présence d'un lien (« Lien présent ») et fournit les
+nombres de liens entrants et sortants de chaque page. Les liens d'une page vers
+elle-même sont ignorés.
+
+Ce module n'importe pas Streamlit : les workers peuvent l'importer sans l'interface.
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from page_index import POOL_CONTEXT, PageEntry, PageRecord, ZipSource, open_archive, parse_page_links
+
+# Nombre de pages envoyées à un worker en une fois
+SHARD_SIZE = 100
+
+
+class LinkGraph:
+    """Graphe des liens entre URLs normalisées (identifiants entiers, adjacence CSR)"""
+
+    __slots__ = ('urls', 'page_count', 'indptr', 'indices', '_ids', '_row_cache')
+
+    def __init__(self, urls: List[str], page_count: int, indptr: np.ndarray, indices: np.ndarray):
+        self.urls = urls
+        self.page_count = page_count
+        self.indptr = indptr
+        self.indices = indices
+        self._ids = {url: node_id for node_id, url in enumerate(urls)}
+        self._row_cache: Tuple[int, FrozenSet[int]] = (-1, frozenset())
+
+    @classmethod
+    def from_links(cls, pages: List[str], rows: Iterable[Tuple[int, Iterable[str]]]) -> 'LinkGraph':
+        """Construit le graphe à partir des pages et de leurs liens sortants : (identifiant de la page, URLs cibles)"""
+        ids: Dict[str, int] = {url: node_id for node_id, url in enumerate(pages)}
+        sources, targets = array('q'), array('q')
+        for source_id, links in rows:
+            for url in links:
+                target_id = ids.setdefault(url, len(ids))
+                if target_id == source_id: continue
+                sources.append(source_id)
+                targets.append(target_id)
+        sources, targets = np.frombuffer(sources, dtype=np.int64), np.frombuffer(targets, dtype=np.int64)
+        order = np.lexsort((targets, sources))
+        indptr = np.zeros(len(pages) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(pages)), out=indptr[1:])
+        return cls(list(ids), len(pages), indptr, targets[order].astype(np.int32))
+
+    def __getstate__(self):
+        return (self.urls, self.page_count, self.indptr, self.indices)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def node_id(self, url: str) -> Optional[int]:
+        return self._ids.get(url)
+
+    def _row(self, source_id: int) -> FrozenSet[int]:
+        # Les vérifications arrivent page par page : seule la dernière ligne consultée est gardée en ensemble
+        if self._row_cache[0] != source_id:
+            self._row_cache = (source_id, frozenset(self.indices[self.indptr[source_id]:self.indptr[source_id + 1]].tolist()))
+        return self._row_cache[1]
+
+    def has_link(self, source_url: str, target_url: str) -> bool:
+        """Vrai si la page `source_url` contient un lien vers `target_url` (URLs normalisées)"""
+        source_id, target_id = self._ids.get(source_url), self._ids.get(target_url)
+        if source_id is None or target_id is None or source_id >= self.page_count: return False
+        return target_id in self._row(source_id)
+
+    def out_degrees(self) -> np.ndarray:
+        """Nombre de liens sortants distincts de chaque page"""
+        return np.diff(self.indptr)
+
+    def in_degrees(self) -> np.ndarray:
+        """Nombre de pages distinctes qui lient chaque URL (pages et cibles externes)"""
+        return np.bincount(self.indices, minlength=len(self.urls))
+
+    def subgraph(self, pages: List[str]) -> 'LinkGraph':
+        """
+        Graphe réduit aux liens sortants des pages données (URLs normalisées distinctes), qui y gardent leur ordre
+        pour identifiants : `has_link` y répond comme dans le graphe complet pour ces pages sources.
+        """
+        def rows():
+            for page_id, url in enumerate(pages):
+                source_id = self._ids.get(url)
+                if source_id is None or source_id >= self.page_count: continue
+                yield page_id, [self.urls[target_id] for target_id in self.indices[self.indptr[source_id]:self.indptr[source_id + 1]].tolist()]
+        return LinkGraph.from_links(list(pages), rows())
+
+    def link_counts(self) -> Dict[str, Tuple[int, int]]:
+        """{URL normalisée: (liens entrants, liens sortants)} des pages de l'archive"""
+        inlinks, outlinks = self.in_degrees()[:self.page_count].tolist(), self.out_degrees().tolist()
+        return {url: (inlinks[node_id], outlinks[node_id]) for node_id, url in enumerate(self.urls[:self.page_count])}
+
+
+def _page_links(zip_ref, entry: PageEntry, parser_backend: str) -> FrozenSet[str]:
+    if isinstance(entry, PageRecord): return entry.links
+    try:
+        filename, canonical_href = entry
+        return parse_page_links(zip_ref.read(filename), parser_backend, canonical_href) or frozenset()
+    except Exception: return frozenset()
+
+
+# --- EXÉCUTION PARALLÈLE (pool de processus) ---
+_worker_state: Dict = {}
+
+
+def _init_worker(zip_source, parser_backend):
+    _worker_state['zip_ref'] = open_archive(zip_source)
+    _worker_state['parser_backend'] = parser_backend
+
+
+def _links_shard(shard: List[Tuple[int, PageEntry]]) -> List[Tuple[int, FrozenSet[str]]]:
+    return [(page_id, _page_links(_worker_state['zip_ref'], entry, _worker_state['parser_backend'])) for page_id, entry in shard]
+
+
+def build_link_graph(zip_source: ZipSource, canonical_map: Dict[str, PageEntry], parser_backend: str, workers: int = 1,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> LinkGraph:
+    """
+    Construit le graphe des liens de toutes les pages de l'index des canonicals.
+    Les pages déjà parsées (PageRecord) ne sont pas relues ; les autres sont parsées sans extraction
+    des blocs de contenu, sur `workers` processus si besoin.
+    """
+    pages = list(canonical_map)
+    entries = list(enumerate(canonical_map.values()))
+    total = len(entries)
+
+    def rows():
+        if workers > 1 and total > SHARD_SIZE:
+            shards = [entries[i:i + SHARD_SIZE] for i in range(0, total, SHARD_SIZE)]
+            with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT, initializer=_init_worker,
+                                     initargs=(zip_source, parser_backend)) as executor:
+                # Résultats dans l'ordre des lots : les identifiants des cibles sont les mêmes qu'en séquentiel
+                for i, shard_rows in enumerate(executor.map(_links_shard, shards)):
+                    yield from shard_rows
+                    if progress_callback: progress_callback(min((i + 1) * SHARD_SIZE, total), total)
+        else:
+            with open_archive(zip_source) as zip_ref:
+                for page_id, entry in entries:
+                    if progress_callback and page_id % 100 == 0: progress_callback(page_id + 1, total)
+                    yield page_id, _page_links(zip_ref, entry, parser_backend)
+
+    return LinkGraph.from_links(pages, rows())
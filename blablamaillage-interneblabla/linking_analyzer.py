@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analyseur de maillage interne - Maillage Interne
+================================================
+
+`InternalLinkingAnalyzer` charge les données de la Google Search Console, indexe
+les pages de l'archive de crawl (ZIP ou répertoire de fichiers HTML) et recherche
+les opportunités de maillage interne.
+
+Ce module n'importe pas Streamlit : il est utilisé par l'interface (`app.py`) et
+par la ligne de commande (`maillage_cli.py`). Les erreurs de chargement sont
+gardées dans `load_error` et l'avancement passe par `progress_factory(libellé, total)`,
+qui retourne un `ProgressReporter`. L'analyse des pages s'arrête dès que `should_stop()`
+est vrai (annulation), comme à la fin du budget de temps.
+"""
+
+import copy
+import os
+import re
+import sys
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Modules partagés par les outils du hub (progress_reporter), dans le répertoire parent
+HUB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if HUB_DIR not in sys.path: sys.path.append(HUB_DIR)
+
+from page_index import (DEFAULT_BLOCK_MODE, DEFAULT_PARSER_BACKEND, ZipSource, build_canonical_map, entry_filename, get_parser_backend,
+                        list_html_members, member_fingerprint, normalize_url, open_archive)
+from page_store import PageStore, archive_hash
+from link_graph import build_link_graph
+from pagerank import DEFAULT_DAMPING, compute_pagerank
+from progress_reporter import ProgressReporter
+from keyword_index import KeywordIndex
+from keyword_automaton import DEFAULT_MATCH_MODE, load_or_build_automaton
+from opportunities import OpportunityCollector
+from opportunity_scanner import OpportunityScanner, ScanTask, TaskSink, scan_task, scan_tasks_parallel, source_weight
+from results_writer import write_results
+from gsc_loader import GSCLoadError, load_gsc_files
+from incremental import AnalysisSnapshot, analysis_profile, restore_opportunities, site_key, snapshot_path
+from page_order import DEFAULT_PAGE_ORDER, TimeBudget, order_source_urls
+from checkpoint import AnalysisCheckpoint, checkpoint_key, gsc_data_hash
+
+DEFAULT_CONFIG = {
+    'min_clicks': 0, 'min_keyword_length': 3, 'exclude_stopwords': True, 'exclude_classic_pages': True,
+    'content_selectors': ['p', 'li', 'span'], 'custom_class': '', 'max_position': 50,
+    'manual_keyword_selection': False, 'auto_detect_classes': True, 'max_pages_to_analyze': 10000,
+    'use_fuzzy_matching': False, 'fuzzy_threshold': 85, 'parser_backend': DEFAULT_PARSER_BACKEND,
+    'analysis_workers': 1, 'use_disk_cache': True, 'exact_match_mode': DEFAULT_MATCH_MODE,
+    'top_k_per_source': 0, 'top_k_per_target': 0, 'build_link_graph': True,
+    'use_pagerank': False, 'pagerank_weight': 0.5, 'block_mode': DEFAULT_BLOCK_MODE, 'incremental': False,
+    'page_order': DEFAULT_PAGE_ORDER, 'time_budget_seconds': 0, 'checkpoint': True
+}
+
+# Fabrique de suivis de progression : (libellé, total) -> ProgressReporter
+ProgressFactory = Callable[[str, int], ProgressReporter]
+
+
+def default_config() -> Dict:
+    """Copie de la configuration par défaut"""
+    return copy.deepcopy(DEFAULT_CONFIG)
+
+
+def silent_progress(label: str, total: int = 0) -> ProgressReporter:
+    """Suivi de progression sans affichage"""
+    return ProgressReporter(lambda fraction, text: None, total, label)
+
+
+class InternalLinkingAnalyzer:
+    FRENCH_STOPWORDS = {
+        'a', 'à', 'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'elle', 'en', 'et', 'être', 'eu', 'il', 'je', 'la', 'le', 'les', 'leur', 'lui', 'ma', 'mais', 'me', 'même', 'mes', 'moi', 'mon', 'ne', 'nos', 'notre', 'nous', 'on', 'ont', 'ou', 'par', 'pas', 'pour', 'qu', 'que', 'qui', 'sa', 'se', 'ses', 'son', 'sur', 'ta', 'te', 'tes', 'toi', 'ton', 'tu', 'un', 'une', 'vos', 'votre', 'vous', 'c', 'd', 'j', 'l', 'à', 'm', 'n', 's', 't', 'y', 'été', 'étée', 'étées', 'étés', 'étant', 'suis', 'es', 'est', 'sommes', 'êtes', 'sont', 'serai', 'seras', 'sera', 'serons', 'serez', 'seront', 'serais', 'serait', 'serions', 'seriez', 'seraient', 'étais', 'était', 'étions', 'étiez', 'étaient', 'fus', 'fut', 'fûmes', 'fûtes', 'furent', 'sois', 'soit', 'soyons', 'soyez', 'soient', 'fusse', 'fusses', 'fût', 'fussions', 'fussiez', 'fussent', 'ayant', 'ayante', 'ayantes', 'ayants', 'eu', 'eue', 'eues', 'eus', 'ai', 'as', 'avons', 'avez', 'ont', 'aurai', 'auras', 'aura', 'aurons', 'aurez', 'auront', 'aurais', 'aurait', 'aurions', 'auriez', 'auraient', 'avais', 'avait', 'avions', 'aviez', 'avaient', 'eut', 'eûmes', 'eûtes', 'eurent', 'aie', 'aies', 'ait', 'ayons', 'ayez', 'aient', 'eusse', 'eusses', 'eût', 'eussions', 'eussiez', 'eussent', 'ceci', 'cela', 'celà', 'cet', 'cette', 'ici', 'ils', 'les', 'leurs', 'quel', 'quels', 'quelle', 'quelles', 'sans', 'soi'
+    }
+    CLASSIC_PAGE_PATTERNS = [
+        r'mentions[-_]?legales?', r'cgu', r'cgv', 'conditions', 'legal', 'a[-_]?propos', 'about', 'contact',
+        r'nous[-_]?contacter', r'politique[-_]?confidentialite', 'privacy', 'cookie', r'plan[-_]?site',
+        'sitemap', 'aide', 'help', 'faq', 'support', '404', 'erreur', r'recherche', 'search', 'connexion',
+        'login', 'inscription', 'register', 'panier', 'cart', 'commande', 'checkout', r'mon[-_]?compte', 'account'
+    ]
+    def __init__(self, config: Dict, progress_factory: Optional[ProgressFactory] = None, should_stop: Optional[Callable[[], bool]] = None):
+        self.config = config
+        self.progress_factory = progress_factory or silent_progress
+        self.should_stop = should_stop
+        self.excel_data = None
+        self.link_graph = None
+        self.load_error: Optional[str] = None
+        # (URLs GSC trouvées dans l'archive, URLs GSC analysées) de la dernière analyse
+        self.match_stats: Tuple[int, int] = (0, 0)
+        # Pages et mots-clés réanalysés lors de la dernière analyse incrémentale (None sinon)
+        self.incremental_stats: Optional[Dict] = None
+        # (pages analysées, pages à analyser) de la dernière analyse ; moins de pages si le budget de temps est écoulé (ou l'analyse annulée)
+        self.scan_stats: Tuple[int, int] = (0, 0)
+        self.time_budget_reached = False
+        # Pages reprises d'un point de reprise lors de la dernière analyse
+        self.resumed_pages = 0
+        
+    def load_excel_data(self, uploaded_files) -> bool:
+        """
+        Charge et filtre un ou plusieurs exports GSC (fichiers uploadés ou chemins) d'une même propriété.
+        En cas d'échec, le message est dans `load_error`.
+        """
+        self.load_error = None
+        try:
+            self.excel_data = load_gsc_files(uploaded_files, self.config, self.FRENCH_STOPWORDS)
+            return True
+        except GSCLoadError as e:
+            self.load_error = str(e)
+            return False
+
+    _normalize_url_for_comparison = staticmethod(normalize_url)
+
+    def _is_classic_page(self, url: str) -> bool:
+        if not self.config.get('exclude_classic_pages', True): return False
+        for pattern in self.CLASSIC_PAGE_PATTERNS:
+            if re.search(pattern, url.lower()): return True
+        return False
+        
+    def _get_content_selectors(self) -> List[str]:
+        selectors = self.config.get('content_selectors', ['p', 'li', 'span']).copy()
+        if self.config.get('custom_class'):
+            selectors.append(f".{self.config['custom_class']}")
+        return selectors
+        
+    def detect_content_classes(self, zip_source: ZipSource, progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Tuple[str, int]]:
+        if not self.config.get('auto_detect_classes', True): return []
+        class_counter = Counter()
+        backend = get_parser_backend(self.config.get('parser_backend', DEFAULT_PARSER_BACKEND))
+        with open_archive(zip_source) as zip_ref:
+            html_files_info = list_html_members(zip_ref)[:500]
+            for i, file_info in enumerate(html_files_info):
+                if progress_callback: progress_callback(i + 1, len(html_files_info))
+                try:
+                    doc = backend.parse(zip_ref.read(file_info.filename).decode('utf-8', errors='ignore'))
+                    for element in backend.find_all(doc, ['div', 'section', 'article', 'main', 'p']):
+                        classes = backend.classes(element)
+                        if classes and len(backend.get_text(element)) > 100:
+                            for cls in classes:
+                                if not cls.startswith(('js-', 'css-')): class_counter[cls] += 1
+                except Exception: continue
+        return class_counter.most_common(10)
+
+    def analyze_opportunities(self, zip_source: ZipSource, selected_keywords: Optional[List[str]], zip_hash: Optional[str] = None) -> List[Dict]:
+        return list(self.iter_opportunities(zip_source, selected_keywords, zip_hash))
+
+    def export_opportunities(self, zip_source: ZipSource, selected_keywords: Optional[List[str]], path: str, zip_hash: Optional[str] = None,
+                             format: Optional[str] = None) -> int:
+        """Analyse et écrit les opportunités par lots dans `path` (CSV ou Parquet) ; retourne leur nombre"""
+        return write_results(self.iter_opportunities(zip_source, selected_keywords, zip_hash), path, format)
+
+    def iter_opportunities(self, zip_source: ZipSource, selected_keywords: Optional[List[str]], zip_hash: Optional[str] = None) -> Iterator[Dict]:
+        """Analyse l'archive, puis produit les opportunités une à une (dictionnaires), par priorité décroissante"""
+        if self.excel_data is None: return
+        collector = OpportunityCollector(self.config.get('top_k_per_source', 0), self.config.get('top_k_per_target', 0))
+        selectors = self._get_content_selectors()
+        keyword_index = KeywordIndex.from_dataframe(self.excel_data, selected_keywords)
+        if not keyword_index: return
+        
+        with open_archive(zip_source) as zip_ref:
+            page_order = self.config.get('page_order', DEFAULT_PAGE_ORDER)
+            parser_backend = self.config.get('parser_backend', DEFAULT_PARSER_BACKEND)
+            block_mode = self.config.get('block_mode', DEFAULT_BLOCK_MODE)
+            
+            # Hash de l'archive : clé du cache disque et du point de reprise (l'analyse incrémentale a son propre instantané)
+            use_checkpoint = self.config.get('checkpoint', True) and not self.config.get('incremental', False)
+            if zip_hash is None and (self.config.get('use_disk_cache', True) or use_checkpoint): zip_hash = archive_hash(zip_source)
+            
+            # Canonicals lues dans le <head> uniquement ; les pages à analyser seront parsées une seule fois
+            page_store = PageStore(zip_hash, parser_backend, selectors, block_mode=block_mode) if self.config.get('use_disk_cache', True) else None
+            canonical_map = page_store.load_canonical_map() if page_store else None
+            if canonical_map is None:
+                canonical_map = build_canonical_map(zip_ref, selectors, parser_backend, self.progress_factory("Création de l'index des pages HTML", 0), block_mode=block_mode)
+                if page_store: page_store.save_canonical_map(canonical_map)
+            
+            # Graphe des liens de tout le site (une fois par archive) : présence des liens et liens entrants/sortants
+            link_graph = None
+            if self.config.get('build_link_graph', True):
+                link_graph = page_store.load_link_graph() if page_store else None
+                if link_graph is None:
+                    link_graph = build_link_graph(zip_source, canonical_map, parser_backend, max(self.config.get('analysis_workers', 1), 1),
+                                                  self.progress_factory("Construction du graphe des liens internes", 0))
+                    if page_store: page_store.save_link_graph(link_graph)
+            self.link_graph = link_graph
+            
+            # PageRank interne (une fois par archive) : la priorité est pondérée par l'autorité de la page source,
+            # et/ou les pages sont analysées par PageRank décroissant
+            pagerank, source_weights = None, None
+            use_pagerank = self.config.get('use_pagerank', False)
+            if link_graph is not None and (use_pagerank or page_order == 'pagerank'):
+                pagerank = page_store.load_pagerank(DEFAULT_DAMPING) if page_store else None
+                if pagerank is None or len(pagerank) != link_graph.page_count:
+                    self.progress_factory("Calcul du PageRank interne...", 0).update(0, force=True)
+                    pagerank = compute_pagerank(link_graph, DEFAULT_DAMPING)
+                    if page_store: page_store.save_pagerank(DEFAULT_DAMPING, pagerank)
+                # PageRank relatif (1 = page moyenne) mélangé à la priorité GSC selon le poids choisi
+                pagerank = pagerank * link_graph.page_count
+                if use_pagerank:
+                    pagerank_weight = self.config.get('pagerank_weight', 0.5)
+                    source_weights = 1 - pagerank_weight + pagerank_weight * pagerank
+            
+            # Pages sources dans l'ordre choisi : la limite de pages et le budget de temps gardent les premières
+            def page_pagerank(url: str) -> float:
+                node_id = link_graph.node_id(self._normalize_url_for_comparison(url))
+                return float(pagerank[node_id]) if node_id is not None and node_id < len(pagerank) else 0.0
+            source_urls_to_scan = order_source_urls(self.excel_data, page_order, page_pagerank if pagerank is not None else None)
+            max_pages = self.config.get('max_pages_to_analyze', len(source_urls_to_scan))
+            urls_to_process = source_urls_to_scan[:max_pages]
+            
+            # Une tâche par fichier HTML, regroupant les URLs GSC qui pointent vers la même canonical
+            tasks = {}
+            mapped_count = 0
+            for source_url in urls_to_process:
+                if self._is_classic_page(source_url): continue
+                normalized_source_key = self._normalize_url_for_comparison(source_url)
+                entry = canonical_map.get(normalized_source_key)
+                if entry is None: continue
+                mapped_count += 1
+                tasks.setdefault(normalized_source_key, (normalized_source_key, entry, []))[2].append(source_url)
+            tasks = list(tasks.values())
+            
+            # Le budget de temps porte sur l'analyse des pages (l'indexation de l'archive est faite une fois pour toutes)
+            time_budget = TimeBudget(self.config.get('time_budget_seconds', 0), self.should_stop)
+            scan = lambda scan_tasks, index, label, sink: self._scan_tasks(zip_source, zip_ref, scan_tasks, index, selectors, parser_backend, block_mode,
+                                                                           page_store, link_graph, source_weights, label, sink, time_budget)
+            if self.config.get('incremental', False):
+                scanned_pages = self._scan_incremental(zip_ref, tasks, keyword_index, selectors, link_graph, source_weights, collector, scan)
+            else:
+                scanned_pages = self._scan_with_checkpoint(tasks, keyword_index, zip_hash if use_checkpoint else None, selected_keywords, collector, scan)
+            if page_store: page_store.close()
+            self.match_stats = (mapped_count, len(urls_to_process))
+            self.scan_stats = (scanned_pages, len(tasks))
+            self.time_budget_reached = scanned_pages < len(tasks)
+
+        # Opportunités dédoublonnées au fil de l'eau, triées par priorité puis ordre de découverte : la sortie est
+        # déterministe, quel que soit le mode d'exécution. Les dictionnaires sont créés un à un, au fil de la lecture.
+        link_counts = link_graph.link_counts() if link_graph is not None else None
+        if not use_pagerank: pagerank = None
+        for opportunity in collector.results():
+            row = opportunity.to_dict()
+            if link_counts is not None:
+                normalized_source = self._normalize_url_for_comparison(row['source_url'])
+                row['source_outlinks'] = link_counts.get(normalized_source, (0, 0))[1]
+                row['target_inlinks'] = link_counts.get(self._normalize_url_for_comparison(row['target_url']), (0, 0))[0]
+                if pagerank is not None:
+                    node_id = link_graph.node_id(normalized_source)
+                    row['source_pagerank'] = round(float(pagerank[node_id]), 3) if node_id is not None and node_id < len(pagerank) else None
+            yield row
+
+    def _scan_tasks(self, zip_source: ZipSource, zip_ref, tasks: List[ScanTask], keyword_index: KeywordIndex, selectors: List[str],
+                    parser_backend: str, block_mode: str, page_store: Optional[PageStore], link_graph, source_weights, label: str, sink: TaskSink,
+                    time_budget: Optional[TimeBudget] = None) -> None:
+        """
+        Scanne les pages des tâches, sur plusieurs processus si configuré ; `sink(tâche, opportunités)` reçoit les résultats dans l'ordre.
+        Une fois `time_budget` écoulé, les pages restantes ne sont pas scannées (et `sink` n'est pas appelé pour elles).
+        """
+        if not tasks or (time_budget is not None and time_budget.expired()): return
+        workers = min(self.config.get('analysis_workers', 1), len(tasks))
+        automaton, automaton_path = None, None
+        if self.config.get('use_disk_cache', True):
+            automaton, automaton_path = load_or_build_automaton(keyword_index, self.config.get('exact_match_mode', DEFAULT_MATCH_MODE))
+        if workers > 1:
+            scan_tasks_parallel(zip_source, tasks, keyword_index, self.config, selectors, parser_backend, workers, sink,
+                                self.progress_factory(f"{label} ({workers} processus)", len(tasks)), page_store, automaton_path, link_graph, source_weights,
+                                time_budget.expired if time_budget is not None else None)
+        else:
+            scanner = OpportunityScanner(keyword_index, self.config, automaton, link_graph, source_weights)
+            reporter = self.progress_factory(label, len(tasks))
+            for i, task in enumerate(tasks):
+                if time_budget is not None and time_budget.expired(): break
+                reporter.update(i + 1, detail=task[2][0][:80])
+                sink(task, scan_task(zip_ref, scanner, task, selectors, parser_backend, page_store, block_mode))
+
+    def _scan_with_checkpoint(self, tasks: List[ScanTask], keyword_index: KeywordIndex, zip_hash: Optional[str], selected_keywords: Optional[List[str]],
+                              collector: OpportunityCollector, scan: Callable) -> int:
+        """
+        Analyse complète avec point de reprise (sauf si `zip_hash` est None) : les pages enregistrées par une analyse identique interrompue
+        sont reprises sans être scannées, et les pages analysées sont enregistrées au fil de l'eau.
+        Retourne le nombre de pages analysées (reprises comprises).
+        """
+        self.resumed_pages = 0
+        checkpoint = None
+        if zip_hash is not None:
+            checkpoint = AnalysisCheckpoint(checkpoint_key(zip_hash, gsc_data_hash(self.excel_data), self.config, selected_keywords))
+            keys = {task[0] for task in tasks}
+            resumed = set()
+            for key, opportunities in checkpoint.completed():
+                if key not in keys or key in resumed: continue
+                collector.extend(opportunities)
+                resumed.add(key)
+            self.resumed_pages = len(resumed)
+            if resumed: tasks = [task for task in tasks if task[0] not in resumed]
+        scanned = [self.resumed_pages]
+        def sink(task: ScanTask, opportunities: List) -> None:
+            collector.extend(opportunities)
+            scanned[0] += 1
+            if checkpoint is not None: checkpoint.add(task[0], opportunities)
+        try: scan(tasks, keyword_index, "Analyse" if not self.resumed_pages else f"Reprise de l'analyse ({self.resumed_pages} pages déjà analysées)", sink)
+        finally:
+            # Interruption comprise : les pages analysées depuis le dernier enregistrement ne sont pas perdues
+            if checkpoint is not None: checkpoint.flush()
+        if checkpoint is not None and scanned[0] - self.resumed_pages == len(tasks): checkpoint.discard()
+        return scanned[0]
+
+    def _scan_incremental(self, zip_ref, tasks: List[ScanTask], keyword_index: KeywordIndex, selectors: List[str], link_graph, source_weights,
+                          collector: OpportunityCollector, scan: Callable) -> int:
+        """
+        Analyse incrémentale : reprend les opportunités de l'instantané précédent pour les pages inchangées,
+        ne scanne que les pages nouvelles ou modifiées et, dans les pages inchangées, les mots-clés nouveaux ou modifiés.
+        Retourne le nombre de pages complètement analysées : les autres (budget de temps écoulé) ne sont pas enregistrées
+        dans l'instantané et seront réanalysées la fois suivante.
+        """
+        path = snapshot_path(site_key(self.excel_data['page']), analysis_profile(self.config, selectors))
+        previous = AnalysisSnapshot.load(path)
+        snapshot = AnalysisSnapshot.from_keyword_index(keyword_index)
+        changed = snapshot.changed_keywords(previous)
+        fingerprints = []
+        for _, entry, _ in tasks:
+            try: fingerprints.append(member_fingerprint(zip_ref, entry_filename(entry)))
+            except (KeyError, OSError): fingerprints.append(None)
+        results: Dict[str, List] = {}
+        changed_pages, unchanged_pages = [], []
+        for task, fingerprint in zip(tasks, fingerprints):
+            key, _, source_urls = task
+            rows = previous.reusable_rows(key, fingerprint, source_urls) if previous is not None and fingerprint else None
+            if rows is None:
+                changed_pages.append(task); continue
+            results[key] = restore_opportunities(rows, keyword_index, source_weight(link_graph, source_weights, key), changed)
+            unchanged_pages.append(task)
+        # Pages complètement analysées : les pages inchangées sans mot-clé modifié le sont déjà
+        complete = set() if changed else {task[0] for task in unchanged_pages}
+        def sink(task: ScanTask, opportunities: List) -> None:
+            results.setdefault(task[0], []).extend(opportunities)
+            complete.add(task[0])
+        scan(changed_pages, keyword_index, "Analyse des pages nouvelles ou modifiées", sink)
+        if changed: scan(unchanged_pages, keyword_index.subset(changed), "Analyse des mots-clés nouveaux ou modifiés", sink)
+        for task, fingerprint in zip(tasks, fingerprints):
+            opportunities = results.get(task[0], [])
+            collector.extend(opportunities)
+            if fingerprint and task[0] in complete: snapshot.record(task[0], fingerprint, task[2], opportunities)
+        snapshot.save(path)
+        self.incremental_stats = {'changed_pages': len(changed_pages), 'unchanged_pages': len(unchanged_pages), 'changed_keywords': len(changed),
+                                  'baseline': previous is not None}
+        return len(complete)
+
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ligne de commande - Maillage Interne
+====================================
+
+Lance l'analyse des opportunités de maillage interne sans l'interface Streamlit,
+par exemple pour une analyse planifiée chaque nuit sur un très gros site.
+
+La configuration est celle de l'interface (`DEFAULT_CONFIG`), surchargée par un
+fichier JSON (`--config`) puis par les options de la ligne de commande.
+
+Une analyse interrompue (processus arrêté, budget de temps écoulé) reprend là où
+elle s'était arrêtée quand elle est relancée avec les mêmes fichiers et la même
+configuration (`--no-checkpoint` pour repartir de zéro).
+
+Usage:
+    python maillage_cli.py export_gsc.csv export_html.zip -o opportunites.parquet
+    python maillage_cli.py export_gsc.xlsx crawl_html/ -o opportunites.csv --config config.json --workers 8
+    python maillage_cli.py export_gsc.csv crawl_semaine_2.zip -o opportunites.parquet --incremental
+    python maillage_cli.py export_gsc_1.csv export_gsc_2.csv export_html.zip -o opportunites.parquet
+    python maillage_cli.py export_gsc.csv export_html.zip -o opportunites.parquet --page-order priority --time-budget 600
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from linking_analyzer import InternalLinkingAnalyzer, default_config
+from page_order import PAGE_ORDERS
+from progress_reporter import ProgressReporter, format_duration
+from results_writer import RESULT_FORMATS, result_format
+
+
+def load_config(config_path: Optional[str]) -> Dict:
+    """Configuration par défaut, surchargée par le fichier JSON ; les clés inconnues sont refusées"""
+    config = default_config()
+    if not config_path: return config
+    with open(config_path, encoding='utf-8') as f: overrides = json.load(f)
+    unknown = sorted(set(overrides) - set(config))
+    if unknown: raise ValueError(f"Clés de configuration inconnues: {', '.join(unknown)}")
+    config.update(overrides)
+    return config
+
+
+def stderr_progress(label: str, total: int = 0) -> ProgressReporter:
+    """Progression écrite sur la sortie d'erreur, au plus une ligne par seconde"""
+    return ProgressReporter(lambda fraction, text: print(text, file=sys.stderr, flush=True), total, label, min_interval=1.0)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyse des opportunités de maillage interne (sans interface)")
+    parser.add_argument('gsc', nargs='+', help="Export(s) Google Search Console (.csv, .xlsx, .xls) : colonnes Page, Query, Clicks, Position ; plusieurs exports d'une même propriété sont fusionnés")
+    parser.add_argument('archive', help="Archive ZIP ou répertoire des fichiers HTML du crawl")
+    parser.add_argument('-o', '--output', required=True, help="Fichier de résultats (.csv ou .parquet)")
+    parser.add_argument('--format', choices=RESULT_FORMATS, help="Format de sortie (par défaut : selon l'extension)")
+    parser.add_argument('-c', '--config', help="Fichier JSON de configuration (mêmes clés que l'interface)")
+    parser.add_argument('-w', '--workers', type=int, help="Processus parallèles (par défaut : configuration, 0 = tous les cœurs)")
+    parser.add_argument('--keywords', help="Fichier texte des mots-clés à analyser (un par ligne) ; par défaut tous")
+    parser.add_argument('--max-pages', type=int, help="Nombre maximal d'URLs GSC à analyser")
+    parser.add_argument('--page-order', choices=list(PAGE_ORDERS), help="Ordre d'analyse des pages : fichier GSC (par défaut), clics, priorité ou PageRank interne")
+    parser.add_argument('--time-budget', type=float, metavar='SECONDES', help="Durée maximale de l'analyse des pages ; au-delà, les résultats sont partiels")
+    parser.add_argument('--incremental', action='store_true', help="Ne réanalyse que les pages modifiées depuis la dernière analyse incrémentale du site")
+    parser.add_argument('--no-checkpoint', action='store_true', help="N'enregistre pas de point de reprise (une analyse interrompue repart de zéro)")
+    parser.add_argument('--no-cache', action='store_true', help="Désactive le cache disque des pages et de l'automate")
+    parser.add_argument('-q', '--quiet', action='store_true', help="N'affiche pas la progression")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        config = load_config(args.config)
+        result_format(args.output, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr); return 2
+    if args.workers is not None: config['analysis_workers'] = args.workers or os.cpu_count() or 1
+    if args.max_pages is not None: config['max_pages_to_analyze'] = args.max_pages
+    if args.page_order: config['page_order'] = args.page_order
+    if args.time_budget is not None: config['time_budget_seconds'] = args.time_budget
+    if args.no_cache: config['use_disk_cache'] = False
+    if args.incremental: config['incremental'] = True
+    if args.no_checkpoint: config['checkpoint'] = False
+    if not os.path.exists(args.archive):
+        print(f"Erreur: archive introuvable: {args.archive}", file=sys.stderr); return 2
+    selected_keywords = None
+    if args.keywords:
+        with open(args.keywords, encoding='utf-8') as f: selected_keywords = [line.strip() for line in f if line.strip()]
+
+    start = time.monotonic()
+    analyzer = InternalLinkingAnalyzer(config, None if args.quiet else stderr_progress)
+    if not analyzer.load_excel_data(args.gsc):
+        print(analyzer.load_error, file=sys.stderr); return 1
+    if not args.quiet: print(f"Données GSC chargées: {len(analyzer.excel_data)} lignes.", file=sys.stderr)
+    count = analyzer.export_opportunities(os.path.abspath(args.archive), selected_keywords, args.output, format=args.format)
+    if not args.quiet:
+        mapped_count, analyzed_count = analyzer.match_stats
+        print(f"URLs GSC trouvées dans l'archive: {mapped_count}/{analyzed_count}", file=sys.stderr)
+        if analyzer.resumed_pages:
+            print(f"Analyse reprise: {analyzer.resumed_pages} pages déjà analysées", file=sys.stderr)
+        if analyzer.time_budget_reached:
+            print(f"Budget de temps atteint: {analyzer.scan_stats[0]}/{analyzer.scan_stats[1]} pages analysées (résultats partiels)", file=sys.stderr)
+        if analyzer.incremental_stats:
+            stats = analyzer.incremental_stats
+            print(f"Pages réanalysées: {stats['changed_pages']}, reprises: {stats['unchanged_pages']}, mots-clés nouveaux ou modifiés: {stats['changed_keywords']}", file=sys.stderr)
+        print(f"{count} opportunités écrites dans {args.output} ({format_duration(time.monotonic() - start)})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
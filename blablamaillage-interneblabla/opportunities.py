@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Collecte des opportunités - Maillage Interne
+============================================
+
+Les opportunités sont dédoublonnées au fil de l'eau, dès leur découverte, sur une
+clé compacte (URL source, page cible, ancre, type de match, élément source) : la
+première occurrence est conservée. Chaque opportunité est un objet à `__slots__`,
+converti en dictionnaire uniquement pour l'affichage et les exports.
+
+En option, seules les K meilleures opportunités (par priorité) sont gardées par
+page source et/ou par page cible : la mémoire est bornée à ce qui sera réellement
+relu. À priorité égale, la première opportunité découverte est conservée.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import heapq
+import math
+from typing import Dict, Iterable, List, Tuple
+
+# Clé de dédoublonnage : (URL source, page cible, ancre, type de match, élément source)
+OpportunityKey = Tuple[str, str, str, str, str]
+
+LINK_PRESENT_LABEL = "[X] Lien présent"
+NEW_OPPORTUNITY_LABEL = "[OK] Nouvelle opportunité"
+
+
+class Opportunity:
+    """Opportunité de lien : l'ancre `anchor` trouvée sur `source_url` pourrait pointer vers `target_url`"""
+
+    __slots__ = ('source_url', 'target_url', 'anchor', 'priority', 'clicks', 'match_type', 'element_source', 'link_exists', 'anchor_location')
+
+    def __init__(self, source_url: str, target_url: str, anchor: str, priority: float, clicks: float, match_type: str,
+                 element_source: str, link_exists: bool, anchor_location: str):
+        self.source_url = source_url
+        self.target_url = target_url
+        self.anchor = anchor
+        self.priority = priority
+        self.clicks = clicks
+        self.match_type = match_type
+        self.element_source = element_source
+        self.link_exists = link_exists
+        self.anchor_location = anchor_location
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state): setattr(self, name, value)
+
+    @property
+    def key(self) -> OpportunityKey:
+        return (self.source_url, self.target_url, self.anchor, self.match_type, self.element_source)
+
+    @property
+    def rank(self) -> float:
+        """Priorité utilisée pour le classement (une priorité manquante passe en dernier)"""
+        return -math.inf if self.priority != self.priority else self.priority
+
+    def to_dict(self) -> Dict:
+        return {'source_url': self.source_url, 'target_url': self.target_url, 'anchor': self.anchor, 'priority': self.priority, 'clicks': self.clicks, 'match_type': self.match_type, 'element_source': self.element_source, 'existing_link': LINK_PRESENT_LABEL if self.link_exists else NEW_OPPORTUNITY_LABEL, 'anchor_location': self.anchor_location}
+
+
+class OpportunityCollector:
+    """
+    Opportunités dédoublonnées, éventuellement limitées aux K meilleures par page source et par page cible
+    (0 = pas de limite). Le résultat ne dépend que de l'ordre dans lequel les opportunités sont ajoutées.
+    """
+
+    def __init__(self, top_k_per_source: int = 0, top_k_per_target: int = 0):
+        # clé -> (numéro d'ordre de découverte, opportunité)
+        self._records: Dict[OpportunityKey, Tuple[int, Opportunity]] = {}
+        self._seq = 0
+        # Par groupe (source, cible) : limite, tas min des (priorité, -ordre, clé) et nombre d'opportunités conservées.
+        # Une opportunité évincée par l'autre groupe laisse une entrée périmée dans le tas : le tas est compacté dès
+        # que ses entrées périmées sont plus nombreuses que les vivantes, et supprimé quand il n'en reste aucune.
+        self._groups = [(limit, attribute, {}, {}) for limit, attribute in ((top_k_per_source, 'source_url'), (top_k_per_target, 'target_url')) if limit > 0]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, opportunity: Opportunity) -> bool:
+        """Ajoute une opportunité ; retourne False si elle est en doublon ou immédiatement écartée par une limite"""
+        key = opportunity.key
+        if key in self._records: return False
+        seq = self._seq
+        self._seq += 1
+        self._records[key] = (seq, opportunity)
+        for _, attribute, heaps, counts in self._groups:
+            group = getattr(opportunity, attribute)
+            heapq.heappush(heaps.setdefault(group, []), (opportunity.rank, -seq, key))
+            counts[group] = counts.get(group, 0) + 1
+        for limit, attribute, heaps, counts in self._groups:
+            group = getattr(opportunity, attribute)
+            if counts.get(group, 0) > limit: self._evict_lowest(heaps[group])
+        return key in self._records
+
+    def extend(self, opportunities: Iterable[Opportunity]) -> None:
+        for opportunity in opportunities: self.add(opportunity)
+
+    def _is_live(self, entry: Tuple[float, int, OpportunityKey]) -> bool:
+        record = self._records.get(entry[2])
+        return record is not None and record[0] == -entry[1]
+
+    def _evict_lowest(self, heap: List) -> None:
+        while heap:
+            entry = heapq.heappop(heap)
+            if not self._is_live(entry): continue
+            _, opportunity = self._records.pop(entry[2])
+            for _, attribute, heaps, counts in self._groups:
+                group = getattr(opportunity, attribute)
+                counts[group] -= 1
+                if counts[group] == 0:
+                    del counts[group], heaps[group]
+                elif len(heaps[group]) > 2 * counts[group]:
+                    heaps[group] = [live for live in heaps[group] if self._is_live(live)]
+                    heapq.heapify(heaps[group])
+            return
+
+    def results(self) -> List[Opportunity]:
+        """Opportunités par priorité décroissante, puis par ordre de découverte"""
+        return [opportunity for _, opportunity in sorted(self._records.values(), key=lambda record: (-record[1].rank, record[0]))]
+
+    def to_dicts(self) -> List[Dict]:
+        return [opportunity.to_dict() for opportunity in self.results()]
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recherche des opportunités - Maillage Interne
+=============================================
+
+Recherche des mots-clés GSC dans les blocs de contenu d'une page et création
+des opportunités de liens. Le scan peut s'exécuter dans le processus courant
+ou être réparti sur un pool de processus : chaque worker lit lui-même ses
+fichiers dans l'archive ZIP et construit son propre automate à partir du
+`KeywordIndex` (ou recharge l'index et l'automate depuis le cache disque). Les résultats sont fusionnés dans l'ordre des URLs sources,
+ce qui rend la sortie identique à celle du mode séquentiel. Les opportunités
+(objets `Opportunity`) sont dédoublonnées par page puis transmises tâche par
+tâche au fil de l'eau (à un `OpportunityCollector`, en général).
+Un préfiltre par tokens (`KeywordPrefilter`) écarte les blocs sans correspondance
+possible avant l'automate et la recherche floue.
+Avec un cache disque (`PageStore`), les pages déjà parsées ne sont pas reparsées.
+Avec un graphe des liens (`LinkGraph`), la présence d'un lien est vérifiée dans le
+graphe plutôt que dans les liens du modèle de page, et la priorité peut être
+pondérée par l'autorité interne (PageRank) de la page source.
+
+Ce module n'importe pas Streamlit : les workers peuvent l'importer sans l'interface.
+"""
+
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from page_index import DEFAULT_BLOCK_MODE, POOL_CONTEXT, ContentBlock, PageEntry, PageRecord, ZipSource, load_page, normalize_url, open_archive
+from page_store import PageStore
+from keyword_index import KeywordIndex
+from link_graph import LinkGraph
+from opportunities import Opportunity
+from fuzzy_matcher import FUZZY_AVAILABLE, FuzzyMatcher
+from keyword_prefilter import KeywordPrefilter
+from keyword_automaton import (DEFAULT_MATCH_MODE, build_automaton, fold_text, iter_keyword_matches, iter_stem_matches,
+                               load_cached_automaton)
+
+# Tâche de scan : (canonical normalisée, entrée de l'index des canonicals, URLs GSC correspondantes)
+ScanTask = Tuple[str, PageEntry, List[str]]
+# Destination des résultats : appelée avec chaque tâche et ses opportunités, dans l'ordre des tâches
+TaskSink = Callable[[ScanTask, List[Opportunity]], None]
+# Nombre de pages envoyées à un worker en une fois
+SHARD_SIZE = 25
+
+
+def source_weight(link_graph: Optional[LinkGraph], source_weights: Optional[np.ndarray], canonical: str) -> float:
+    """Coefficient de priorité d'une page source (canonical normalisée) ; 1 sans pondération"""
+    if source_weights is None or link_graph is None: return 1.0
+    node_id = link_graph.node_id(canonical)
+    return float(source_weights[node_id]) if node_id is not None and node_id < len(source_weights) else 1.0
+
+
+class OpportunityScanner:
+    """Recherche des opportunités de maillage dans les blocs de contenu d'une page"""
+
+    def __init__(self, keyword_index: KeywordIndex, config: Dict, automaton=None, link_graph: Optional[LinkGraph] = None,
+                 source_weights: Optional[np.ndarray] = None):
+        self.keyword_index = keyword_index
+        self.config = config
+        self.link_graph = link_graph
+        # Coefficient appliqué à la priorité selon la page source (identifiant du graphe), ou None
+        self.source_weights = source_weights
+        self._anchors_lower = [anchor.lower() for anchor in keyword_index.original_queries]
+        self.match_mode = config.get('exact_match_mode', DEFAULT_MATCH_MODE)
+        # L'automate peut être fourni déjà construit (cache disque), pour le même mode de correspondance
+        self.automaton = automaton if automaton is not None else build_automaton(keyword_index, self.match_mode)
+        self.fuzzy_matcher = None
+        if config.get('use_fuzzy_matching', False) and FUZZY_AVAILABLE:
+            self.fuzzy_matcher = FuzzyMatcher(keyword_index.keywords, config.get('fuzzy_threshold', 85))
+        # Préfiltre par tokens : écarte les blocs sans correspondance possible (pas en mode sous-chaîne)
+        self.prefilter = KeywordPrefilter(keyword_index, self.fuzzy_matcher, self.match_mode) if self.match_mode != 'substring' else None
+        # Mode racines : un mot-clé trouvé tel quel (mêmes mots, sans racinisation) reste une correspondance exacte
+        self._word_keys = [fold_text(keyword) for keyword in keyword_index.keywords] if self.match_mode == 'stem' else None
+        self._word_counts = [len(key.split()) for key in self._word_keys] if self._word_keys is not None else None
+
+    @staticmethod
+    def _find_anchor_location(block: ContentBlock, anchor_lower: str) -> str:
+        # Deux recherches de sous-chaîne dans les textes alt / title du bloc, déjà réunis en minuscules
+        if block.alt_texts and anchor_lower in block.alt_lookup: return "Attribut 'alt' (Image)"
+        if block.title_texts and anchor_lower in block.title_lookup: return "Attribut 'title'"
+        return "Texte Principal"
+
+    def _link_exists(self, page: PageRecord, normalized_target: str) -> bool:
+        if self.link_graph is not None: return self.link_graph.has_link(page.canonical, normalized_target)
+        return normalized_target in page.links
+
+    def _source_weight(self, page: PageRecord) -> float:
+        return source_weight(self.link_graph, self.source_weights, page.canonical)
+
+    def _create_opportunity(self, keyword_id: int, source_url, page: PageRecord, match_type, block: ContentBlock, weight: float = 1.0) -> Optional[Opportunity]:
+        keyword_index = self.keyword_index
+        anchor_text, target_page_url = keyword_index.original_queries[keyword_id], keyword_index.pages[keyword_id]
+        normalized_source = normalize_url(source_url)
+        normalized_target = normalize_url(target_page_url)
+        if normalized_source == normalized_target: return None
+        link_exists = self._link_exists(page, normalized_target)
+        anchor_location = self._find_anchor_location(block, self._anchors_lower[keyword_id])
+        priority = keyword_index.priorities[keyword_id] if weight == 1.0 else keyword_index.priorities[keyword_id] * weight
+        return Opportunity(source_url, target_page_url, anchor_text, priority, keyword_index.clicks[keyword_id], match_type, block.element_source, link_exists, anchor_location)
+
+    def _iter_matches(self, text_lower: str) -> Iterator[Tuple[int, str]]:
+        """(position du mot-clé, type de correspondance) des mots-clés trouvés par l'automate, dans l'ordre d'apparition"""
+        if self._word_keys is None:
+            for keyword_id in iter_keyword_matches(self.automaton, text_lower, self.match_mode): yield keyword_id, 'exact'
+            return
+        # Mode racines : correspondance exacte si l'une des occurrences du mot-clé est formée de ses propres mots
+        exact: Dict[int, bool] = {}
+        for keyword_id, words in iter_stem_matches(self.automaton, text_lower, self._word_counts):
+            exact[keyword_id] = exact.get(keyword_id, False) or words == self._word_keys[keyword_id]
+        for keyword_id, is_exact in exact.items(): yield keyword_id, 'exact' if is_exact else 'stem'
+
+    def scan_page(self, source_url: str, page: PageRecord) -> List[Opportunity]:
+        """Retourne les opportunités trouvées dans les blocs de contenu de la page"""
+        opportunities = []
+        A = self.automaton
+        weight = self._source_weight(page)
+        for block in page.blocks:
+            text_content = block.text
+            if len(text_content) < self.config.get('min_keyword_length', 3): continue
+            text_lower = text_content.lower()
+            exact_possible, fuzzy_possible = self.prefilter.check(text_lower) if self.prefilter is not None else (True, True)
+            if not (exact_possible or fuzzy_possible): continue
+
+            found_kws_in_element = set()
+            if A and exact_possible:
+                for keyword_id, match_type in self._iter_matches(text_lower):
+                    if keyword_id in found_kws_in_element: continue
+                    found_kws_in_element.add(keyword_id)
+                    opportunity = self._create_opportunity(keyword_id, source_url, page, match_type, block, weight)
+                    if opportunity: opportunities.append(opportunity)
+
+            if self.fuzzy_matcher and fuzzy_possible:
+                for keyword_id, similarity in self.fuzzy_matcher.match(text_lower, found_kws_in_element):
+                    found_kws_in_element.add(keyword_id)
+                    opportunity = self._create_opportunity(keyword_id, source_url, page, f'fuzzy ({similarity}%)', block, weight)
+                    if opportunity: opportunities.append(opportunity)
+        return opportunities
+
+
+def scan_task(zip_ref: zipfile.ZipFile, scanner: OpportunityScanner, task: ScanTask, selectors: List[str], parser_backend: str,
+              page_store: Optional[PageStore] = None, block_mode: str = DEFAULT_BLOCK_MODE) -> List[Opportunity]:
+    """
+    Charge la page d'une tâche (cache disque ou parsing) et la scanne pour chacune de ses URLs GSC.
+    Les opportunités sont dédoublonnées (première occurrence conservée) avant d'être retournées.
+    """
+    key, entry, source_urls = task
+    try:
+        page = page_store.get_page(key) if page_store else None
+        if page is None:
+            page = load_page(zip_ref, entry, selectors, parser_backend, block_mode)
+            if page and page_store: page_store.put_page(key, page)
+        if not page: return []
+        opportunities = {}
+        for source_url in source_urls:
+            for opportunity in scanner.scan_page(source_url, page): opportunities.setdefault(opportunity.key, opportunity)
+        return list(opportunities.values())
+    except Exception: return []
+
+
+# --- EXÉCUTION PARALLÈLE (pool de processus) ---
+_worker_state: Dict = {}
+
+
+def _init_worker(zip_source, keyword_index, config, selectors, parser_backend, page_store, automaton_path):
+    automaton = None
+    # Avec le cache disque, l'index des mots-clés et l'automate sont relus depuis le fichier au lieu d'être envoyés au worker
+    if automaton_path: keyword_index, automaton = load_cached_automaton(automaton_path)
+    _worker_state['zip_ref'] = open_archive(zip_source)
+    _worker_state['scanner'] = OpportunityScanner(keyword_index, config, automaton)
+    _worker_state['selectors'] = selectors
+    _worker_state['parser_backend'] = parser_backend
+    _worker_state['page_store'] = page_store
+    _worker_state['block_mode'] = config.get('block_mode', DEFAULT_BLOCK_MODE)
+
+
+def _shard_links(link_graph: Optional[LinkGraph], source_weights: Optional[np.ndarray], shard: List[ScanTask]) -> Tuple[Optional[LinkGraph], Optional[np.ndarray]]:
+    """Graphe des liens et pondérations réduits aux pages sources d'un lot : seule cette partie est envoyée avec le lot"""
+    if link_graph is None: return None, None
+    keys = [task[0] for task in shard]
+    weights = np.array([source_weight(link_graph, source_weights, key) for key in keys]) if source_weights is not None else None
+    return link_graph.subgraph(keys), weights
+
+
+def _scan_shard(shard_index: int, shard: List[ScanTask], link_graph: Optional[LinkGraph] = None,
+                source_weights: Optional[np.ndarray] = None) -> Tuple[int, List[List[Opportunity]]]:
+    state = _worker_state
+    scanner = state['scanner']
+    scanner.link_graph, scanner.source_weights = link_graph, source_weights
+    results = [scan_task(state['zip_ref'], scanner, task, state['selectors'], state['parser_backend'], state['page_store'], state['block_mode'])
+               for task in shard]
+    if state['page_store']: state['page_store'].commit()
+    return shard_index, results
+
+
+def scan_tasks_parallel(zip_source: ZipSource, tasks: List[ScanTask], keyword_index: KeywordIndex, config: Dict,
+                        selectors: List[str], parser_backend: str, workers: int, sink: TaskSink,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        page_store: Optional[PageStore] = None, automaton_path: Optional[str] = None,
+                        link_graph: Optional[LinkGraph] = None, source_weights: Optional[np.ndarray] = None,
+                        should_stop: Optional[Callable[[], bool]] = None) -> None:
+    """
+    Répartit les tâches de scan sur un pool de `workers` processus.
+    Avec `automaton_path`, chaque worker recharge l'index des mots-clés et l'automate depuis le cache disque au lieu
+    de les recevoir et de reconstruire l'automate. Le graphe des liens et les pondérations ne sont pas envoyés en entier
+    à chaque worker : chaque lot est accompagné de la partie qui concerne ses pages sources.
+    Les opportunités de chaque tâche sont passées à `sink(tâche, opportunités)` dans l'ordre des tâches :
+    seuls les lots terminés en avance sur le lot attendu restent en mémoire.
+    Dès que `should_stop()` est vrai, les lots non commencés sont annulés ; les lots terminés sont tous transmis
+    (dans l'ordre, avec des trous), y compris ceux qui étaient en cours.
+    """
+    # Chaque worker ouvre sa propre connexion SQLite : aucune connexion ne doit être héritée du processus parent
+    if page_store: page_store.close()
+    shards = [tasks[i:i + SHARD_SIZE] for i in range(0, len(tasks), SHARD_SIZE)]
+    pending: Dict[int, List[List[Opportunity]]] = {}
+    next_shard = done = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT, initializer=_init_worker,
+                             initargs=(zip_source, None if automaton_path else keyword_index, config, selectors, parser_backend, page_store, automaton_path)) as executor:
+        futures = [executor.submit(_scan_shard, i, shard, *_shard_links(link_graph, source_weights, shard)) for i, shard in enumerate(shards)]
+        for future in as_completed(futures):
+            shard_index, results = future.result()
+            pending[shard_index] = results
+            while next_shard in pending:
+                for task, opportunities in zip(shards[next_shard], pending.pop(next_shard)): sink(task, opportunities)
+                next_shard += 1
+            done += len(results)
+            if progress_callback: progress_callback(done, len(tasks))
+            if should_stop is not None and should_stop():
+                for pending_future in futures: pending_future.cancel()
+                break
+    # Après un arrêt : lots terminés non encore transmis (la sortie du pool attend la fin des lots en cours)
+    for future in futures:
+        if future.cancelled(): continue
+        shard_index, results = future.result()
+        if shard_index >= next_shard and shard_index not in pending: pending[shard_index] = results
+    for shard_index in sorted(pending):
+        for task, opportunities in zip(shards[shard_index], pending[shard_index]): sink(task, opportunities)
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index des pages HTML - Modèle de page pour le Maillage Interne
+==============================================================
+
+Chaque fichier HTML de l'archive ZIP est parsé une seule fois pour en extraire
+un modèle de page compact (canonical normalisée, liens sortants normalisés,
+blocs de contenu). Ce modèle sert à la fois à la correspondance canonical
+et à la recherche d'opportunités, ce qui évite de parser deux fois chaque fichier.
+
+La canonical (ou, à défaut, `og:url`) est d'abord lue par un extracteur léger qui
+ne lit que le `<head>` de chaque fichier : seules les pages utiles à l'analyse sont
+ensuite parsées entièrement.
+
+Deux découpages du contenu en blocs sont possibles :
+- `runs` (par défaut) : le texte de la page n'est parcouru qu'une fois. Chaque segment
+  de texte est attribué à l'élément sélectionné le plus proche qui le contient : le
+  texte d'un `<span>` dans un `<p>` dans un `<li>` n'appartient qu'au `<span>`, et
+  celui du `<p>` est coupé en segments de part et d'autre du `<span>`. Limite : une
+  expression à cheval sur un élément sélectionné imbriqué (« vélo <span>électrique</span> »
+  avec `span` sélectionné) est coupée entre deux segments et n'est pas trouvée.
+- `elements` : comportement historique, un bloc par élément sélectionné avec tout son
+  texte, y compris celui des éléments sélectionnés imbriqués (scanné plusieurs fois).
+
+Le moteur de parsing est configurable (`html.parser`, `lxml` ou `selectolax`) :
+les sélecteurs, l'extraction de texte et celle des liens donnent le même résultat
+quel que soit le moteur, tant que le HTML est bien formé.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import html
+import io
+import multiprocessing
+import os
+import re
+import urllib.parse
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, BinaryIO, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, NavigableString
+
+# Gestion des dépendances optionnelles (moteurs de parsing rapides)
+try:
+    import lxml  # noqa: F401 - utilisé comme builder BeautifulSoup
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+DEFAULT_PARSER_BACKEND = 'html.parser'
+BLOCK_MODES = {'runs': "Segments de texte (chaque texte scanné une fois)", 'elements': "Éléments complets (historique)"}
+DEFAULT_BLOCK_MODE = 'runs'
+# Frontière de segment insérée à la place d'un élément sélectionné déjà traité (caractère à usage privé)
+_RUN_BOUNDARY = '\ue000'
+_LOOKUP_SEPARATOR = '\x00'
+# Quantité maximale lue par l'extracteur de canonical avant de basculer sur un parsing complet
+HEAD_SCAN_MAX_BYTES = 64 * 1024
+_HEAD_SCAN_CHUNK_SIZE = 8 * 1024
+_HEAD_END_RE = re.compile(rb'</head\s*>|<body[\s>]', re.IGNORECASE)
+_HTML_COMMENT_RE = re.compile(rb'<!--.*?-->', re.DOTALL)
+_HEAD_TAG_RE = re.compile(rb'<(link|meta)\s([^>]*)>', re.IGNORECASE)
+_ATTRIBUTE_RE = re.compile(rb'([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+
+
+@lru_cache(maxsize=200_000)
+def normalize_url(url: str) -> str:
+    """Normalise une URL pour la comparaison (domaine sans www, sans slash final ni paramètres de tracking)"""
+    if not url: return ""
+    try:
+        url = url.lower()
+        url = re.sub(r'(\?|&)(utm_.*|gclid|fbclid)=[^&]*', '', url)
+        parsed = urllib.parse.urlparse(url)
+        netloc = parsed.netloc.replace('www.', '')
+        path = parsed.path.rstrip('/') or ''
+        query = '?' + urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parsed.query))) if parsed.query else ''
+        return f"{netloc}{path}{query}"
+    except: return url.lower()
+
+
+@dataclass
+class ContentBlock:
+    """Bloc de contenu correspondant à un sélecteur (texte + attributs utiles pour l'ancre)"""
+    element_source: str
+    text: str
+    alt_texts: Tuple[str, ...] = ()
+    title_texts: Tuple[str, ...] = ()
+    # Textes alt / title en minuscules, réunis une fois pour toutes (séparateur absent des ancres)
+    alt_lookup: str = field(init=False, repr=False, compare=False)
+    title_lookup: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.alt_lookup = _LOOKUP_SEPARATOR.join(self.alt_texts).lower()
+        self.title_lookup = _LOOKUP_SEPARATOR.join(self.title_texts).lower()
+
+
+@dataclass
+class PageRecord:
+    """Modèle d'une page HTML de l'archive, construit en une seule passe de parsing"""
+    filename: str
+    canonical: str
+    links: FrozenSet[str] = frozenset()
+    blocks: List[ContentBlock] = field(default_factory=list)
+
+
+# Entrée de l'index des canonicals : (nom du fichier, canonical brute) ou page déjà parsée
+PageEntry = Union[Tuple[str, str], PageRecord]
+
+
+# Archive de crawl : chemin d'un fichier ZIP ou d'un répertoire de fichiers HTML sur disque (recommandé), ou contenu du ZIP en mémoire
+ZipSource = Union[str, bytes]
+
+# Démarrage des processus des pools d'analyse : `forkserver` (`spawn` hors Unix) et non `fork`. Forker un processus qui a
+# d'autres threads (serveur Streamlit, tâches en arrière-plan) peut bloquer le worker sur un verrou tenu par l'un d'eux
+# (journalisation, SQLite) ; le serveur `forkserver` n'a pas de threads. Chaque worker importe les modules d'analyse à son
+# démarrage, et ses arguments lui sont transmis sérialisés : un contenu de ZIP en mémoire est copié dans chacun.
+POOL_CONTEXT = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class DirectoryArchive:
+    """Répertoire de fichiers HTML exposé avec l'interface de `zipfile.ZipFile` utilisée par l'analyse"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def __enter__(self) -> 'DirectoryArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+    def infolist(self) -> List[zipfile.ZipInfo]:
+        """Fichiers du répertoire (récursivement), nommés par leur chemin relatif avec des `/`, dans un ordre stable"""
+        infos = []
+        for directory, subdirectories, files in os.walk(self.root):
+            subdirectories.sort()
+            for name in sorted(files):
+                path = os.path.join(directory, name)
+                info = zipfile.ZipInfo(os.path.relpath(path, self.root).replace(os.sep, '/'))
+                info.file_size = os.path.getsize(path)
+                infos.append(info)
+        return infos
+
+    def getinfo(self, name: str) -> zipfile.ZipInfo:
+        """Informations d'un fichier ; le CRC-32 est calculé en lisant le fichier, comme celui d'un membre de ZIP"""
+        info = zipfile.ZipInfo(name)
+        with self.open(name) as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                info.CRC = zlib.crc32(chunk, info.CRC)
+                info.file_size += len(chunk)
+        return info
+
+    def _path(self, member: Union[str, zipfile.ZipInfo]) -> str:
+        return os.path.join(self.root, *(member.filename if isinstance(member, zipfile.ZipInfo) else member).split('/'))
+
+    def open(self, member: Union[str, zipfile.ZipInfo]) -> BinaryIO:
+        return open(self._path(member), 'rb')
+
+    def read(self, member: Union[str, zipfile.ZipInfo]) -> bytes:
+        with self.open(member) as f: return f.read()
+
+
+def open_archive(zip_source: ZipSource) -> Union[zipfile.ZipFile, DirectoryArchive]:
+    """Ouvre l'archive ; depuis un chemin, les fichiers sont lus à la demande sans charger le ZIP en mémoire"""
+    if isinstance(zip_source, str) and os.path.isdir(zip_source): return DirectoryArchive(zip_source)
+    return zipfile.ZipFile(io.BytesIO(zip_source) if isinstance(zip_source, bytes) else zip_source, 'r')
+
+
+def member_fingerprint(zip_ref: Union[zipfile.ZipFile, DirectoryArchive], filename: str) -> str:
+    """Empreinte du contenu d'un fichier de l'archive : CRC-32 et taille (lus dans le répertoire central d'un ZIP, sans décompression)"""
+    info = zip_ref.getinfo(filename)
+    return f"{info.CRC:08x}:{info.file_size}"
+
+
+def list_html_members(zip_ref: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """Liste les fichiers HTML de l'archive"""
+    return [info for info in zip_ref.infolist() if info.filename.endswith('.html') and not info.is_dir()]
+
+
+class SoupParserBackend:
+    """Moteur BeautifulSoup, avec le builder `html.parser` (pur Python) ou `lxml` (C)"""
+
+    def __init__(self, features: str):
+        self.name = features
+        self.features = features
+
+    def parse(self, html: str) -> Any:
+        return BeautifulSoup(html, self.features)
+
+    def canonical_href(self, doc) -> Optional[str]:
+        canonical_link = doc.find('link', rel='canonical', href=True)
+        return canonical_link['href'] if canonical_link else None
+
+    def og_url(self, doc) -> Optional[str]:
+        og_meta = doc.find('meta', property='og:url', content=True)
+        return og_meta['content'] if og_meta else None
+
+    def hrefs(self, doc) -> List[str]:
+        return [link.get('href') for link in doc.find_all('a', href=True)]
+
+    def select(self, doc, css: str) -> List[Any]:
+        return doc.select(css)
+
+    def find_all(self, doc, tags: List[str]) -> List[Any]:
+        return doc.find_all(tags)
+
+    def get_text(self, element, separator: str = "") -> str:
+        return element.get_text(separator, strip=True)
+
+    def tag_name(self, element) -> str:
+        return element.name
+
+    def classes(self, element) -> List[str]:
+        return element.get('class', [])
+
+    def alt_texts(self, element) -> Tuple[str, ...]:
+        return tuple(img['alt'] for img in element.find_all('img', alt=True))
+
+    def title_texts(self, element) -> Tuple[str, ...]:
+        title_texts = tuple(child['title'] for child in element.find_all(title=True))
+        if element.has_attr('title'): title_texts = (element['title'],) + title_texts
+        return title_texts
+
+    def replace_with_text(self, element, text: str) -> None:
+        element.replace_with(NavigableString(text))
+
+
+class SelectolaxParserBackend:
+    """Moteur selectolax (Lexbor, moteur de sélecteurs CSS en C), aligné sur la sémantique BeautifulSoup"""
+    name = 'selectolax'
+    # Comme BeautifulSoup.get_text, le contenu de ces balises n'est pas considéré comme du texte
+    _NON_TEXT_PARENTS = {'script', 'style', 'template'}
+
+    def parse(self, html: str) -> Any:
+        return LexborHTMLParser(html)
+
+    def canonical_href(self, doc) -> Optional[str]:
+        for link in doc.css('link[rel~="canonical"][href]'):
+            href = link.attributes.get('href')
+            if href is not None: return href
+        return None
+
+    def og_url(self, doc) -> Optional[str]:
+        for meta in doc.css('meta[property="og:url"][content]'):
+            content = meta.attributes.get('content')
+            if content is not None: return content
+        return None
+
+    def hrefs(self, doc) -> List[str]:
+        return [link.attributes.get('href') or '' for link in doc.css('a[href]')]
+
+    def select(self, doc, css: str) -> List[Any]:
+        return doc.css(css)
+
+    def find_all(self, doc, tags: List[str]) -> List[Any]:
+        return doc.css(', '.join(tags))
+
+    def get_text(self, element, separator: str = "") -> str:
+        parts = []
+        for node in element.traverse(include_text=True):
+            if node.tag != '-text' or node.parent.tag in self._NON_TEXT_PARENTS: continue
+            text = node.text_content.strip()
+            if text: parts.append(text)
+        return separator.join(parts)
+
+    def tag_name(self, element) -> str:
+        return element.tag
+
+    def classes(self, element) -> List[str]:
+        return (element.attributes.get('class') or '').split()
+
+    @staticmethod
+    def _descendants(element, css: str) -> Iterable[Any]:
+        # Contrairement à BeautifulSoup, Node.css() inclut l'élément lui-même
+        return (node for node in element.css(css) if node.mem_id != element.mem_id)
+
+    def alt_texts(self, element) -> Tuple[str, ...]:
+        return tuple(img.attributes.get('alt') or '' for img in self._descendants(element, 'img[alt]'))
+
+    def title_texts(self, element) -> Tuple[str, ...]:
+        title_texts = tuple(child.attributes.get('title') or '' for child in self._descendants(element, '[title]'))
+        if 'title' in element.attributes: title_texts = (element.attributes.get('title') or '',) + title_texts
+        return title_texts
+
+    def replace_with_text(self, element, text: str) -> None:
+        element.replace_with(text)
+
+
+def available_parser_backends() -> List[str]:
+    """Liste des moteurs de parsing utilisables dans l'environnement courant"""
+    backends = ['html.parser']
+    if LXML_AVAILABLE: backends.append('lxml')
+    if SELECTOLAX_AVAILABLE: backends.append('selectolax')
+    return backends
+
+
+@lru_cache(maxsize=None)
+def get_parser_backend(name: str = DEFAULT_PARSER_BACKEND):
+    """Retourne le moteur demandé, ou `html.parser` s'il n'est pas installé"""
+    if name not in available_parser_backends(): name = DEFAULT_PARSER_BACKEND
+    if name == 'selectolax': return SelectolaxParserBackend()
+    return SoupParserBackend(name)
+
+
+def _element_source(backend, element) -> str:
+    classes = backend.classes(element)
+    class_str = f".{'.'.join(classes)}" if classes else ""
+    return f"<{backend.tag_name(element)}{class_str}>"
+
+
+def _extract_block(backend, element) -> ContentBlock:
+    return ContentBlock(_element_source(backend, element), backend.get_text(element, " "), backend.alt_texts(element), backend.title_texts(element))
+
+
+def _extract_blocks(backend, doc, selectors: List[str], block_mode: str = DEFAULT_BLOCK_MODE) -> List[ContentBlock]:
+    """Blocs de contenu du document, dans l'ordre du document (le mode `runs` modifie l'arbre)"""
+    elements = backend.select(doc, ', '.join(selectors))
+    if block_mode != 'runs': return [_extract_block(backend, element) for element in elements]
+    # Du dernier élément au premier : les éléments imbriqués sont traités avant leurs ancêtres puis remplacés
+    # par une frontière de segment, leur texte n'est donc ni répété ni fusionné avec celui de l'ancêtre
+    element_blocks = []
+    for element in reversed(elements):
+        element_source, alt_texts, title_texts = _element_source(backend, element), backend.alt_texts(element), backend.title_texts(element)
+        runs = (run.strip() for run in backend.get_text(element, " ").split(_RUN_BOUNDARY))
+        element_blocks.append([ContentBlock(element_source, run, alt_texts, title_texts) for run in runs if run])
+        backend.replace_with_text(element, _RUN_BOUNDARY)
+    return [block for blocks in reversed(element_blocks) for block in blocks]
+
+
+def _parse_head_attributes(raw_attributes: bytes) -> Dict[str, str]:
+    attributes = {}
+    for match in _ATTRIBUTE_RE.finditer(raw_attributes):
+        value = next((group for group in match.groups()[1:] if group is not None), b'')
+        attributes.setdefault(match.group(1).decode('ascii', errors='ignore').lower(), html.unescape(value.decode('utf-8', errors='ignore')))
+    return attributes
+
+
+def extract_head_canonical(head: bytes) -> Optional[str]:
+    """Cherche la canonical (puis `og:url`) dans le début d'un document, sans construire d'arbre HTML"""
+    og_url = None
+    for match in _HEAD_TAG_RE.finditer(_HTML_COMMENT_RE.sub(b'', head)):
+        attributes = _parse_head_attributes(match.group(2))
+        if match.group(1).lower() == b'link':
+            if 'canonical' in attributes.get('rel', '').split() and 'href' in attributes: return attributes['href']
+        elif og_url is None and attributes.get('property') == 'og:url' and 'content' in attributes:
+            og_url = attributes['content']
+    return og_url
+
+
+def read_head_canonical(zip_ref: zipfile.ZipFile, file_info: zipfile.ZipInfo, max_bytes: int = HEAD_SCAN_MAX_BYTES) -> Optional[str]:
+    """Lit le membre du ZIP par blocs jusqu'à `</head>` (ou `max_bytes`) et en extrait la canonical"""
+    head = b''
+    with zip_ref.open(file_info) as member:
+        while len(head) < max_bytes:
+            chunk = member.read(_HEAD_SCAN_CHUNK_SIZE)
+            if not chunk: break
+            # On garde un recouvrement pour détecter un `</head>` coupé entre deux blocs
+            search_from = max(0, len(head) - 16)
+            head += chunk
+            end = _HEAD_END_RE.search(head, search_from)
+            if end:
+                head = head[:end.start()]
+                break
+    return extract_head_canonical(head)
+
+
+def parse_page(content: bytes, filename: str, selectors: List[str], parser_backend: str = DEFAULT_PARSER_BACKEND,
+               canonical_href: Optional[str] = None, block_mode: str = DEFAULT_BLOCK_MODE) -> Optional[PageRecord]:
+    """
+    Parse un fichier HTML et retourne son modèle de page, ou None s'il n'a ni canonical ni `og:url`.
+    Si la canonical est déjà connue (extracteur de `<head>`), elle n'est pas recherchée dans le document.
+    """
+    backend = get_parser_backend(parser_backend)
+    doc = backend.parse(content.decode('utf-8', errors='ignore'))
+    base_url = _base_url(backend, doc, canonical_href)
+    if base_url is None: return None
+    # Liens extraits avant les blocs : le découpage en segments retire les éléments sélectionnés de l'arbre
+    links = _extract_links(backend, doc, base_url)
+    return PageRecord(filename, normalize_url(base_url), links, _extract_blocks(backend, doc, selectors, block_mode))
+
+
+def parse_page_links(content: bytes, parser_backend: str = DEFAULT_PARSER_BACKEND,
+                     canonical_href: Optional[str] = None) -> Optional[FrozenSet[str]]:
+    """Liens sortants normalisés d'un fichier HTML (mêmes règles que `parse_page`, sans extraire les blocs)"""
+    backend = get_parser_backend(parser_backend)
+    doc = backend.parse(content.decode('utf-8', errors='ignore'))
+    base_url = _base_url(backend, doc, canonical_href)
+    if base_url is None: return None
+    return _extract_links(backend, doc, base_url)
+
+
+def _base_url(backend, doc, canonical_href: Optional[str]) -> Optional[str]:
+    base_url = canonical_href if canonical_href is not None else backend.canonical_href(doc)
+    return base_url if base_url is not None else backend.og_url(doc)
+
+
+def _extract_links(backend, doc, base_url: str) -> FrozenSet[str]:
+    return frozenset(
+        normalize_url(urllib.parse.urljoin(base_url, href))
+        for href in backend.hrefs(doc)
+        if href and not href.startswith(('mailto:', 'tel:'))
+    )
+
+
+def build_canonical_map(zip_ref: zipfile.ZipFile, selectors: List[str], parser_backend: str = DEFAULT_PARSER_BACKEND,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        head_scan_bytes: int = HEAD_SCAN_MAX_BYTES, block_mode: str = DEFAULT_BLOCK_MODE) -> Dict[str, PageEntry]:
+    """
+    Construit l'index {canonical normalisée: entrée} de toutes les pages de l'archive.
+
+    Les canonicals sont lues dans le `<head>` de chaque fichier (lecture partielle, sans parsing) et
+    l'entrée vaut alors `(nom du fichier, canonical brute)`. Un fichier dont le `<head>` ne contient
+    pas la balise est parsé entièrement et l'entrée est directement son PageRecord.
+    En cas de canonical dupliquée, le dernier fichier rencontré l'emporte.
+    """
+    canonical_map: Dict[str, PageEntry] = {}
+    html_files_info = list_html_members(zip_ref)
+    total = len(html_files_info)
+    for i, file_info in enumerate(html_files_info):
+        if progress_callback and i % 100 == 0: progress_callback(i + 1, total)
+        try:
+            canonical_href = read_head_canonical(zip_ref, file_info, head_scan_bytes)
+            if canonical_href is not None:
+                canonical_map[normalize_url(canonical_href)] = (file_info.filename, canonical_href)
+                continue
+            page = parse_page(zip_ref.read(file_info.filename), file_info.filename, selectors, parser_backend, block_mode=block_mode)
+            if page: canonical_map[page.canonical] = page
+        except Exception: continue
+    return canonical_map
+
+
+def entry_filename(entry: PageEntry) -> str:
+    """Nom du fichier d'une entrée de `build_canonical_map`"""
+    return entry.filename if isinstance(entry, PageRecord) else entry[0]
+
+
+def load_page(zip_ref: zipfile.ZipFile, entry: PageEntry, selectors: List[str], parser_backend: str = DEFAULT_PARSER_BACKEND,
+              block_mode: str = DEFAULT_BLOCK_MODE) -> Optional[PageRecord]:
+    """Retourne le PageRecord d'une entrée de `build_canonical_map`, en parsant le fichier si nécessaire"""
+    if isinstance(entry, PageRecord): return entry
+    filename, canonical_href = entry
+    return parse_page(zip_ref.read(filename), filename, selectors, parser_backend, canonical_href, block_mode)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ordre d'analyse des pages - Maillage Interne
+============================================
+
+Avec une limite de pages (`max_pages_to_analyze`) ou un budget de temps, l'ordre
+des pages sources décide de celles qui sont analysées. Par défaut, c'est l'ordre
+d'apparition dans l'export GSC ; les autres ordres classent les pages par score
+décroissant (à score égal, l'ordre du fichier est gardé) :
+- `clicks` : somme des clics des requêtes de la page ;
+- `priority` : somme des priorités (clics / position) des requêtes de la page ;
+- `pagerank` : PageRank interne de la page (graphe des liens de l'archive).
+
+`TimeBudget` arrête l'analyse proprement une fois la durée écoulée : les pages
+déjà analysées (les meilleures, dans l'ordre choisi) donnent un résultat partiel.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PAGE_ORDERS = {
+    'file': "Ordre du fichier GSC",
+    'clicks': "Clics (total par page)",
+    'priority': "Priorité (total par page)",
+    'pagerank': "PageRank interne"
+}
+DEFAULT_PAGE_ORDER = 'file'
+
+
+def order_source_urls(gsc_data: pd.DataFrame, order: str = DEFAULT_PAGE_ORDER,
+                      pagerank_of: Optional[Callable[[str], float]] = None) -> List[str]:
+    """
+    URLs uniques de l'export GSC, classées selon `order`.
+    `pagerank_of(url)` donne le PageRank d'une URL (0 si absente du graphe) ; sans lui, l'ordre `pagerank` garde l'ordre du fichier.
+    """
+    if order not in PAGE_ORDERS: raise ValueError(f"Ordre inconnu: {order}. Ordres disponibles: {', '.join(PAGE_ORDERS)}")
+    urls = [str(url) for url in gsc_data['page'].unique()]
+    if order == 'file' or (order == 'pagerank' and pagerank_of is None): return urls
+    if order == 'pagerank':
+        scores = np.array([pagerank_of(url) for url in urls], dtype=np.float64)
+    else:
+        scores = gsc_data.groupby(gsc_data['page'].astype(str), sort=False)[order].sum().reindex(urls).fillna(0).to_numpy(dtype=np.float64)
+    # Tri stable : à score égal, l'ordre du fichier est gardé
+    return [urls[i] for i in np.argsort(-scores, kind='stable')]
+
+
+class TimeBudget:
+    """
+    Durée maximale d'une étape (0 = illimitée), mesurée à partir de la création.
+    `should_stop()` (annulation demandée par l'utilisateur) met fin au budget avant son terme.
+    """
+
+    __slots__ = ('seconds', 'deadline', 'should_stop')
+
+    def __init__(self, seconds: float = 0, should_stop: Optional[Callable[[], bool]] = None):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds if seconds and seconds > 0 else None
+        self.should_stop = should_stop
+
+    def expired(self) -> bool:
+        return (self.deadline is not None and time.monotonic() >= self.deadline) or (self.should_stop is not None and self.should_stop())
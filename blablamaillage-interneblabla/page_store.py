@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache disque de l'index des pages - Maillage Interne
+====================================================
+
+Persiste l'index des canonicals et les modèles de page (canonical normalisée,
+liens sortants normalisés, blocs de texte extraits) dans une base SQLite locale,
+identifiée par le hash SHA-256 du contenu de l'archive ZIP.
+
+Relancer une analyse sur la même archive (autres filtres GSC, seuils ou mots-clés)
+ne reparse donc aucun fichier HTML. Les blocs de contenu dépendant du moteur de
+parsing, des sélecteurs et du découpage en blocs, les pages sont stockées par « profil »
+(moteur + sélecteurs + découpage).
+Le graphe des liens internes de l'archive, et le PageRank qui en découle, sont
+stockés par moteur de parsing.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from link_graph import LinkGraph
+from page_index import DEFAULT_BLOCK_MODE, ContentBlock, DirectoryArchive, PageEntry, PageRecord, ZipSource
+
+# Répertoire du cache (surchargeable par la variable d'environnement MAILLAGE_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.environ.get('MAILLAGE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'maillage_interne_cache'))
+# Répertoire où sont écrites les archives ZIP uploadées (une copie par contenu)
+DEFAULT_UPLOAD_DIR = os.environ.get('MAILLAGE_UPLOAD_DIR', os.path.join(tempfile.gettempdir(), 'maillage_interne_uploads'))
+# Nombre d'archives conservées dans le cache et dans le répertoire d'upload (les plus anciennes sont supprimées)
+MAX_CACHED_ARCHIVES = 5
+# Nombre d'écritures regroupées dans une même transaction
+_COMMIT_EVERY = 200
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Le cache est facultatif : ces erreurs désactivent simplement la lecture ou l'écriture concernée
+_CACHE_ERRORS = (sqlite3.Error, OSError)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS canonicals (key TEXT PRIMARY KEY, filename TEXT NOT NULL, canonical_href TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    profile TEXT NOT NULL, key TEXT NOT NULL, filename TEXT NOT NULL, links TEXT NOT NULL, blocks TEXT NOT NULL,
+    PRIMARY KEY (profile, key)
+);
+CREATE TABLE IF NOT EXISTS page_ranks (
+    parser_backend TEXT NOT NULL, damping REAL NOT NULL, scores BLOB NOT NULL, PRIMARY KEY (parser_backend, damping)
+);
+CREATE TABLE IF NOT EXISTS link_graphs (
+    parser_backend TEXT PRIMARY KEY, page_count INTEGER NOT NULL, urls TEXT NOT NULL, indptr BLOB NOT NULL, indices BLOB NOT NULL
+);
+"""
+
+
+def archive_hash(zip_source: ZipSource) -> str:
+    """
+    Hash SHA-256 du contenu de l'archive (octets en mémoire ou chemin de fichier).
+    Pour un répertoire, le hash porte sur le chemin, la taille et la date de modification de chaque fichier.
+    """
+    digest = hashlib.sha256()
+    if isinstance(zip_source, bytes):
+        digest.update(zip_source)
+    elif os.path.isdir(zip_source):
+        for info in DirectoryArchive(zip_source).infolist():
+            stat = os.stat(os.path.join(zip_source, *info.filename.split('/')))
+            digest.update(f"{info.filename}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    else:
+        with open(zip_source, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''): digest.update(chunk)
+    return digest.hexdigest()
+
+
+def prune_directory(directory: str, extension: str, keep: int, companion_suffixes: Tuple[str, ...] = ()) -> None:
+    """Ne garde que les `keep` fichiers `extension` les plus récents du répertoire"""
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(extension)]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        for suffix in ('',) + companion_suffixes:
+            try: os.remove(path + suffix)
+            except OSError: pass
+
+
+def store_uploaded_archive(uploaded_file: BinaryIO, upload_dir: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Écrit une archive uploadée sur disque, par blocs, en calculant son hash au passage.
+    Retourne (chemin, hash). Le fichier est nommé par son hash : un même ZIP n'est écrit qu'une fois.
+    """
+    upload_dir = upload_dir or DEFAULT_UPLOAD_DIR
+    os.makedirs(upload_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile('wb', dir=upload_dir, suffix='.part', delete=False) as tmp:
+        for chunk in iter(lambda: uploaded_file.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            tmp.write(chunk)
+    zip_hash = digest.hexdigest()
+    path = os.path.join(upload_dir, f"{zip_hash}.zip")
+    if os.path.exists(path):
+        os.remove(tmp.name)
+        os.utime(path)
+    else:
+        os.replace(tmp.name, path)
+        prune_directory(upload_dir, '.zip', MAX_CACHED_ARCHIVES)
+    return path, zip_hash
+
+
+class PageStore:
+    """
+    Index des pages d'une archive, persisté dans SQLite.
+    L'objet est sérialisable : chaque processus (workers compris) ouvre sa propre connexion.
+    """
+
+    def __init__(self, zip_hash: str, parser_backend: str, selectors: List[str], cache_dir: Optional[str] = None,
+                 block_mode: str = DEFAULT_BLOCK_MODE):
+        self.zip_hash = zip_hash
+        self.parser_backend = parser_backend
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.db_path = os.path.join(self.cache_dir, f"{zip_hash}.sqlite")
+        self.profile = hashlib.sha1(json.dumps([parser_backend, list(selectors), block_mode]).encode('utf-8')).hexdigest()[:16]
+        self._conn = None
+        self._pending = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'], state['_pending'] = None, 0
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            is_new = not os.path.exists(self.db_path)
+            self._conn = sqlite3.connect(self.db_path, timeout=60)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+            if is_new: prune_directory(self.cache_dir, '.sqlite', MAX_CACHED_ARCHIVES, ('-wal', '-shm'))
+            else: os.utime(self.db_path)
+        return self._conn
+
+    def _written(self, count: int = 1) -> None:
+        self._pending += count
+        if self._pending >= _COMMIT_EVERY: self.commit()
+
+    def commit(self) -> None:
+        if self._conn is not None and self._pending:
+            try: self._conn.commit()
+            except _CACHE_ERRORS: pass
+            self._pending = 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.commit()
+                self._conn.close()
+            except _CACHE_ERRORS: pass
+            self._conn = None
+            self._pending = 0
+
+    def load_canonical_map(self) -> Optional[Dict[str, PageEntry]]:
+        """Index des canonicals enregistré pour l'archive, ou None s'il n'a pas encore été construit"""
+        try:
+            if not self.conn.execute("SELECT 1 FROM meta WHERE name = 'canonical_map'").fetchone(): return None
+            # Les pages sans canonical dans le <head> (canonical_href NULL) sont reparsées entièrement si absentes du cache
+            return {key: (filename, canonical_href) for key, filename, canonical_href in self.conn.execute("SELECT key, filename, canonical_href FROM canonicals")}
+        except _CACHE_ERRORS: return None
+
+    def save_canonical_map(self, canonical_map: Dict[str, PageEntry]) -> None:
+        rows = []
+        for key, entry in canonical_map.items():
+            if isinstance(entry, PageRecord):
+                rows.append((key, entry.filename, None))
+                self.put_page(key, entry)
+            else:
+                rows.append((key, entry[0], entry[1]))
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM canonicals")
+                self.conn.executemany("INSERT INTO canonicals (key, filename, canonical_href) VALUES (?, ?, ?)", rows)
+                self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('canonical_map', 'complete')")
+        except _CACHE_ERRORS: pass
+        self._pending = 0
+
+    def get_page(self, key: str) -> Optional[PageRecord]:
+        """Modèle de page en cache, ou None (absent ou base indisponible : la page sera reparsée)"""
+        try:
+            row = self.conn.execute("SELECT filename, links, blocks FROM pages WHERE profile = ? AND key = ?", (self.profile, key)).fetchone()
+        except _CACHE_ERRORS: return None
+        if row is None: return None
+        filename, links, blocks = row
+        return PageRecord(
+            filename, key, frozenset(json.loads(links)),
+            [ContentBlock(element_source, text, tuple(alt_texts), tuple(title_texts)) for element_source, text, alt_texts, title_texts in json.loads(blocks)]
+        )
+
+    def put_page(self, key: str, page: PageRecord) -> None:
+        """Enregistre un modèle de page ; une erreur d'écriture n'interrompt pas l'analyse"""
+        blocks = [[block.element_source, block.text, list(block.alt_texts), list(block.title_texts)] for block in page.blocks]
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (profile, key, filename, links, blocks) VALUES (?, ?, ?, ?, ?)",
+                (self.profile, key, page.filename, json.dumps(sorted(page.links), ensure_ascii=False), json.dumps(blocks, ensure_ascii=False))
+            )
+            self._written()
+        except _CACHE_ERRORS: pass
+
+    def load_link_graph(self) -> Optional[LinkGraph]:
+        """Graphe des liens enregistré pour l'archive et le moteur de parsing, ou None"""
+        try:
+            row = self.conn.execute("SELECT page_count, urls, indptr, indices FROM link_graphs WHERE parser_backend = ?", (self.parser_backend,)).fetchone()
+        except _CACHE_ERRORS: return None
+        if row is None: return None
+        page_count, urls, indptr, indices = row
+        return LinkGraph(json.loads(urls), page_count, np.frombuffer(indptr, dtype=np.int64), np.frombuffer(indices, dtype=np.int32))
+
+    def save_link_graph(self, link_graph: LinkGraph) -> None:
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO link_graphs (parser_backend, page_count, urls, indptr, indices) VALUES (?, ?, ?, ?, ?)",
+                    (self.parser_backend, link_graph.page_count, json.dumps(link_graph.urls, ensure_ascii=False),
+                     link_graph.indptr.astype(np.int64).tobytes(), link_graph.indices.astype(np.int32).tobytes())
+                )
+        except _CACHE_ERRORS: pass
+        self._pending = 0
+
+    def load_pagerank(self, damping: float) -> Optional[np.ndarray]:
+        """PageRank enregistré pour l'archive, le moteur de parsing et le facteur d'amortissement, ou None"""
+        try:
+            row = self.conn.execute("SELECT scores FROM page_ranks WHERE parser_backend = ? AND damping = ?", (self.parser_backend, damping)).fetchone()
+        except _CACHE_ERRORS: return None
+        return np.frombuffer(row[0], dtype=np.float64) if row else None
+
+    def save_pagerank(self, damping: float, scores: np.ndarray) -> None:
+        try:
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO page_ranks (parser_backend, damping, scores) VALUES (?, ?, ?)",
+                                  (self.parser_backend, damping, scores.astype(np.float64).tobytes()))
+        except _CACHE_ERRORS: pass
+        self._pending = 0
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Écriture des résultats - Maillage Interne
+=========================================
+
+Écrit les opportunités en CSV ou en Parquet par lots de `CHUNK_SIZE` lignes :
+la table complète n'est jamais construite en mémoire, ce qui permet d'exporter
+les résultats de très gros sites.
+
+Le fichier de résultats est ensuite relu par morceaux : une page de lignes pour
+l'affichage (`read_results`), des compteurs pour le tableau de bord
+(`summarize_results`) et la conversion en fichiers à télécharger (`export_results`).
+
+`pyarrow` (optionnel) est nécessaire pour le format Parquet, `openpyxl` pour l'export Excel.
+
+Ce module n'importe pas Streamlit : il peut être utilisé hors de l'interface.
+"""
+
+import csv
+import os
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from page_store import DEFAULT_CACHE_DIR, prune_directory
+
+# Gestion des dépendances optionnelles
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+try:
+    from openpyxl import Workbook
+    XLSX_EXPORT_AVAILABLE = True
+except ImportError:
+    XLSX_EXPORT_AVAILABLE = False
+
+RESULT_FORMATS = ('csv', 'parquet')
+# Nombre de lignes écrites à la fois (un groupe de lignes Parquet)
+CHUNK_SIZE = 50000
+
+# Répertoire des fichiers de résultats de l'interface, et nombre de fichiers conservés
+DEFAULT_RESULTS_DIR = os.path.join(DEFAULT_CACHE_DIR, 'results')
+MAX_RESULT_FILES = 10
+# Nombre maximal de lignes de données d'une feuille Excel
+EXCEL_MAX_ROWS = 1048575
+# Fichiers à télécharger créés à côté du fichier de résultats
+EXPORT_SUFFIXES = ('.export.csv', '.export.xlsx')
+
+# Colonnes des opportunités, dans l'ordre d'export, avec leur type Parquet
+RESULT_COLUMNS = {
+    'source_url': 'string', 'target_url': 'string', 'anchor': 'string', 'priority': 'float64', 'clicks': 'float64',
+    'match_type': 'string', 'element_source': 'string', 'existing_link': 'string', 'anchor_location': 'string',
+    'source_outlinks': 'int64', 'target_inlinks': 'int64', 'source_pagerank': 'float64'
+}
+
+
+def result_format(path: str, format: Optional[str] = None) -> str:
+    """Format d'export : celui demandé, sinon déduit de l'extension du fichier (CSV par défaut)"""
+    format = (format or ('parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv')).lower()
+    if format not in RESULT_FORMATS: raise ValueError(f"Format inconnu: {format}. Formats disponibles: {', '.join(RESULT_FORMATS)}")
+    if format == 'parquet' and not PARQUET_AVAILABLE: raise ValueError("Pour l'export Parquet, installez `pyarrow`")
+    return format
+
+
+class ResultsWriter:
+    """
+    Écrit des opportunités (dictionnaires) par lots dans un fichier CSV ou Parquet.
+    Les colonnes sont fixées par la première ligne : colonnes connues dans l'ordre de `RESULT_COLUMNS`, puis les autres.
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.format = result_format(path, format)
+        self.chunk_size = chunk_size
+        self.columns: Optional[List[str]] = None
+        self.rows_written = 0
+        self._chunk: List[Dict] = []
+        self._file = None
+        self._writer = None
+
+    def __enter__(self) -> 'ResultsWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open(self, first_row: Dict) -> None:
+        self.columns = [column for column in RESULT_COLUMNS if column in first_row] + [column for column in first_row if column not in RESULT_COLUMNS]
+        if self.format == 'csv':
+            self._file = open(self.path, 'w', newline='', encoding='utf-8-sig')
+            self._writer = csv.DictWriter(self._file, self.columns, restval='', extrasaction='ignore')
+            self._writer.writeheader()
+        else:
+            schema = pa.schema([(column, getattr(pa, RESULT_COLUMNS.get(column, 'string'))()) for column in self.columns])
+            self._writer = pq.ParquetWriter(self.path, schema)
+
+    def _flush(self) -> None:
+        if not self._chunk: return
+        if self._writer is None: self._open(self._chunk[0])
+        if self.format == 'csv':
+            self._writer.writerows(self._chunk)
+        else:
+            self._writer.write_table(pa.Table.from_pylist([{column: row.get(column) for column in self.columns} for row in self._chunk], schema=self._writer.schema))
+        self.rows_written += len(self._chunk)
+        self._chunk = []
+
+    def write(self, row: Dict) -> None:
+        self._chunk.append(row)
+        if len(self._chunk) >= self.chunk_size: self._flush()
+
+    def write_all(self, rows: Iterable[Dict]) -> int:
+        for row in rows: self.write(row)
+        return self.rows_written + len(self._chunk)
+
+    def close(self) -> None:
+        if self.columns is not None and self._writer is None: return
+        self._flush()
+        # Aucune opportunité : fichier vide avec les colonnes connues
+        if self._writer is None: self._open(dict.fromkeys(RESULT_COLUMNS))
+        if self.format == 'parquet': self._writer.close()
+        if self._file: self._file.close()
+        self._writer, self._file = None, None
+
+
+def write_results(rows: Iterable[Dict], path: str, format: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Écrit les opportunités dans `path` ; retourne le nombre de lignes écrites"""
+    with ResultsWriter(path, format, chunk_size) as writer:
+        writer.write_all(rows)
+    return writer.rows_written
+
+
+def new_results_path(results_dir: Optional[str] = None) -> str:
+    """Chemin d'un nouveau fichier de résultats (Parquet si `pyarrow` est installé, sinon CSV) ; les plus anciens sont supprimés"""
+    results_dir = results_dir or DEFAULT_RESULTS_DIR
+    os.makedirs(results_dir, exist_ok=True)
+    extension = '.results.parquet' if PARQUET_AVAILABLE else '.results.csv'
+    prune_directory(results_dir, extension, MAX_RESULT_FILES - 1, EXPORT_SUFFIXES)
+    return os.path.join(results_dir, f"{uuid.uuid4().hex}{extension}")
+
+
+def _is_parquet(path: str) -> bool:
+    return result_format(path) == 'parquet'
+
+
+def iter_result_chunks(path: str, chunk_size: int = CHUNK_SIZE, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Relit le fichier de résultats par morceaux de `chunk_size` lignes (éventuellement limités à `columns`)"""
+    if _is_parquet(path):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, encoding='utf-8-sig', chunksize=chunk_size, usecols=columns, keep_default_na=False, na_values=[''])
+
+
+def read_results(path: str, offset: int = 0, limit: int = 100) -> pd.DataFrame:
+    """Lignes `offset` à `offset + limit` du fichier de résultats, sans lire le reste du fichier"""
+    if not _is_parquet(path):
+        return pd.read_csv(path, encoding='utf-8-sig', skiprows=range(1, offset + 1), nrows=limit, keep_default_na=False, na_values=[''])
+    parquet_file = pq.ParquetFile(path)
+    tables, start = [], 0
+    # Seuls les groupes de lignes qui recouvrent la tranche demandée sont lus
+    for group in range(parquet_file.num_row_groups):
+        rows = parquet_file.metadata.row_group(group).num_rows
+        if start + rows > offset and start < offset + limit:
+            table = parquet_file.read_row_group(group)
+            tables.append(table.slice(max(offset - start, 0), offset + limit - max(start, offset)))
+        start += rows
+    if not tables: return parquet_file.schema_arrow.empty_table().to_pandas()
+    return pa.concat_tables(tables).to_pandas()
+
+
+def count_results(path: str) -> int:
+    if _is_parquet(path): return pq.ParquetFile(path).metadata.num_rows
+    return sum(len(chunk) for chunk in iter_result_chunks(path, columns=['source_url']))
+
+
+def summarize_results(path: str, top: int = 10) -> Dict:
+    """Compteurs du tableau de bord (total, liens présents, pages sources et cibles, types de match, sources d'ancre), par morceaux"""
+    columns = ['source_url', 'target_url', 'match_type', 'anchor_location', 'existing_link']
+    counters = {column: Counter() for column in columns}
+    total = 0
+    for chunk in iter_result_chunks(path, columns=columns):
+        total += len(chunk)
+        for column in columns: counters[column].update(chunk[column].value_counts().to_dict())
+    return {
+        'total': total, 'existing_link': dict(counters['existing_link']),
+        'top_sources': counters['source_url'].most_common(top), 'top_targets': counters['target_url'].most_common(top),
+        'match_types': counters['match_type'].most_common(), 'anchor_locations': counters['anchor_location'].most_common()
+    }
+
+
+def export_results(path: str, out_path: str, format: str = 'csv', labels: Optional[Dict[str, str]] = None) -> int:
+    """
+    Convertit le fichier de résultats en fichier à télécharger (`csv` ou `xlsx`), morceau par morceau,
+    avec les colonnes renommées selon `labels`. L'export Excel est limité à `EXCEL_MAX_ROWS` lignes.
+    Retourne le nombre de lignes exportées.
+    """
+    labels = labels or {}
+    count = 0
+    if format == 'csv':
+        with open(out_path, 'w', newline='', encoding='utf-8-sig') as f:
+            for i, chunk in enumerate(iter_result_chunks(path)):
+                chunk.rename(columns=labels).to_csv(f, index=False, header=i == 0)
+                count += len(chunk)
+            if count == 0: f.write(','.join(labels.get(column, column) for column in RESULT_COLUMNS) + '\n')
+        return count
+    if format != 'xlsx': raise ValueError(f"Format d'export inconnu: {format}")
+    if not XLSX_EXPORT_AVAILABLE: raise ValueError("Pour l'export Excel, installez `openpyxl`")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Opportunités')
+    for i, chunk in enumerate(iter_result_chunks(path)):
+        if i == 0: sheet.append([labels.get(column, column) for column in chunk.columns])
+        chunk = chunk.iloc[:EXCEL_MAX_ROWS - count]
+        for row in chunk.itertuples(index=False, name=None): sheet.append([None if pd.isna(value) else value for value in row])
+        count += len(chunk)
+        if count >= EXCEL_MAX_ROWS: break
+    workbook.save(out_path)
+    return count
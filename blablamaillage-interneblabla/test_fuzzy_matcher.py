@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du moteur de correspondance floue - Maillage Interne
+==========================================================
+
+`FuzzyMatcher` doit trouver exactement les mêmes mots-clés, avec les mêmes scores,
+que la boucle historique sur `fuzz.token_set_ratio` (fuzzywuzzy).
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fuzzy_matcher
+from fuzzy_matcher import FuzzyMatcher
+
+fuzz = pytest.importorskip('fuzzywuzzy.fuzz')
+
+WORDS = ['chaussure', 'chaussures', 'running', 'vélo', 'électrique', 'électriques', 'Vélo-électrique', 'batterie', 'batteries',
+         'trail', 'homme', 'femme', 'de', 'la', 'pas', 'cher', 'l\'été', 'été', 'noël', 'x2', '2024', 'a', 'chat', 'chats']
+SEPARATORS = [' ', ', ', ' - ', '. ', '\xa0', '/']
+
+
+def random_text(rng: random.Random, max_words: int) -> str:
+    return rng.choice(SEPARATORS).join(rng.choices(WORDS, k=rng.randint(1, max_words)))
+
+
+@pytest.mark.parametrize('use_rapidfuzz', [True, False])
+@pytest.mark.parametrize('threshold', [60, 85, 100])
+def test_match_same_as_token_set_ratio(monkeypatch, use_rapidfuzz, threshold):
+    """Mêmes (mot-clé, score) que fuzz.token_set_ratio sur chaque mot-clé, avec ou sans rapidfuzz"""
+    if use_rapidfuzz and not fuzzy_matcher.RAPIDFUZZ_AVAILABLE: pytest.skip("rapidfuzz n'est pas installé")
+    monkeypatch.setattr(fuzzy_matcher, 'RAPIDFUZZ_AVAILABLE', use_rapidfuzz)
+    rng = random.Random(threshold)
+    keywords = sorted({random_text(rng, 3).lower().strip() for _ in range(100)})
+    matcher = FuzzyMatcher(keywords, threshold)
+    for _ in range(200):
+        text_lower = random_text(rng, 12).lower()
+        expected = [(keyword_id, score) for keyword_id, score in ((i, fuzz.token_set_ratio(keyword, text_lower)) for i, keyword in enumerate(keywords))
+                    if score >= threshold]
+        assert matcher.match(text_lower) == expected, text_lower
+
+
+def test_match_excludes_positions():
+    """Les positions déjà trouvées en correspondance exacte ne sont pas retournées"""
+    matcher = FuzzyMatcher(['chaussures running', 'velo electrique'], 85)
+    assert [keyword_id for keyword_id, _ in matcher.match('chaussure running')] == [0]
+    assert matcher.match('chaussure running', exclude={0}) == []
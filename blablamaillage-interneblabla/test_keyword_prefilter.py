@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du préfiltre des blocs de contenu - Maillage Interne
+==========================================================
+
+Le préfiltre (`KeywordPrefilter`) est exact : `OpportunityScanner` doit trouver les
+mêmes opportunités avec et sans lui, dans chaque mode de correspondance.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip('ahocorasick')
+
+from keyword_index import KeywordIndex
+from opportunity_scanner import OpportunityScanner
+from page_index import ContentBlock, PageRecord
+
+WORDS = ['chaussure', 'chaussures', 'Chaussures', 'running', 'vélo', 'velo', 'électrique', 'électriques', 'vélo-électrique',
+         'batterie', 'batteries', 'bateau', 'bateaux', 'cheval', 'chevaux', 'trail', 'homme', 'de', 'la', 'pas', 'cher',
+         "l'été", 'été', 'noël', 'x2', 'a', 'chat', 'chats', 'achat', 'rachats', 'randonnée', 'tente', 'sac', 'à', 'dos']
+# Mots absents des mots-clés : la plupart des blocs sont écartés par le préfiltre
+FILLER = ['livraison', 'gratuite', 'retour', 'offert', 'panier', 'compte', 'magasin', 'avis', 'client', 'aide']
+SEPARATORS = [' ', ', ', ' - ', '. ', '\xa0', '/', ' (', ') ', '!']
+
+
+def random_text(rng: random.Random, words, max_words: int) -> str:
+    parts = rng.choices(words, k=rng.randint(1, max_words))
+    return ''.join(part + rng.choice(SEPARATORS) for part in parts).strip()
+
+
+def random_page(rng: random.Random, number: int) -> PageRecord:
+    blocks = [ContentBlock(f'p{i}', random_text(rng, FILLER + WORDS if rng.random() < 0.5 else FILLER, 15)) for i in range(8)]
+    return PageRecord(f'page-{number}.html', f'https://www.example.com/page-{number}', blocks=blocks)
+
+
+def scan(scanner: OpportunityScanner, pages):
+    return [opportunity.to_dict() for number, page in enumerate(pages) for opportunity in scanner.scan_page(f'https://www.example.com/page-{number}', page)]
+
+
+@pytest.mark.parametrize('match_mode', ['word', 'stem', 'substring'])
+@pytest.mark.parametrize('use_fuzzy', [False, True])
+def test_same_opportunities_with_and_without_prefilter(match_mode, use_fuzzy):
+    """Mêmes opportunités, dans le même ordre, que le préfiltre soit utilisé ou non"""
+    rng = random.Random(f'{match_mode}-{use_fuzzy}')
+    queries = sorted({random_text(rng, WORDS, 3) for _ in range(80)})
+    keyword_index = KeywordIndex([query.lower().strip() for query in queries], [f'https://www.example.com/cible-{i}' for i in range(len(queries))],
+                                 [float(len(queries) - i) for i in range(len(queries))], [1.0] * len(queries), queries)
+    config = {'exact_match_mode': match_mode, 'use_fuzzy_matching': use_fuzzy, 'fuzzy_threshold': 85, 'min_keyword_length': 3}
+    pages = [random_page(rng, number) for number in range(60)]
+
+    with_prefilter = OpportunityScanner(keyword_index, config)
+    without_prefilter = OpportunityScanner(keyword_index, config, automaton=with_prefilter.automaton)
+    without_prefilter.prefilter = None
+    if match_mode == 'substring':
+        # Un mot-clé peut apparaître au milieu d'un mot : le préfiltre n'est pas utilisé
+        assert with_prefilter.prefilter is None
+    else:
+        # Le test n'a de sens que si le préfiltre écarte effectivement des blocs
+        assert any(not any(with_prefilter.prefilter.check(block.text.lower())) for page in pages for block in page.blocks)
+    expected = scan(without_prefilter, pages)
+    assert expected
+    assert scan(with_prefilter, pages) == expected
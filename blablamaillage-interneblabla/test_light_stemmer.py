@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la racinisation légère - Maillage Interne
+==================================================
+
+Les formes fléchies d'un même mot (après `fold_text`) doivent avoir la même racine,
+et un mot-clé doit être trouvé en mode `stem` sous ses autres formes.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from keyword_automaton import fold_text
+from light_stemmer import stem_word
+
+SAME_STEM = [
+    ('chaussure', 'chaussures'), ('bateau', 'bateaux'), ('cheval', 'chevaux'), ('électrique', 'électriques'),
+    ('batterie', 'batteries'), ('battery', 'batteries'), ('catégorie', 'catégories'), ('boulangerie', 'boulangeries'),
+    ('travail', 'travaux'), ('détail', 'détails'), ('gris', 'grise'), ('grise', 'grises'), ('heureux', 'heureuse'),
+    ('classe', 'classes'), ('série', 'séries'), ('tente', 'tentes'),
+]
+
+
+def stem(word: str) -> str:
+    return stem_word(fold_text(word).strip())
+
+
+@pytest.mark.parametrize('first, second', SAME_STEM)
+def test_inflected_forms_share_stem(first, second):
+    assert stem(first) == stem(second)
+
+
+def test_short_words_and_digits_unchanged():
+    assert [stem_word(word) for word in ('gaz', 'vis', 'x2', 'v8s', '2024')] == ['gaz', 'vis', 'x2', 'v8s', '2024']
+
+
+def test_stem_mode_finds_other_forms():
+    """Un mot-clé au pluriel est trouvé au singulier (type `stem`), et tel quel (type `exact`)"""
+    pytest.importorskip('ahocorasick')
+    from keyword_index import KeywordIndex
+    from opportunity_scanner import OpportunityScanner
+    from page_index import ContentBlock, PageRecord
+
+    queries = ['batteries', 'catégories vélo', 'gros travaux']
+    keyword_index = KeywordIndex(queries, [f'https://www.example.com/cible-{i}' for i in range(len(queries))], [1.0] * 3, [1.0] * 3, queries)
+    scanner = OpportunityScanner(keyword_index, {'exact_match_mode': 'stem'})
+    page = PageRecord('page.html', 'https://www.example.com/page', blocks=[
+        ContentBlock('p1', 'Changer la batterie du vélo'), ContentBlock('p2', 'Nos Catégorie Vélos et gros travail'),
+        ContentBlock('p3', 'Batteries en stock')])
+    found = [(opportunity.element_source, opportunity.anchor, opportunity.match_type) for opportunity in scanner.scan_page('https://www.example.com/page', page)]
+    assert found == [('p1', 'batteries', 'stem'), ('p2', 'catégories vélo', 'stem'), ('p2', 'gros travaux', 'stem'), ('p3', 'batteries', 'exact')]
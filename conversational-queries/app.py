@@ -1,10 +1,19 @@
 import json
+import os
+import sys
 import streamlit as st
 from openai import OpenAI
 import pandas as pd
 import time
 from typing import Any, Dict, List, Optional
 
+# Modules partagés par les outils du hub (progress_reporter, job_runner), dans le répertoire parent
+HUB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if HUB_DIR not in sys.path:
+    sys.path.append(HUB_DIR)
+
+from progress_reporter import ProgressReporter
+
 # Imports des modules refactorisés
 from utils.ui_components import setup_page_config, render_header, render_social_links
 from utils.config_manager import ConfigManager
@@ -16,6 +25,13 @@ from services.dataforseo_service import DataForSEOService, StepStatus
 from question_generator import QuestionGenerator
 from google_suggestions import GoogleSuggestionsClient
 
+# Exécution des étapes longues en arrière-plan, fournie par le hub (absente si l'outil est copié sans le hub)
+try:
+    from job_runner import get_job_runner, show_job_messages, watch_job
+    JOB_RUNNER_AVAILABLE = True
+except ImportError:
+    JOB_RUNNER_AVAILABLE = False
+
 def main():
     """Fonction principale de l'application"""
     
@@ -401,14 +417,86 @@ def run_step_collect_suggestions(
     pipeline_state['step_status']['suggestions'] = 'running'
     pipeline_state['messages']['suggestions'] = "Collecte en cours..."
 
+    if JOB_RUNNER_AVAILABLE:
+        # Collecte en arrière-plan : les interactions avec la page ne l'interrompent pas
+        st.session_state.suggestions_job_id = get_job_runner().submit(
+            "Collecte des suggestions Google",
+            collect_suggestions_job,
+            keywords,
+            levels_config.copy(),
+            analysis_options['language']
+        ).id
+        # Le résultat n'est repris que si les mots-clés et options n'ont pas changé entre-temps
+        st.session_state.suggestions_job_signature = pipeline_state['signature']
+        return
+
     st.info("🔍 Collecte des suggestions Google")
+    progress_bar = st.progress(0)
+    reporter = ProgressReporter(
+        lambda fraction, text: progress_bar.progress(fraction, text=text),
+        len(keywords), "Collecte", unit="mots-clés"
+    )
     all_suggestions = collect_google_suggestions(
         keywords,
         levels_config,
         google_client,
-        analysis_options['language']
+        analysis_options['language'],
+        progress_callback=lambda done, total, keyword: reporter.update(done, total, keyword)
+    )
+    progress_bar.empty()
+
+    complete_step_collect_suggestions(keywords, all_suggestions, levels_config, analysis_options, api_key)
+
+
+def collect_suggestions_job(job, keywords: List[str], levels_config: Dict[str, Any], language: str) -> List[Dict[str, Any]]:
+    """Tâche d'arrière-plan de l'étape 1 : les avertissements du client Google sont affichés à la fin de la tâche"""
+    reporter = ProgressReporter(job.report, len(keywords), "Collecte", unit="mots-clés")
+    return collect_google_suggestions(
+        keywords,
+        levels_config,
+        GoogleSuggestionsClient(on_warning=job.log),
+        language,
+        progress_callback=lambda done, total, keyword: reporter.update(done, total, keyword),
+        should_stop=job.should_stop
     )
 
+
+def finish_suggestions_job(
+    job,
+    keywords_input: str,
+    levels_config: Dict[str, Any],
+    analysis_options: Dict[str, Any],
+    api_key: Optional[str]
+) -> None:
+    """Reprend le résultat de la collecte d'arrière-plan dans le workflow"""
+
+    pipeline_state = st.session_state.pipeline_state
+    signature = st.session_state.pop('suggestions_job_signature', None)
+    show_job_messages(job)
+
+    if signature != pipeline_state['signature']:
+        st.info("ℹ️ Les mots-clés ou les options ont changé pendant la collecte : relancez l'étape 1")
+        return
+
+    if job.status != 'done':
+        pipeline_state['step_status']['suggestions'] = 'error'
+        pipeline_state['messages']['suggestions'] = "Collecte annulée" if job.status == 'cancelled' else "Erreur lors de la collecte"
+        return
+
+    complete_step_collect_suggestions(parse_keywords_input(keywords_input), job.result, levels_config, analysis_options, api_key)
+
+
+def complete_step_collect_suggestions(
+    keywords: List[str],
+    all_suggestions: List[Dict[str, Any]],
+    levels_config: Dict[str, Any],
+    analysis_options: Dict[str, Any],
+    api_key: Optional[str]
+) -> None:
+    """Étape 1 – Enregistrement des suggestions collectées dans le workflow"""
+
+    pipeline_state = st.session_state.pipeline_state
+
     if not all_suggestions:
         pipeline_state['step_status']['suggestions'] = 'error'
         pipeline_state['messages']['suggestions'] = "Aucune suggestion trouvée"
@@ -876,7 +964,7 @@ def render_analysis_workflow_controls(
         "1️⃣ Suggestions",
         type="primary",
         width='stretch',
-        disabled=not bool(parse_keywords_input(keywords_input))
+        disabled=not bool(parse_keywords_input(keywords_input)) or bool(st.session_state.get('suggestions_job_id'))
     )
 
     volumes_disabled = (
@@ -934,6 +1022,11 @@ def render_analysis_workflow_controls(
     if btn4:
         run_step_generate_questions(question_generator, analysis_options)
 
+    if JOB_RUNNER_AVAILABLE:
+        job = watch_job('suggestions_job_id')
+        if job is not None:
+            finish_suggestions_job(job, keywords_input, levels_config, analysis_options, api_key)
+
     render_step_status_summary(pipeline_state)
 
     reset_col, _ = st.columns([1, 3])
@@ -972,7 +1065,10 @@ def run_analysis(keywords_input, levels_config, google_client, question_generato
         # Étape 1: Collecte des suggestions Google
         workflow.update_step("collect_suggestions", "running")
         all_suggestions = collect_google_suggestions(
-            keywords, levels_config, google_client, analysis_options['language']
+            keywords, levels_config, google_client, analysis_options['language'],
+            progress_callback=lambda done, total, keyword: workflow.report_progress(
+                "collect_suggestions", done, total, detail=keyword
+            )
         )
         
         if not all_suggestions:
@@ -990,7 +1086,10 @@ def run_analysis(keywords_input, levels_config, google_client, question_generato
                 if step_name not in step_names:
                     return
 
-                if status == StepStatus.RUNNING:
+                if status == StepStatus.RUNNING and 'progress' in payload:
+                    done, total = payload['progress']
+                    workflow.report_progress(step_name, done, total)
+                elif status == StepStatus.RUNNING:
                     workflow.update_step(step_name, "running")
                 elif status in {StepStatus.COMPLETED, StepStatus.PARTIAL, StepStatus.SKIPPED}:
                     workflow.complete_step(step_name)
@@ -1053,10 +1152,17 @@ def run_analysis(keywords_input, levels_config, google_client, question_generato
         workflow.finish_workflow()
         st.error(f"❌ Erreur lors de l'analyse: {str(e)}")
 
-def collect_google_suggestions(keywords, levels_config, google_client, language):
-    """Collecte des suggestions Google"""
+def collect_google_suggestions(keywords, levels_config, google_client, language, progress_callback=None, should_stop=None):
+    """
+    Collecte des suggestions Google (`progress_callback(fait, total, mot-clé)` appelé pour chaque mot-clé).
+    La collecte s'arrête avant le mot-clé suivant si `should_stop()` est vrai.
+    """
     all_suggestions = []
-    for keyword in keywords:
+    for i, keyword in enumerate(keywords):
+        if should_stop and should_stop():
+            break
+        if progress_callback:
+            progress_callback(i, len(keywords), keyword)
         suggestions = google_client.get_multilevel_suggestions(
             keyword,
             language,
@@ -1068,6 +1174,8 @@ def collect_google_suggestions(keywords, levels_config, google_client, language)
         )
         all_suggestions.extend(suggestions)
     
+    if progress_callback and keywords:
+        progress_callback(len(keywords), len(keywords), "")
     return all_suggestions
 
 def analyze_themes_with_volume_filter(keywords, all_suggestions, enriched_data, question_generator, language):
@@ -3,7 +3,7 @@ import base64
 import json
 import time
 import streamlit as st
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Callable
 
 class DataForSEOClient:
     """Client pour interagir avec l'API DataForSEO"""
@@ -159,8 +159,12 @@ class DataForSEOClient:
             return []
     
     def get_keywords_for_keywords_batch(self, keywords: List[str], language: str = 'fr',
-                                       location: str = 'fr', max_batch_size: int = 20) -> List[Dict[str, Any]]:
-        """Récupérer les suggestions Ads par batch de mots-clés (max 20 par requête)"""
+                                       location: str = 'fr', max_batch_size: int = 20,
+                                       progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+        """Récupérer les suggestions Ads par batch de mots-clés (max 20 par requête)
+
+        `progress_callback(mots-clés traités, total)` est appelé avant chaque batch et à la fin.
+        """
         if not keywords:
             return []
         
@@ -174,6 +178,8 @@ class DataForSEOClient:
         # Traiter par chunks de max_batch_size
         for i in range(0, len(keywords), max_batch_size):
             batch = keywords[i:i + max_batch_size]
+            if progress_callback:
+                progress_callback(i, len(keywords))
             
             # Préparer les paramètres de localisation
             lang_code = self.language_codes.get(language, {'code': 'fr'})['code']
@@ -253,6 +259,8 @@ class DataForSEOClient:
                 st.warning(f"❌ Erreur inattendue batch {i//max_batch_size + 1}: {str(e)}")
                 continue
         
+        if progress_callback:
+            progress_callback(len(keywords), len(keywords))
         return all_suggestions
     
     def process_keywords_complete(self, initial_keywords: List[str], suggestions: List[str],
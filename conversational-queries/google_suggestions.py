@@ -1,13 +1,15 @@
 import requests
 import time
 import streamlit as st
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 
 class GoogleSuggestionsClient:
     """Client pour récupérer les suggestions Google"""
     
-    def __init__(self):
+    def __init__(self, on_warning: Optional[Callable[[str], None]] = None):
         self.base_url = "https://suggestqueries.google.com/complete/search"
+        # Affichage des erreurs de requête (hors du script Streamlit, une tâche d'arrière-plan les collecte)
+        self.on_warning = on_warning or st.warning
     
     def get_suggestions(self, keyword: str, lang: str = 'fr', max_suggestions: int = 10) -> List[str]:
         """Récupère les suggestions Google pour un mot-clé"""
@@ -27,16 +29,16 @@ class GoogleSuggestionsClient:
             suggestions = response.json()[1][:max_suggestions]
             return [s for s in suggestions if s and s.strip()]  # Filtrer les suggestions vides
         except requests.exceptions.Timeout:
-            st.warning(f"⏰ Timeout pour '{keyword}'")
+            self.on_warning(f"⏰ Timeout pour '{keyword}'")
             return []
         except requests.exceptions.ConnectionError:
-            st.warning(f"🌐 Erreur de connexion pour '{keyword}'")
+            self.on_warning(f"🌐 Erreur de connexion pour '{keyword}'")
             return []
         except (ValueError, IndexError) as e:
-            st.warning(f"📄 Erreur de parsing pour '{keyword}': {str(e)}")
+            self.on_warning(f"📄 Erreur de parsing pour '{keyword}': {str(e)}")
             return []
         except Exception as e:
-            st.warning(f"❌ Erreur inattendue pour '{keyword}': {str(e)}")
+            self.on_warning(f"❌ Erreur inattendue pour '{keyword}': {str(e)}")
             return []
     
     def get_multilevel_suggestions(self, keyword: str, lang: str = 'fr', 
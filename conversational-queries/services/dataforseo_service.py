@@ -161,7 +161,8 @@ class DataForSEOService:
             'total_keywords': len(all_keywords)
         }
 
-    def get_ads_suggestions(self, keywords_with_volume: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def get_ads_suggestions(self, keywords_with_volume: List[Dict[str, Any]],
+                            progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
         """Récupérer les suggestions Google Ads pour les 20 mots-clés avec le plus fort volume"""
         if not keywords_with_volume:
             return []
@@ -182,7 +183,8 @@ class DataForSEOService:
             keywords_for_ads,
             self.config.get('language', 'fr'),
             self.config.get('location', 'fr'),
-            max_batch_size=20
+            max_batch_size=20,
+            progress_callback=progress_callback
         )
 
         if ads_suggestions:
@@ -275,7 +277,10 @@ class DataForSEOService:
             notify('dataforseo_ads', StepStatus.RUNNING)
             start = time.perf_counter()
             try:
-                ads_suggestions = self.get_ads_suggestions(keywords_with_volume)
+                ads_suggestions = self.get_ads_suggestions(
+                    keywords_with_volume,
+                    progress_callback=lambda done, total: notify('dataforseo_ads', StepStatus.RUNNING, {'progress': (done, total)})
+                )
                 duration = time.perf_counter() - start
                 status = StepStatus.COMPLETED if ads_suggestions else StepStatus.PARTIAL
                 metadata = {
@@ -1,8 +1,17 @@
+import os
+import sys
 import streamlit as st
 import time
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
+# Suivi de progression partagé par les outils du hub, dans le répertoire racine
+HUB_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if HUB_DIR not in sys.path:
+    sys.path.append(HUB_DIR)
+
+from progress_reporter import ProgressReporter
+
 @dataclass
 class AnalysisStep:
     """Représente une étape d'analyse"""
@@ -20,6 +29,7 @@ class WorkflowManager:
         self.current_step_index = 0
         self.progress_bar = None
         self.status_text = None
+        self.reporters: Dict[str, ProgressReporter] = {}
     
     def initialize_workflow(self, enable_dataforseo: bool, generate_questions: bool):
         """Initialiser les étapes du workflow"""
@@ -46,6 +56,7 @@ class WorkflowManager:
         self.progress_bar = st.progress(0)
         self.status_text = st.empty()
         self.current_step_index = 0
+        self.reporters = {}
     
     def update_step(self, step_name: str, status: str, progress: int = None, error_message: str = ""):
         """Mettre à jour une étape"""
@@ -58,6 +69,20 @@ class WorkflowManager:
             
             self._update_display()
     
+    def report_progress(self, step_name: str, done: int, total: int, unit: str = "mots-clés", detail: str = ""):
+        """Avancement d'une étape en cours, affiché au plus 4 fois par seconde avec débit et temps restant"""
+        step = next((s for s in self.steps if s.name == step_name), None)
+        if not step:
+            return
+        reporter = self.reporters.get(step_name)
+        if reporter is None:
+            def render(fraction: float, text: str):
+                step.status = "running"
+                step.progress = int(fraction * 100)
+                self._update_display(text)
+            reporter = self.reporters[step_name] = ProgressReporter(render, total, unit=unit)
+        reporter.update(done, total, detail)
+
     def complete_step(self, step_name: str):
         """Marquer une étape comme terminée"""
         self.update_step(step_name, "completed", 100)
@@ -67,7 +92,7 @@ class WorkflowManager:
         """Marquer une étape en erreur"""
         self.update_step(step_name, "error", error_message=error_message)
     
-    def _update_display(self):
+    def _update_display(self, detail: str = ""):
         """Mettre à jour l'affichage du progrès"""
         if not self.progress_bar or not self.status_text:
             return
@@ -85,7 +110,7 @@ class WorkflowManager:
                 break
         
         if current_step:
-            self.status_text.text(current_step.description)
+            self.status_text.text(f"{current_step.description} ({detail})" if detail else current_step.description)
             if current_step.status == "running" and current_step.progress > 0:
                 # Afficher le progrès de l'étape courante
                 step_progress = int((completed_steps + current_step.progress / 100) / total_steps * 100)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exécution des tâches longues en arrière-plan - Hub SEO
+======================================================
+
+Un traitement lancé directement dans le script Streamlit est interrompu dès que
+l'utilisateur touche à un widget (le script est réexécuté), et il bloque la
+session jusqu'à la fin. `JobRunner` exécute ces traitements dans des threads à
+part, hors du script : les pages soumettent une tâche, gardent son identifiant
+dans `st.session_state`, puis suivent son état et son avancement jusqu'à la fin
+et récupèrent son résultat.
+
+Le runner est une ressource Streamlit mise en cache (`get_job_runner`) : il est
+partagé par toutes les sessions du serveur et survit aux réexécutions du script.
+Les tâches sont exécutées dans l'ordre de soumission, au plus `JOB_WORKERS` à la
+fois (variable d'environnement HUB_JOB_WORKERS) ; les suivantes attendent.
+
+Une tâche est une fonction `fn(job, *args, **kwargs)`. Elle ne doit pas appeler
+Streamlit : elle signale son avancement par `job.report(fraction, texte)` (la
+signature du rendu de `ProgressReporter`), ses avertissements par `job.log(texte)`,
+et s'arrête proprement si `job.should_stop()` devient vrai (annulation).
+"""
+
+import itertools
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Gestion des dépendances optionnelles
+try:
+    import streamlit as st
+    STREAMLIT_AVAILABLE = True
+except ImportError:
+    STREAMLIT_AVAILABLE = False
+
+# Nombre de tâches exécutées en même temps
+JOB_WORKERS = max(int(os.environ.get('HUB_JOB_WORKERS', 2)), 1)
+# Nombre de tâches terminées gardées en mémoire (avec leur résultat) tant que leur page ne les a pas récupérées
+MAX_FINISHED_JOBS = 20
+# Intervalle (secondes) entre deux rafraîchissements de l'avancement dans une page
+POLL_INTERVAL = 1.0
+
+JOB_STATUSES = {
+    'pending': "En attente",
+    'running': "En cours",
+    'done': "Terminée",
+    'failed': "Échec",
+    'cancelled': "Annulée"
+}
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+
+class Job:
+    """Tâche soumise au runner : état, avancement, messages et résultat (ou erreur)"""
+
+    __slots__ = ('id', 'label', 'status', 'progress', 'message', 'messages', 'result', 'error', 'traceback', 'created', 'started', 'finished',
+                 '_cancel')
+
+    def __init__(self, job_id: str, label: str):
+        self.id = job_id
+        self.label = label
+        self.status = 'pending'
+        self.progress = 0.0
+        self.message = ''
+        # (niveau Streamlit : 'info', 'warning' ou 'error', texte), affichés par la page à la fin de la tâche
+        self.messages: List[Tuple[str, str]] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.traceback: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def report(self, fraction: float, text: str = '') -> None:
+        """Avancement de la tâche (appelé par la tâche elle-même)"""
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if text: self.message = text
+
+    def log(self, text: str, level: str = 'warning') -> None:
+        """Message à afficher par la page une fois la tâche terminée"""
+        self.messages.append((level, text))
+
+    def cancel(self) -> None:
+        """Demande l'arrêt de la tâche : une tâche en attente n'est pas lancée, une tâche en cours s'arrête à son prochain contrôle"""
+        self._cancel.set()
+
+    def should_stop(self) -> bool:
+        return self._cancel.is_set()
+
+    def elapsed(self) -> float:
+        if self.started is None: return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobRunner:
+    """File de tâches exécutées dans des threads, hors du script Streamlit"""
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hub-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, label: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Ajoute la tâche `fn(job, *args, **kwargs)` à la file et retourne son `Job`"""
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", label)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        if job.should_stop():
+            job.status, job.finished = 'cancelled', time.time(); return
+        job.status, job.started = 'running', time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = 'cancelled' if job.should_stop() else 'done'
+        except Exception as e:
+            job.error, job.traceback = str(e) or type(e).__name__, traceback.format_exc()
+            job.status = 'failed'
+        job.progress = 1.0 if job.status == 'done' else job.progress
+        job.finished = time.time()
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock: return self._jobs.get(job_id) if job_id else None
+
+    def jobs(self) -> List[Job]:
+        """Tâches connues, de la plus ancienne à la plus récente"""
+        with self._lock: return list(self._jobs.values())
+
+    def forget(self, job_id: str) -> None:
+        """Oublie une tâche terminée dont la page a récupéré le résultat (libère la mémoire)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.is_finished: del self._jobs[job_id]
+
+    def _prune(self) -> None:
+        # Les résultats jamais récupérés (session fermée) sont abandonnés, en commençant par les plus anciens
+        finished = [job.id for job in self._jobs.values() if job.is_finished]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]: del self._jobs[job_id]
+
+
+def _create_job_runner() -> JobRunner:
+    return JobRunner()
+
+
+# Runner partagé par toutes les sessions : ressource Streamlit mise en cache (un runner par processus hors Streamlit)
+get_job_runner = st.cache_resource(show_spinner=False)(_create_job_runner) if STREAMLIT_AVAILABLE else lru_cache(maxsize=None)(_create_job_runner)
+
+
+def show_job_messages(job: Job) -> None:
+    """Affiche les messages d'une tâche terminée, puis son erreur éventuelle"""
+    for level, text in job.messages: getattr(st, level, st.warning)(text)
+    if job.status == 'failed':
+        st.error(f"Échec de la tâche « {job.label} » : {job.error}")
+        with st.expander("Détails de l'erreur"): st.code(job.traceback or '')
+
+
+def watch_job(state_key: str, poll_interval: float = POLL_INTERVAL) -> Optional[Job]:
+    """
+    Suit la tâche dont l'identifiant est dans `st.session_state[state_key]`. Tant qu'elle n'est pas terminée, affiche
+    son avancement, rafraîchi toutes les `poll_interval` secondes sans réexécuter le reste de la page, avec un bouton
+    d'annulation, et retourne None. À la fin de la tâche, la page est réexécutée et la tâche terminée est retournée,
+    une seule fois : la clé est effacée et le runner l'oublie. La page doit donc conserver son résultat.
+    """
+    job_id = st.session_state.get(state_key)
+    if not job_id: return None
+    runner = get_job_runner()
+    job = runner.get(job_id)
+    if job is None or job.is_finished:
+        # Tâche terminée, ou inconnue (serveur redémarré, résultat abandonné) : elle n'est plus suivie
+        del st.session_state[state_key]
+        if job is not None: runner.forget(job_id)
+        return job
+
+    def render_progress() -> None:
+        current = runner.get(job_id)
+        if current is None or current.is_finished: st.rerun()
+        text = current.message or current.label
+        if current.status == 'pending': text = f"{current.label} : {JOB_STATUSES['pending'].lower()}"
+        st.progress(current.progress, text=text)
+        if st.button("Annuler", key=f"cancel_{job_id}", disabled=current.should_stop()): current.cancel()
+
+    fragment = getattr(st, 'fragment', None)
+    if fragment is not None:
+        fragment(run_every=poll_interval)(render_progress)()
+    else:
+        # Streamlit sans fragments : la page entière est réexécutée
+        render_progress()
+        time.sleep(poll_interval)
+        st.rerun()
+    return None
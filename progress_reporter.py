@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suivi de progression - Hub SEO
+==============================
+
+Chaque mise à jour d'une barre Streamlit est un message envoyé au navigateur :
+appeler `progress()` une fois par page ou par mot-clé coûte un temps réel sur de grosses archives.
+`ProgressReporter` limite les mises à jour à une toutes les `min_interval` secondes
+(la première et la dernière sont toujours envoyées) et ajoute au texte le débit
+et le temps restant estimé. Le module est partagé par les outils du hub.
+
+Le rendu est délégué à une fonction `render(fraction, texte)` : ce module n'importe
+pas Streamlit et fonctionne aussi hors de l'interface.
+"""
+
+import time
+from typing import Callable, Optional
+
+# Intervalle minimal entre deux mises à jour de l'affichage (secondes)
+DEFAULT_MIN_INTERVAL = 0.25
+
+
+def format_duration(seconds: float) -> str:
+    """Durée lisible : « 42 s », « 3 min 05 s », « 1 h 12 min »"""
+    seconds = int(round(seconds))
+    if seconds < 60: return f"{seconds} s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60: return f"{minutes} min {seconds:02d} s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} h {minutes:02d} min"
+
+
+class ProgressReporter:
+    """
+    Progression limitée en fréquence, avec débit et temps restant.
+    L'objet s'utilise directement comme callback `(fait, total)` des fonctions d'analyse.
+    """
+
+    def __init__(self, render: Callable[[float, str], None], total: int = 0, label: str = "", unit: str = "pages",
+                 min_interval: float = DEFAULT_MIN_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        self.render = render
+        self.total = total
+        self.label = label
+        self.unit = unit
+        self.min_interval = min_interval
+        self.clock = clock
+        self.done = 0
+        self.started = clock()
+        self._last_render: Optional[float] = None
+
+    def __call__(self, done: int, total: Optional[int] = None) -> None:
+        self.update(done, total)
+
+    def message(self, detail: str = "") -> str:
+        elapsed = self.clock() - self.started
+        # Sans total ni avancement (étape d'une seule traite), seul le libellé est affiché
+        parts = [f"{self.label} {self.done}/{self.total} {self.unit}".strip() if self.total or self.done else self.label]
+        if elapsed > 0 and self.done:
+            rate = self.done / elapsed
+            parts.append(f"{rate:.1f} {self.unit}/s")
+            if self.total > self.done: parts.append(f"reste ~{format_duration((self.total - self.done) / rate)}")
+        if detail: parts.append(detail)
+        return " - ".join(parts)
+
+    def update(self, done: int, total: Optional[int] = None, detail: str = "", force: bool = False) -> bool:
+        """Enregistre l'avancement ; retourne True si l'affichage a été mis à jour"""
+        self.done = done
+        if total is not None: self.total = total
+        now = self.clock()
+        finished = self.total and done >= self.total
+        if not (force or finished or self._last_render is None or now - self._last_render >= self.min_interval): return False
+        self._last_render = now
+        self.render(min(done / self.total, 1.0) if self.total else 0.0, self.message(detail))
+        return True
+
+    def advance(self, count: int = 1, detail: str = "") -> bool:
+        return self.update(self.done + count, detail=detail)